@@ -0,0 +1,56 @@
+"""
+PLZ adjacency graph: construction from the bundled Berlin polygons and from
+a synthetic grid of national size, plus lookup and smoothing latencies.
+
+    python -m benchmarks.bench_adjacency
+"""
+import time
+import timeit
+
+import numpy as np
+
+from config import pdict
+from main import DataLoader
+from shared.application.Adjacency import PlzGraph
+from shared.application.Aggregation import polygons_from_wkt
+from benchmarks.synthetic import make_plz_polygons
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def per_call_us(func, number=10_000):
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def main():
+    layers = (("Berlin", DataLoader(pdict).load_plz_polygons()),
+              ("grid 8200", polygons_from_wkt(make_plz_polygons(8200), "PLZ")))
+    print(f"{'polygons':10s} {'n':>6s} {'edges':>6s} {'queen ms':>9s} {'rook ms':>8s} {'reload ms':>9s} "
+          f"{'1-ring us':>9s} {'2-ring us':>9s} {'cached us':>9s} {'smooth ms':>9s}")
+    for name, polygons in layers:
+        queen = best_of(lambda: PlzGraph.from_polygons(polygons))
+        rook = best_of(lambda: PlzGraph.from_polygons(polygons, contiguity="rook"))
+        graph = PlzGraph.from_polygons(polygons)
+        frame = graph.to_frame()
+        reload = best_of(lambda: PlzGraph.from_frame(frame))
+
+        code = int(graph.codes[len(graph) // 2])
+        one = per_call_us(lambda: graph.neighbours(code))
+        cold = per_call_us(lambda: (graph._rings.clear(), graph.ring(code, 2)), number=1000)
+        cached = per_call_us(lambda: graph.ring(code, 2))
+        values = np.random.default_rng(0).random(len(graph))
+        graph.matrix(2)
+        smooth = best_of(lambda: graph.smooth(graph.codes, values, rings=2))
+        print(f"{name:10s} {len(graph):6d} {len(graph.indices) // 2:6d} {queen * 1000:9.1f} {rook * 1000:8.1f} "
+              f"{reload * 1000:9.2f} {one:9.2f} {cold:9.1f} {cached:9.2f} {smooth * 1000:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
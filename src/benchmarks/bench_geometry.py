@@ -0,0 +1,77 @@
+"""
+Polygon ingestion: WKT text (geodata_berlin_*.csv) vs. the bundled binary
+shapefiles vs. a derived GeoParquet file, with and without a bounding box.
+
+    python -m benchmarks.bench_geometry [repeat]
+
+Each variant runs in a fresh interpreter with geopandas already imported, so
+the peak resident set size it reports (above that baseline) covers the GEOS
+geometries as well as the Python objects.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+from config import pdict
+from shared.infrastructure.GeometrySource import geometry_source
+
+LAYERS = (("plz", "PLZ"), ("dis", "Bezirk"))
+
+# Central Berlin, roughly the area inside the Ring
+BBOX = (13.28, 52.47, 13.48, 52.56)
+
+
+def _peak_rss_kb():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM"))
+
+
+def _child(config, repeat, bbox):
+    import geopandas  # noqa: F401  imports are not part of the measurement
+    import pyogrio  # noqa: F401
+    import pyarrow.dataset  # noqa: F401
+    baseline = _peak_rss_kb()
+    times, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = sum(len(geometry_source(config, layer, key).load(bbox)) for layer, key in LAYERS)
+        times.append(time.perf_counter() - start)
+    print(json.dumps({"secs": min(times), "peak_kb": _peak_rss_kb() - baseline, "rows": rows}))
+
+
+def measure(config, repeat, bbox):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_geometry", "--child", json.dumps(config), str(repeat),
+         json.dumps(bbox)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        parquet = dict(pdict, geometry_source="parquet",
+                       file_geoparquet_plz=os.path.join(tmp, "plz.parquet"),
+                       file_geoparquet_dis=os.path.join(tmp, "dis.parquet"))
+        for layer, key in LAYERS:
+            geometry_source(dict(pdict, geometry_source="csv"), layer, key).to_parquet(
+                parquet[f"file_geoparquet_{layer}"])
+
+        print(f"{'source':10s} {'bbox':5s} {'polygons':>8s} {'secs':>8s} {'peak MB':>8s}")
+        for name, config in (("csv", dict(pdict, geometry_source="csv")),
+                             ("shapefile", dict(pdict, geometry_source="shapefile")),
+                             ("parquet", parquet)):
+            for bbox in (None, BBOX):
+                r = measure(config, repeat, bbox)
+                print(f"{name:10s} {'yes' if bbox else 'no':5s} {r['rows']:8d} {r['secs']:8.4f} "
+                      f"{r['peak_kb'] / 1024:8.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(json.loads(sys.argv[2]), int(sys.argv[3]), json.loads(sys.argv[4]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,47 @@
+"""
+Cold import time of the app entry point and of the library-only services.
+
+    python -m benchmarks.bench_imports [repeat]
+
+Each module is imported in a fresh interpreter with -X importtime; the
+cumulative time of the top-level import is reported (best of repeat), with
+the heavy map libraries it pulled in. The map stack (folium, branca,
+streamlit_folium) is only imported once a map is rendered.
+
+before (all imports at module level): Search 1.9 s, main 2.2 s
+"""
+import subprocess
+import sys
+
+MODULES = (
+    "charging.application.services.Search",
+    "shared.application.Coverage",
+    "shared.application.Placement",
+    "main",
+)
+
+HEAVY = ("folium", "branca", "streamlit_folium", "streamlit", "geopandas", "scipy.spatial")
+
+
+def import_time(module):
+    """Cumulative import time of module in seconds and the heavy packages it loaded"""
+    code = f"import sys, {module}; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            cumulative = int(fields[1]) / 1e6
+    return cumulative, result.stdout.strip()
+
+
+def main(repeat):
+    for module in MODULES:
+        times = [import_time(module) for _ in range(repeat)]
+        seconds = min(t for t, _ in times)
+        print(f"{module:40s} {seconds:6.2f} s   loads: {times[0][1] or '-'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
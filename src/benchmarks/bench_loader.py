@@ -0,0 +1,67 @@
+"""
+Full-table read vs. streaming read of Ladesaeulenregister.csv.
+
+    python -m benchmarks.bench_loader [rows ...]
+
+Each variant runs in a fresh interpreter, so the peak resident set size it
+reports (above the post-import baseline) covers pandas and Arrow buffers alike.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+import pandas as pd
+
+from benchmarks.synthetic import write_register
+from shared.infrastructure.Loader import read_lstat
+
+
+def read_full(path):
+    """The previous DataLoader.load_charging_stations"""
+    return pd.read_csv(path, delimiter=";", encoding="utf-8")
+
+
+VARIANTS = {"full": read_full, "streaming": read_lstat}
+
+
+def _peak_rss_kb():
+    """High-water mark of this process (Linux); ru_maxrss would include the parent's peak"""
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmHWM"))
+
+
+def _child(variant, path):
+    baseline = _peak_rss_kb()
+    start = time.perf_counter()
+    result = VARIANTS[variant](path)
+    elapsed = time.perf_counter() - start
+    peak = _peak_rss_kb() - baseline
+    print(json.dumps({"secs": elapsed, "peak_kb": peak, "rows": len(result)}))
+
+
+def measure(variant, path):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_loader", "--child", variant, path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(sizes):
+    print(f"{'rows':>10} {'variant':>10} {'secs':>8} {'peak MB':>9} {'rows out':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            path = write_register(os.path.join(tmp, f"register_{n}.csv"), n)
+            for variant in VARIANTS:
+                r = measure(variant, path)
+                print(f"{n:>10} {variant:>10} {r['secs']:>8.3f} {r['peak_kb'] / 1024:>9.1f} {r['rows']:>9}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(*sys.argv[2:4])
+    else:
+        main([int(a) for a in sys.argv[1:]] or [100_000, 1_000_000])
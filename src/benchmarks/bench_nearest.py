@@ -0,0 +1,45 @@
+"""
+k-nearest and radius queries of SearchService on a national-size register.
+
+    python -m benchmarks.bench_nearest [rows]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_register
+from charging.application.services.Search import SearchService
+
+
+def per_query_us(func, points):
+    start = time.perf_counter()
+    for lat, lon in points:
+        func(lat, lon)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+
+def main(n_rows):
+    register = make_register(n_rows, berlin_share=0.05)
+    service = SearchService(register)
+
+    start = time.perf_counter()
+    service.spatial_index
+    build = time.perf_counter() - start
+
+    rng = np.random.default_rng(1)
+    lats, lons = rng.uniform(47.5, 54.8, 100_000), rng.uniform(6.0, 14.9, 100_000)
+    points = list(zip(lats[:2000].tolist(), lons[:2000].tolist()))
+
+    print(f"stations:                 {n_rows}")
+    print(f"KD-tree build:            {build * 1000:8.1f} ms")
+    print(f"nearest k=5, single:      {per_query_us(lambda a, b: service.nearest(a, b, 5), points):8.1f} us/query")
+    print(f"within 1 km, single:      {per_query_us(lambda a, b: service.within_radius(a, b, 1000), points):8.1f} us/query")
+    start = time.perf_counter()
+    service.nearest_batch(lats, lons, k=5)
+    batch = time.perf_counter() - start
+    print(f"nearest k=5, batch 100k:  {batch / len(lats) * 1e6:8.2f} us/query")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,56 @@
+"""
+Candidate scoring and greedy site placement over the Berlin demand grid.
+
+    python -m benchmarks.bench_placement [candidates]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_register
+from config import pdict
+from shared.application import Aggregation as agg
+from shared.application import Coverage as cov
+from shared.application.Preprocessor import normalize_coordinates
+from shared.application.Placement import PlacementOptimizer
+
+
+def timed(func):
+    start = time.perf_counter()
+    ret = func()
+    return ret, time.perf_counter() - start
+
+
+def main(n_candidates):
+    plz_polygons = agg.polygons_from_wkt(pd.read_csv(pdict["file_geodat_plz"], delimiter=";"), "PLZ")
+    districts = agg.polygons_from_wkt(pd.read_csv(pdict["file_geodat_dis"], delimiter=";"), "Bezirk")
+    residents = pd.read_csv(pdict["file_residents"]).rename(columns={"plz": "PLZ", "einwohner": "Einwohner"})
+    areas = cov.plz_areas(plz_polygons, districts, residents)
+    stations = make_register(200_000, berlin_share=0.05)
+    stations, _ = normalize_coordinates(stations[stations["Bundesland"] == "Berlin"].copy())
+
+    optimizer, build = timed(lambda: PlacementOptimizer(
+        areas, stations["Breitengrad"].to_numpy(), stations["Längengrad"].to_numpy()))
+
+    west, south, east, north = areas.total_bounds
+    rng = np.random.default_rng(1)
+    lat, lon = rng.uniform(south, north, n_candidates), rng.uniform(west, east, n_candidates)
+
+    _, score = timed(lambda: optimizer.score(lat, lon))
+    _, lazy = timed(lambda: optimizer.place(25, lat, lon))
+    _, plain = timed(lambda: optimizer.place(25, lat, lon, lazy=False))
+    _, grid = timed(lambda: optimizer.place(25))
+
+    print(f"demand points:            {len(optimizer.weight)}")
+    print(f"stations:                 {len(stations)}")
+    print(f"optimizer build:          {build * 1000:8.1f} ms")
+    print(f"score {n_candidates} candidates:  {score * 1000:8.1f} ms")
+    print(f"lazy greedy k=25:         {lazy * 1000:8.1f} ms")
+    print(f"plain greedy k=25:        {plain * 1000:8.1f} ms")
+    print(f"lazy greedy k=25, grid:   {grid * 1000:8.1f} ms (first call builds the grid matrix)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,73 @@
+"""
+Data-side cost of one Streamlit rerun, before and after the shared state.
+
+    python -m benchmarks.bench_rerun [register rows]
+
+before: every rerun reloaded the (snapshot-cached) datasets, copied the
+frames in Application, built a SearchService and serialized the map layer.
+after:  a get_shared_state lookup plus Application.from_shared_state; the
+map page comes from the background worker's cache.
+"""
+import os
+import sys
+import time
+import tempfile
+
+from config import pdict
+from main import ApplicationManager
+from benchmarks.synthetic import write_register
+from shared.application.DatasetCache import source_stamp
+from charging.application.services.app import Application
+from charging.application.services.Search import SearchService
+from charging.application.services.Visualize import Visualize
+from charging.application.services.State import get_shared_state, invalidate_shared_state
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(n_rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = dict(pdict, picklefolder=os.path.join(tmp, "pickles"),
+                      file_lstations=write_register(os.path.join(tmp, "register.csv"), n_rows))
+        manager = ApplicationManager(config)
+        manager.load_datasets()                         # fill the snapshot cache
+
+        def rerun_before():
+            l_stat, dframe1, dframe2, *_ = manager.load_datasets()
+            app = Application(l_stat, dframe1.copy(), dframe2.copy())
+            SearchService(l_stat)
+            Visualize._layer_cache.clear()
+            app.visualize_service._page(dframe2, 'Einwohner')
+
+        def rerun_after():
+            version = source_stamp(manager.data_loader.source_files(), config)
+            state = get_shared_state(version, manager.load_datasets)
+            app = Application.from_shared_state(state)
+            app.visualize_service.map_html(state.dframe2, 'Einwohner').result()
+
+        invalidate_shared_state()
+        cold = best_of(rerun_after, repeat=1)
+        before = best_of(rerun_before)
+        invalidate_shared_state()
+        rerun_after()
+        after = best_of(rerun_after)
+
+        version = source_stamp(manager.data_loader.source_files(), config)
+        usage = get_shared_state(version, manager.load_datasets).memory_usage()
+
+    print(f"register rows: {n_rows}")
+    print(f"first run (builds shared state): {cold * 1000:8.1f} ms")
+    print(f"rerun before:                    {before * 1000:8.1f} ms")
+    print(f"rerun after:                     {after * 1000:8.1f} ms")
+    print("shared state memory (KB): " + ", ".join(f"{k}={v / 1024:.0f}" for k, v in usage.items()))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,49 @@
+"""
+HelperTools.sortDF scaling, 1k to 1M rows.
+
+    python -m benchmarks.bench_sort
+
+The former pop-min/max loop is quadratic and is only timed up to 4k rows.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.application import HelperTools as ht
+from tests.test_helpertools import sortDF_loop
+
+sortDF = ht.sortDF.__wrapped__
+
+
+def best_of(func, *args, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "PLZ": rng.integers(10115, 14200, n),
+        "Votes": rng.integers(0, 1000, n),
+        "Name": np.char.add("Standort ", np.arange(n).astype(str)),
+    })
+
+
+def main():
+    print(f"{'rows':>9} {'loop':>9} {'sort':>9} {'desc 2key':>10} {'top-10':>9}   (secs)")
+    for n in (1_000, 2_000, 4_000, 10_000, 100_000, 1_000_000):
+        df = frame(n)
+        loop = f"{best_of(sortDF_loop, df, 'Votes', True, repeat=1):9.3f}" if n <= 4_000 else f"{'-':>9}"
+        full = best_of(sortDF, df, "Votes", True)
+        multi = best_of(sortDF, df, ["PLZ", "Votes"], [True, False])
+        topk = best_of(sortDF, df, "Votes", False, 10)
+        print(f"{n:>9} {loop} {full:9.4f} {multi:10.4f} {topk:9.4f}")
+
+
+if __name__ == "__main__":
+    main()
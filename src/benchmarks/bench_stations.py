@@ -0,0 +1,40 @@
+"""
+Memory of the station data: the wide register frame, the frame read_lstat
+returns and the StationStore SearchService keeps.
+
+    python -m benchmarks.bench_stations [rows]
+
+Measured on the national register (all Bundeslaender) and on its Berlin rows.
+Frames are counted deep, including every Python string object; the store as
+its array buffers plus one string object per distinct name and operator.
+"""
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from benchmarks.synthetic import write_register
+from charging.application.services.Stations import StationStore
+from shared.infrastructure.Loader import read_lstat
+
+
+def frame_bytes(dframe):
+    return int(dframe.memory_usage(deep=True, index=True).sum())
+
+
+def main(n_rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_register(os.path.join(tmp, "register.csv"), n_rows)
+        wide = pd.read_csv(path, delimiter=";", encoding="utf-8", low_memory=False)
+        print(f"{'':10s} {'rows':>9s} {'wide frame':>12s} {'read_lstat':>12s} {'store':>12s}")
+        for label, bundesland in (("national", None), ("Berlin", "Berlin")):
+            rows = wide if bundesland is None else wide[wide["Bundesland"] == bundesland]
+            lstat = read_lstat(path, bundesland=bundesland)
+            store, _ = StationStore.from_frame(lstat)
+            print(f"{label:10s} {len(lstat):9d} {frame_bytes(rows) / 2**20:9.1f} MB {frame_bytes(lstat) / 2**20:9.1f} MB "
+                  f"{store.nbytes / 2**20:9.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,58 @@
+"""
+Choropleth payload and render time: one GeoJson per PLZ at full resolution
+(previous Visualize) vs. one simplified, cached FeatureCollection.
+
+    python -m benchmarks.bench_visualize
+"""
+import time
+
+import folium
+import pandas as pd
+from branca.colormap import LinearColormap
+
+from config import pdict
+from shared.application import Preprocessor as prep
+from charging.application.services.Visualize import Visualize
+
+
+def per_row_map(dframe, value_col):
+    """The previous _render_residents_layer without the Streamlit call"""
+    m = folium.Map(location=[52.52, 13.40], zoom_start=10)
+    color_map = LinearColormap(colors=['yellow', 'red'], vmin=dframe[value_col].min(), vmax=dframe[value_col].max())
+    for idx, row in dframe.iterrows():
+        folium.GeoJson(
+            row['geometry'],
+            style_function=lambda x, color=color_map(row[value_col]): {
+                'fillColor': color, 'color': 'black', 'weight': 1, 'fillOpacity': 0.7
+            },
+            tooltip=f"PLZ: {row['PLZ']}, {value_col}: {row[value_col]}"
+        ).add_to(m)
+    color_map.add_to(m)
+    return m
+
+
+def timed_html(build):
+    start = time.perf_counter()
+    html = build().get_root().render()
+    return time.perf_counter() - start, len(html.encode())
+
+
+def main():
+    df_geo = pd.read_csv(pdict["file_geodat_plz"], delimiter=";")
+    gdf_residents = prep.preprop_resid.__wrapped__(pd.read_csv(pdict["file_residents"]), df_geo, pdict)
+
+    print(f"{'variant':>24} {'secs':>7} {'page KB':>9}")
+    secs, size = timed_html(lambda: per_row_map(gdf_residents, "Einwohner"))
+    print(f"{'per-row, full res':>24} {secs:7.3f} {size / 1024:9.1f}")
+
+    for zoom in (10, 12, 14):
+        vis = Visualize(zoom_start=zoom)
+        Visualize._layer_cache.clear()
+        cold, size = timed_html(lambda: vis._choropleth(gdf_residents, "Einwohner"))
+        warm, _ = timed_html(lambda: vis._choropleth(gdf_residents, "Einwohner"))
+        print(f"{f'collection z{zoom} cold':>24} {cold:7.3f} {size / 1024:9.1f}")
+        print(f"{f'collection z{zoom} cached':>24} {warm:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
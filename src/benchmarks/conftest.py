@@ -0,0 +1,49 @@
+"""
+pytest-benchmark suite for the load, preprocess, search and render paths.
+
+    python -m pytest benchmarks                                   # 1k rows
+    python -m pytest benchmarks --rows 1000,100000,1000000        # all sizes
+
+Store a baseline and compare later runs against it; a median more than 25 %
+slower than the baseline fails the run:
+
+    python -m pytest benchmarks --rows 1000,100000 --benchmark-save=baseline
+    python -m pytest benchmarks --rows 1000,100000 --benchmark-compare=*baseline \
+        --benchmark-compare-fail=median:25%
+
+Results are kept per machine under src/.benchmarks. The suite needs
+pytest-benchmark (requirements-dev.txt); without it the benchmark modules
+are not collected. A plain pytest run in src/ only runs tests/ (pytest.ini).
+"""
+import pytest
+
+from benchmarks.synthetic import make_plz_polygons, write_register
+
+
+def pytest_ignore_collect(collection_path, config):
+    """Skips the benchmark modules when the pytest-benchmark plugin is not available"""
+    if collection_path.name.startswith("test_bench_") and not config.pluginmanager.hasplugin("benchmark"):
+        return True
+    return None
+
+
+def pytest_addoption(parser):
+    parser.addoption("--rows", default="1000", help="comma separated register sizes, e.g. 1000,100000,1000000")
+
+
+def pytest_generate_tests(metafunc):
+    if "n_rows" in metafunc.fixturenames:
+        sizes = [int(n) for n in metafunc.config.getoption("rows").split(",")]
+        metafunc.parametrize("n_rows", sizes, ids=[f"{n}rows" for n in sizes], scope="session")
+
+
+@pytest.fixture(scope="session")
+def register_csv(tmp_path_factory, n_rows):
+    """Synthetic register CSV with n_rows rows, written once per session"""
+    return write_register(str(tmp_path_factory.mktemp("register") / f"register_{n_rows}.csv"), n_rows)
+
+
+@pytest.fixture(scope="session")
+def plz_geodata():
+    """190 synthetic PLZ polygons (as many as Berlin has) in geodata_berlin_plz.csv layout"""
+    return make_plz_polygons(190)
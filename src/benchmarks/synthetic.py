@@ -0,0 +1,85 @@
+"""Synthetic, Ladesaeulenregister-shaped test data for the benchmarks"""
+import numpy as np
+import pandas as pd
+
+from shared.infrastructure.Loader import BUNDESLAENDER
+
+# Full column set of the Bundesnetzagentur register, of which the app reads six
+REGISTER_COLUMNS = [
+    "Betreiber", "Anzeigename (Karte)", "Straße", "Hausnummer", "Adresszusatz",
+    "Postleitzahl", "Ort", "Bundesland", "Kreis/kreisfreie Stadt", "Breitengrad",
+    "Längengrad", "Inbetriebnahmedatum", "Nennleistung Ladeeinrichtung [kW]",
+    "Art der Ladeeinrichung", "Anzahl Ladepunkte",
+    "Steckertypen1", "P1 [kW]", "Public Key1", "Steckertypen2", "P2 [kW]", "Public Key2",
+    "Steckertypen3", "P3 [kW]", "Public Key3", "Steckertypen4", "P4 [kW]", "Public Key4",
+]
+
+BERLIN_PLZ = np.array([10115, 10117, 10119, 10178, 10243, 10245, 10437, 10551, 10585, 10777,
+                       10827, 10961, 12043, 12059, 12435, 12489, 12555, 12679, 13055, 13347,
+                       13357, 13403, 13585, 14050, 14163, 14193])
+
+
+def _decimal_comma(values, fmt):
+    return np.char.replace(np.char.mod(fmt, values), ".", ",")
+
+
+def make_register(n_rows, berlin_share=0.05, seed=0):
+    """DataFrame shaped like the national register with about berlin_share rows in Berlin"""
+    rng     = np.random.default_rng(seed)
+    berlin  = rng.random(n_rows) < berlin_share
+    states  = np.array(BUNDESLAENDER.categories)
+    state   = np.where(berlin, "Berlin", rng.choice(states[states != "Berlin"], n_rows))
+    plz     = np.where(berlin, rng.choice(BERLIN_PLZ, n_rows), rng.integers(1067, 99998, n_rows))
+    lat     = np.where(berlin, rng.uniform(52.40, 52.62, n_rows), rng.uniform(47.3, 54.9, n_rows))
+    lon     = np.where(berlin, rng.uniform(13.15, 13.70, n_rows), rng.uniform(5.9, 15.0, n_rows))
+    kw      = rng.choice([3.7, 11.0, 22.0, 50.0, 150.0, 300.0], n_rows)
+
+    data = {
+        "Betreiber":                            rng.choice(["EnBW", "Allego", "Vattenfall", "Tesla", "Ionity"], n_rows),
+        "Anzeigename (Karte)":                  np.char.add("Ladestation ", np.arange(n_rows).astype(str)),
+        "Straße":                               "Hauptstraße",
+        "Hausnummer":                           rng.integers(1, 200, n_rows).astype(str),
+        "Adresszusatz":                         "",
+        "Postleitzahl":                         np.char.zfill(plz.astype(str), 5),
+        "Ort":                                  np.where(berlin, "Berlin", "Musterstadt"),
+        "Bundesland":                           state,
+        "Kreis/kreisfreie Stadt":               np.where(berlin, "Kreisfreie Stadt Berlin", "Landkreis Muster"),
+        "Breitengrad":                          _decimal_comma(lat, "%.7f"),
+        "Längengrad":                           _decimal_comma(lon, "%.7f"),
+        "Inbetriebnahmedatum":                  "01.06.2021",
+        "Nennleistung Ladeeinrichtung [kW]":    _decimal_comma(kw, "%.2f"),
+        "Art der Ladeeinrichung":               np.where(kw > 22, "Schnellladeeinrichtung", "Normalladeeinrichtung"),
+        "Anzahl Ladepunkte":                    rng.integers(1, 4, n_rows),
+    }
+    for i in range(1, 5):
+        data[f"Steckertypen{i}"]    = "AC Steckdose Typ 2"
+        data[f"P{i} [kW]"]          = _decimal_comma(kw, "%.2f")
+        data[f"Public Key{i}"]      = ""
+    return pd.DataFrame(data, columns=REGISTER_COLUMNS)
+
+
+def write_register(path, n_rows, berlin_share=0.05, seed=0):
+    """Writes a synthetic register CSV with the same delimiter and decimal format as the original"""
+    make_register(n_rows, berlin_share, seed).to_csv(path, sep=";", index=False, encoding="utf-8")
+    return path
+
+
+def make_plz_polygons(n_polygons, seed=0):
+    """
+    PLZ polygon table shaped like geodata_berlin_plz.csv (PLZ; WKT geometry):
+    a grid of squares over Berlin whose first codes are BERLIN_PLZ, so the
+    synthetic register stations find their polygons
+    """
+    side    = int(np.ceil(np.sqrt(n_polygons)))
+    dlat    = (52.62 - 52.40) / side
+    dlon    = (13.70 - 13.15) / side
+    row, col = np.divmod(np.arange(n_polygons), side)
+    south   = 52.40 + row * dlat
+    west    = 13.15 + col * dlon
+    extra   = np.setdiff1d(np.arange(10000, 10000 + 2 * n_polygons + len(BERLIN_PLZ)), BERLIN_PLZ)
+    codes   = np.concatenate([BERLIN_PLZ, extra])[:n_polygons]
+    rng     = np.random.default_rng(seed)
+    codes   = rng.permutation(codes)
+    wkt     = [f"POLYGON (({w} {s}, {w + dlon} {s}, {w + dlon} {s + dlat}, {w} {s + dlat}, {w} {s}))"
+               for s, w in zip(south.tolist(), west.tolist())]
+    return pd.DataFrame({"PLZ": codes, "geometry": wkt})
@@ -0,0 +1,28 @@
+"""Loading and preprocessing of the charging station register"""
+import pytest
+
+from config import pdict
+from main import DataLoader
+from shared.application import Preprocessor as prep
+
+
+@pytest.fixture(scope="session")
+def lstat(register_csv):
+    return DataLoader(dict(pdict, file_lstations=register_csv)).load_charging_stations()
+
+
+def test_load_charging_stations(benchmark, register_csv):
+    loader = DataLoader(dict(pdict, file_lstations=register_csv))
+    result = benchmark.pedantic(loader.load_charging_stations, rounds=3, iterations=1)
+    assert (result["Bundesland"] == "Berlin").all()
+
+
+def test_preprop_lstat(benchmark, lstat, plz_geodata):
+    result = benchmark(prep.preprop_lstat, lstat, plz_geodata, pdict)
+    assert "geometry" in result
+
+
+def test_count_plz_occurrences(benchmark, lstat, plz_geodata):
+    stations = prep.preprop_lstat(lstat, plz_geodata, pdict)
+    result = benchmark(prep.count_plz_occurrences, stations)
+    assert result["Number"].sum() == len(stations)
@@ -0,0 +1,27 @@
+"""Choropleth construction from the per-PLZ station counts"""
+import pytest
+
+from charging.application.services.Visualize import Visualize
+from config import pdict
+from main import DataLoader
+from shared.application import Aggregation as agg
+
+
+@pytest.fixture(scope="session")
+def stations_per_plz(register_csv, plz_geodata):
+    lstat = DataLoader(dict(pdict, file_lstations=register_csv)).load_charging_stations()
+    return agg.aggregate_lstat(lstat, agg.polygons_from_wkt(plz_geodata, "PLZ"), "PLZ")
+
+
+def test_choropleth_cold(benchmark, stations_per_plz):
+    vis = Visualize()
+    benchmark.pedantic(vis._choropleth, args=(stations_per_plz, "Number"),
+                       setup=Visualize._layer_cache.clear, rounds=10)
+    assert not vis.last_render["cache_hit"]
+
+
+def test_choropleth_cached(benchmark, stations_per_plz):
+    vis = Visualize()
+    vis._choropleth(stations_per_plz, "Number")
+    benchmark(vis._choropleth, stations_per_plz, "Number")
+    assert vis.last_render["cache_hit"]
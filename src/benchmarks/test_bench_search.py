@@ -0,0 +1,36 @@
+"""Postal code search on the Berlin rows of the register"""
+import itertools
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import BERLIN_PLZ
+from charging.application.services.Batch import BatchQuery
+from charging.application.services.Search import SearchService
+from config import pdict
+from main import DataLoader
+
+
+@pytest.fixture(scope="session")
+def search_service(register_csv):
+    return SearchService(DataLoader(dict(pdict, file_lstations=register_csv)).load_charging_stations())
+
+
+def test_build_search_index(benchmark, register_csv):
+    lstat = DataLoader(dict(pdict, file_lstations=register_csv)).load_charging_stations()
+    benchmark(SearchService, lstat)
+
+
+def test_search_by_postal_code(benchmark, search_service):
+    codes = itertools.cycle(str(plz) for plz in BERLIN_PLZ)
+    result = benchmark(lambda: search_service.search_by_postal_code(next(codes)))
+    assert isinstance(result, list)
+
+
+def test_batch_nearest(benchmark, search_service):
+    """Bulk nearest-station lookups as run by cli.py, per 10k points"""
+    rng = np.random.default_rng(0)
+    lat, lon = rng.uniform(52.35, 52.65, 10_000), rng.uniform(13.1, 13.7, 10_000)
+    batch = BatchQuery(search_service)
+    result = benchmark(batch.nearest, lat, lon, 3)
+    assert result["Query"].nunique() == 10_000
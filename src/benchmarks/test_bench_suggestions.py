@@ -0,0 +1,12 @@
+"""Suggestion inserts into the SQLite store"""
+import itertools
+
+from charging.application.services.Suggestion import SuggestionManager
+from charging.application.services.SuggestionStore import SQLiteSuggestionStore
+
+
+def test_add_suggestion(benchmark, tmp_path):
+    manager = SuggestionManager(SQLiteSuggestionStore(str(tmp_path / "suggestions.sqlite")))
+    ids = itertools.count()
+    added = benchmark(lambda: manager.add_suggestion("10115", f"Site {next(ids)}", 52.53, 13.38, "Parking lot"))
+    assert added
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+from shared.application.Geo import to_xyz, chord_to_arc
+from shared.application.Metrics import timed
+
+
+class BatchQuery:
+    """
+    Bulk lookups against a SearchService. Every query method takes whole
+    arrays and returns one frame with a row per (query, station), grouped by
+    query in input order. Query is the position in the input plus offset, so
+    the results of consecutive chunks line up with the input rows; queries
+    without a result keep one row with empty station columns.
+    """
+
+    def __init__(self, search_service):
+        self.search = search_service
+
+    def _result(self, n_queries, query, station, offset, **columns):
+        """Result frame of the (query, station) pairs plus per-pair columns; returns it and the query positions"""
+        missing = np.setdiff1d(np.arange(n_queries), query)
+        order = np.argsort(np.concatenate([query, missing]), kind="stable")
+        query = np.concatenate([query, missing])[order]
+        station = np.concatenate([station, np.full(len(missing), -1)])[order]
+        found = station >= 0
+
+        ret = pd.DataFrame({"Query": query + offset})
+        for name, values in columns.items():
+            ret[name] = np.concatenate([np.asarray(values, dtype="float64"), np.full(len(missing), np.nan)])[order]
+        stations = self.search.stations
+        names = np.full(len(station), None, dtype=object)
+        lat, lon = np.full(len(station), np.nan), np.full(len(station), np.nan)
+        names[found] = stations.names_at(station[found])
+        lat[found] = stations.lat[station[found]]
+        lon[found] = stations.lon[station[found]]
+        ret["Name"] = pd.array(names, dtype="string")
+        ret["Latitude"] = lat
+        ret["Longitude"] = lon
+        return ret, query
+
+    @timed()
+    def postal_codes(self, postal_codes, offset=0):
+        """Stations per postal code; unparsable codes match nothing"""
+        codes = pd.to_numeric(pd.Series(postal_codes), errors="coerce")
+        codes = codes.where(codes == codes.round()).fillna(-1).to_numpy(dtype=np.int64)
+        query, station = self.search.postal_code_batch(codes)
+        ret, query = self._result(len(codes), query, station, offset)
+        ret.insert(1, "PLZ", pd.Series(codes[query]).where(codes[query] >= 0).astype("Int64"))
+        return ret
+
+    def _points(self, lat, lon, query, station, distance, offset, **columns):
+        ret, query = self._result(len(lat), query, station, offset, **columns, Distance_m=distance)
+        ret.insert(1, "Query_latitude", lat[query])
+        ret.insert(2, "Query_longitude", lon[query])
+        if "Rank" in ret:
+            ret["Rank"] = ret["Rank"].astype("Int64")
+        return ret
+
+    @staticmethod
+    def _coordinates(lat, lon):
+        lat, lon = np.asarray(lat, dtype="float64"), np.asarray(lon, dtype="float64")
+        return lat, lon, np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+
+    @timed()
+    def nearest(self, lat, lon, k=5, offset=0):
+        """The k nearest stations of every point, nearest first; points without coordinates match nothing"""
+        lat, lon, valid = self._coordinates(lat, lon)
+        k = min(k, len(self.search.stations))
+        if k < 1 or not valid.size:
+            empty = np.empty(0, dtype=np.int64)
+            return self._points(lat, lon, empty, empty, empty, offset, Rank=empty)
+        distance, station = self.search.nearest_batch(lat[valid], lon[valid], k=k)
+        query = np.repeat(valid, k)
+        rank = np.tile(np.arange(1, k + 1), len(valid))
+        return self._points(lat, lon, query, station.ravel(), distance.ravel(), offset, Rank=rank)
+
+    @timed()
+    def within_radius(self, lat, lon, radius_m, offset=0):
+        """All stations within radius_m metres of every point, nearest first"""
+        lat, lon, valid = self._coordinates(lat, lon)
+        if not len(self.search.stations) or not valid.size:
+            empty = np.empty(0, dtype=np.int64)
+            return self._points(lat, lon, empty, empty, empty, offset)
+        hits = self.search.within_radius_batch(lat[valid], lon[valid], radius_m)
+        counts = np.fromiter((len(h) for h in hits), dtype=np.int64, count=len(hits))
+        query = np.repeat(valid, counts)
+        station = np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+        distance = chord_to_arc(np.linalg.norm(
+            self.search.spatial_index.data[station] - to_xyz(lat[query], lon[query]).reshape(-1, 3), axis=1))
+        order = np.lexsort((distance, query))
+        return self._points(lat, lon, query[order], station[order], distance[order], offset)
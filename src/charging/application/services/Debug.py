@@ -0,0 +1,30 @@
+import pandas as pd
+import streamlit as st
+from shared.application.Metrics import MetricsRegistry
+
+
+class DebugPanel:
+    """Sidebar view of the metrics registry, with JSON and Prometheus exports"""
+
+    def __init__(self, metrics: MetricsRegistry):
+        self.metrics = metrics
+
+    def frame(self) -> pd.DataFrame:
+        """One row per stage: calls, mean/max latency in ms and peak memory in MB"""
+        rows = [
+            {
+                "Stage": name,
+                "Calls": m["count"],
+                "Mean ms": (m["mean_s"] or 0) * 1000,
+                "Max ms": m["max_s"] * 1000,
+                "Peak MB": m["peak_bytes"] / 2**20 if m["peak_bytes"] is not None else None,
+            }
+            for name, m in self.metrics.snapshot().items()
+        ]
+        return pd.DataFrame(rows, columns=["Stage", "Calls", "Mean ms", "Max ms", "Peak MB"])
+
+    def render(self):
+        with st.sidebar.expander("Metrics"):
+            st.dataframe(self.frame().round(2), hide_index=True)
+            st.download_button("metrics.json", self.metrics.to_json(indent=2), file_name="metrics.json")
+            st.download_button("metrics.prom", self.metrics.to_prometheus(), file_name="metrics.prom")
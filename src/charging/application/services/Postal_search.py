@@ -1,48 +1,131 @@
-import folium
-from folium.plugins import MarkerCluster
 import streamlit as st
-import pandas as pd
-from streamlit_folium import folium_static
-from streamlit_folium import st_folium
-from branca.colormap import LinearColormap
-from typing import Any, Dict, List
-import logging
+import numpy as np
 from charging.application.services.Search import SearchService
 
+# Markers are built in the browser from [lat, lon, name] rows
+MARKER_CALLBACK = """
+function (row) {
+    var marker = L.marker(new L.LatLng(row[0], row[1]));
+    marker.bindPopup(row[2] + " Is ready for you)");
+    return marker;
+}
+"""
+
+
+def bounds_to_box(bounds):
+    """st_folium bounds to (south, west, north, east), or None"""
+    try:
+        return (bounds["_southWest"]["lat"], bounds["_southWest"]["lng"],
+                bounds["_northEast"]["lat"], bounds["_northEast"]["lng"])
+    except (KeyError, TypeError):
+        return None
+
+
+def expand_box(box, factor):
+    """Grows a box around its centre by factor in both directions"""
+    south, west, north, east = box
+    dlat, dlon = (north - south) * (factor - 1) / 2, (east - west) * (factor - 1) / 2
+    return (south - dlat, west - dlon, north + dlat, east + dlon)
+
+
+def box_contains(outer, inner):
+    return (outer[0] <= inner[0] and outer[1] <= inner[1] and
+            outer[2] >= inner[2] and outer[3] >= inner[3])
+
+
+def in_box(lat, lon, box):
+    """Mask of the points inside a (south, west, north, east) box"""
+    south, west, north, east = box
+    return (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+
 
 class Search:
     """Handles searching of charging stations"""
 
-    def search_by_postal_code(self, l_stat):
-        
+    # The stations sent to the map cover the viewport grown by this factor, so
+    # panning within it keeps the map as it is
+    WINDOW_FACTOR = 2.0
 
-         
-        # print("l_stat:", l_stat)
+    def __init__(self, search_index=None):
+        self.search_index = search_index
+
+    def _window(self, map_key):
+        """
+        Area whose stations go to the map, plus the view to open the map at.
+        Both only change once the viewport returned by st_folium leaves the
+        window; until then the map script stays identical and is not rebuilt.
+        """
+        state_key = f"{map_key}_window"
+        window, view = st.session_state.get(state_key, (None, None))
+        returned = st.session_state.get(map_key) or {}
+        viewport = bounds_to_box(returned.get("bounds"))
+
+        if viewport is not None and (window is None or not box_contains(window, viewport)):
+            window = expand_box(viewport, self.WINDOW_FACTOR)
+            center = returned.get("center") or {}
+            view = ((center.get("lat"), center.get("lng")), returned.get("zoom"))
+            st.session_state[state_key] = (window, view)
+        return window, view
+
+    def render_station_map(self, names, lat, lon, map_key):
+        """Clustered station map limited to the current viewport window"""
+        import folium
+        from folium.plugins import FastMarkerCluster
+        from streamlit_folium import st_folium
+
+        window, view = self._window(map_key)
+        if window is not None:
+            visible = in_box(lat, lon, window)
+            names, lat, lon = names[visible], lat[visible], lon[visible]
+
+        if view is not None and None not in view[0] and view[1] is not None:
+            location, zoom = view
+        else:
+            location, zoom = [float(np.mean(lat)), float(np.mean(lon))], 13
+        m = folium.Map(location=location, zoom_start=zoom)
+        FastMarkerCluster(
+            data=list(zip(lat.tolist(), lon.tolist(), names.tolist())),
+            callback=MARKER_CALLBACK,
+        ).add_to(m)
+        st_folium(m, width=700, height=500, key=map_key, returned_objects=["bounds", "center", "zoom"])
+
+    def search_by_postal_code(self, l_stat):
         st.sidebar.markdown("### Search Charging Stations by Postal Code")
         postal_code = st.sidebar.text_input("Enter Postal Code (PLZ)", "")
+        # Reuse the shared index; building one per rerun would rescan l_stat every time
+        search_service = self.search_index or SearchService(l_stat)
+        rings = st.sidebar.number_input("Include neighbouring PLZ (rings)", 0, 3, 0) \
+            if search_service.adjacency is not None else 0
         search_button = st.sidebar.button("Search")
-        search_service = SearchService(l_stat)
-        print('searchService', search_service)
 
         if postal_code:
             st.write(f"Searching for postal code: {postal_code}")
             stations = search_service.search_by_postal_code(postal_code)
-            print('stationData', stations)
             st.write(f"those are the stations in postal code :{postal_code}")
-            st.write(pd.DataFrame(stations))
-            print("station are as follow" )
-            print(stations)
-            # st.write("Debug - Stations Data:", stations)   # Debug output
-            if stations:
-                m = folium.Map(location=[52.5200, 13.4050], zoom_start=12)
-                for station in stations:
-                    folium.Marker(
-                        location=station["location"],
-                        # popup=f"{station['name']} ({station['status']})",
-                        # popup=f"Is ready for you)",
-                        popup=f"{station['name']} Is ready for you)",
-                        # icon=folium.Icon(color="green" if station["status"] == "available" else "red"),
-                    ).add_to(m)
-                st_folium(m, width=700, height=500)
+            code = stations[0].plz if stations else None
+            if code is None and rings and postal_code.strip().isdigit():
+                code = int(postal_code)
+
+            if code is not None and rings:
+                self._show_neighbourhood(search_service, code, rings)
+            elif stations:
+                # Table and map read the store's arrays; no per-station dicts are built
+                start, stop = search_service.stations.slice(code)
+                st.write(search_service.stations.frame(slice(start, stop)))
+                names, lat, lon = search_service.postal_code_arrays(code)
+                self.render_station_map(names, lat, lon, map_key=f"station_map_{code}")
             else:
                 st.warning("No charging stations found for this postal code.")
+
+    def _show_neighbourhood(self, search_service, code, rings):
+        """Stations of the PLZ and its neighbours, with the ring each station's PLZ is in"""
+        positions, ring = search_service.neighbourhood_positions(code, rings)
+        if not len(positions):
+            st.warning("No charging stations found in this postal code or its neighbours.")
+            return
+        stations = search_service.stations
+        table = stations.frame(positions)
+        table["Ring"] = ring
+        st.write(table)
+        self.render_station_map(stations.names_at(positions), stations.lat[positions], stations.lon[positions],
+                                map_key=f"station_map_{code}_{rings}")
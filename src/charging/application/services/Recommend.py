@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from charging.application.services.Suggestion import SuggestionManager
+
+
+class Recommendation:
+    """Scores the submitted suggestions and recommends new charger sites"""
+
+    def __init__(self, optimizer, suggestion_manager: SuggestionManager):
+        self.optimizer = optimizer
+        self.suggestion_manager = suggestion_manager
+
+    def display_recommendation_page(self):
+        """Suggestions ranked by the uncovered residents they would reach, plus the best k sites"""
+        radius = int(self.optimizer.radius_m)
+        st.markdown("### Recommended New Charging Sites")
+        st.write(f"Score: residents within {radius} m that have no charging station within {radius} m.")
+
+        suggestions = self.suggestion_manager.get_suggestions()
+        if not suggestions.empty:
+            st.markdown("#### Submitted suggestions")
+            scored = self.optimizer.score_suggestions(suggestions)
+            st.dataframe(scored[["Location Name", "Postal Code", "Votes", "Score", "Population", "Nearest_station_m"]]
+                         .round(0), hide_index=True)
+
+        k = st.number_input("Number of new sites", min_value=1, max_value=50, value=10, step=1)
+        include = st.checkbox("Include submitted suggestions as candidates", value=not suggestions.empty)
+        if include and not suggestions.empty:
+            grid_lat, grid_lon = self.optimizer.candidates()
+            lat = np.concatenate([suggestions["Latitude"].to_numpy(dtype="float64"), grid_lat])
+            lon = np.concatenate([suggestions["Longitude"].to_numpy(dtype="float64"), grid_lon])
+            picks = self.optimizer.place(int(k), lat, lon)
+            names = suggestions["Location Name"].tolist()
+            picks["Site"] = [names[i] if i < len(names) else "Grid cell" for i in picks["Candidate"]]
+        else:
+            picks = self.optimizer.place(int(k))
+            picks["Site"] = "Grid cell"
+
+        st.markdown(f"#### Best {len(picks)} sites (greedy maximum coverage)")
+        st.dataframe(picks[["Site", "Latitude", "Longitude", "Gain", "Covered"]].round(
+            {"Latitude": 5, "Longitude": 5, "Gain": 0, "Covered": 0}), hide_index=True)
+        self._render_sites(picks)
+
+    def _render_sites(self, picks: pd.DataFrame):
+        if picks.empty:
+            return
+        import folium
+        from streamlit_folium import folium_static
+
+        m = folium.Map(location=[52.52, 13.40], zoom_start=10)
+        for row in picks.to_dict("records"):
+            folium.Circle(
+                location=[row["Latitude"], row["Longitude"]],
+                radius=self.optimizer.radius_m,
+                tooltip=f"{row['Site']}: +{row['Gain']:.0f}",
+                color="green",
+                fill=True,
+            ).add_to(m)
+        folium_static(m, width=800, height=600)
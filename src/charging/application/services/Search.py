@@ -1,28 +1,146 @@
-import folium
-from folium.plugins import MarkerCluster
-import streamlit as st
-import pandas as pd
-from streamlit_folium import folium_static
-from streamlit_folium import st_folium
-from branca.colormap import LinearColormap
-from typing import Any, Dict, List
 import logging
+import numpy as np
+from shared.application.Geo import to_xyz, chord_to_arc, arc_to_chord
+from shared.application.Metrics import timed
+from charging.application.services.Stations import StationStore
 
 # SOLID Refactor
 
 class SearchService:
+    """
+    Postal code lookup over a PLZ-sorted StationStore of the stations, plus
+    nearest-station and radius queries over a KD-tree of the same rows. With
+    a PlzGraph the postal code lookup extends to neighbouring PLZ.
+    """
 
-    def __init__(self, df_lstat):
-        self.df_lstat = df_lstat
+    def __init__(self, df_lstat, adjacency=None):
         # Configure logging
         logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+        self.adjacency = adjacency
+        self.df_lstat = df_lstat
+
+    @property
+    def df_lstat(self):
+        """The station dataframe the index was built from, as passed in"""
+        return self._df_lstat
+
+    @df_lstat.setter
+    def df_lstat(self, df_lstat):
+        """Replacing the dataframe rebuilds the index"""
+        self._build_index(df_lstat)
+        self._df_lstat = df_lstat
+
+    def stations_frame(self):
+        """The indexed stations (Name, Operator, PLZ, Latitude, Longitude) in PLZ order"""
+        return self.stations.frame(slice(None))
+
+    def _build_index(self, df_lstat):
+        """
+        Builds the station store once (see StationStore): stations with valid
+        coordinates sorted by PLZ, so a postal code lookup is two binary
+        searches plus a slice. The caller's dataframe is only read, never modified.
+        """
+        self.stations, rejected = StationStore.from_frame(df_lstat)
+        # Rows with unparsable coordinates can never be returned, so they are not stored
+        if rejected:
+            logging.warning(f"{rejected} station(s) without valid coordinates excluded from the index")
+        self._tree = None
 
+    @property
+    def spatial_index(self):
+        """
+        KD-tree over the stations projected to 3D cartesian metres. Euclidean
+        (chord) distances there are monotonic in great-circle distance, so
+        neighbour order is exact anywhere in Germany. Built on first use.
+        """
+        if self._tree is None:
+            from scipy.spatial import cKDTree
+            self._tree = cKDTree(to_xyz(self.stations.lat, self.stations.lon))
+        return self._tree
+
+    def nearest_batch(self, lats, lons, k=5):
+        """
+        k nearest stations for many points at once.
+        :return: (distances in metres, station positions), both shaped (n_points, k);
+                 missing neighbours have distance inf and position len(index).
+        """
+        chord, idx = self.spatial_index.query(to_xyz(lats, lons).reshape(-1, 3), k=k)
+        chord, idx = np.asarray(chord).reshape(-1, k), np.asarray(idx).reshape(-1, k)
+        return chord_to_arc(chord), idx
+
+    def within_radius_batch(self, lats, lons, radius_m):
+        """Station positions within radius_m metres, one array per point"""
+        points = to_xyz(lats, lons).reshape(-1, 3)
+        hits = self.spatial_index.query_ball_point(points, r=arc_to_chord(radius_m), return_sorted=False)
+        return [np.asarray(h, dtype=np.int64) for h in hits]
+
+    @timed()
+    def nearest(self, lat, lon, k=5):
+        """
+        The k stations closest to (lat, lon).
+        :return: stations like search_by_postal_code with their distance_m, nearest first.
+        """
+        if len(self.stations) == 0 or k < 1:
+            return []
+        dist, idx = self.nearest_batch([lat], [lon], k=min(k, len(self.stations)))
+        return [self.stations.station(i, d) for d, i in zip(dist[0], idx[0])]
+
+    @timed()
+    def within_radius(self, lat, lon, radius_m):
+        """All stations within radius_m metres of (lat, lon), nearest first"""
+        if len(self.stations) == 0:
+            return []
+        idx = self.within_radius_batch([lat], [lon], radius_m)[0]
+        point = to_xyz(lat, lon)
+        dist = chord_to_arc(np.linalg.norm(self.spatial_index.data[idx] - point, axis=1))
+        order = np.argsort(dist, kind="stable")
+        return [self.stations.station(i, d) for d, i in zip(dist[order], idx[order])]
+
+    def postal_code_batch(self, postal_codes):
+        """
+        Stations of many postal codes at once.
+        :return: (query positions, station positions), grouped by query in input order;
+                 postal codes without stations do not appear.
+        """
+        codes       = np.asarray(postal_codes, dtype=np.int64)
+        start       = np.searchsorted(self.stations.plz, codes, side="left")
+        counts      = np.searchsorted(self.stations.plz, codes, side="right") - start
+        query       = np.repeat(np.arange(len(codes)), counts)
+        first       = np.repeat(start - (np.cumsum(counts) - counts), counts)
+        return query, first + np.arange(len(query))
+
+    def neighbourhood_positions(self, postal_code, rings=1):
+        """
+        Stations of a PLZ and the PLZ up to rings steps away (see PlzGraph.ring).
+        :return: (station positions, ring of each station), the PLZ itself first;
+                 without a graph only the PLZ itself.
+        """
+        if self.adjacency is None:
+            codes, ring = np.array([int(postal_code)]), np.zeros(1, dtype=np.int64)
+        else:
+            codes, ring = self.adjacency.ring(int(postal_code), rings)
+        query, station = self.postal_code_batch(codes)
+        return station, ring[query]
+
+    @timed()
+    def search_neighbourhood(self, postal_code, rings=1):
+        """Stations like search_by_postal_code for a PLZ and its neighbours up to rings steps away, nearest ring first"""
+        station, _ = self.neighbourhood_positions(postal_code, rings)
+        return [self.stations.station(i) for i in station]
+
+    def postal_code_arrays(self, postal_code):
+        """Names, latitudes and longitudes of one PLZ; the coordinates are views into the store"""
+        start, stop = self.stations.slice(int(postal_code))
+        return self.stations.names_at(slice(start, stop)), self.stations.lat[start:stop], \
+            self.stations.lon[start:stop]
+
+    @timed()
     def search_by_postal_code(self, postal_code):
         """
         Searches the dataframe for stations by a given postal code.
         
         :param postal_code: The postal code to search for (string, int, or float).
-        :return: A list of station dictionaries with name, status, and location.
+        :return: A list of Station records (name, status, location; indexable like dicts).
         """
         try:
             # Validate the postal code
@@ -32,34 +150,11 @@ class SearchService:
 
             # Convert postal code to an integer for comparison
             postal_code = int(float(postal_code))
-            logging.info(f"Searching for postal code: {postal_code}")
-            
-            # Normalize the postal codes in the dataframe
-            self.df_lstat["Postleitzahl"] = self.df_lstat["Postleitzahl"].fillna(0).astype(float).astype(int)
-            logging.info(f"Unique postal codes in the dataset: {self.df_lstat['Postleitzahl'].unique()}")
-
-            # Filter the dataframe for the given postal code
-            filtered_df = self.df_lstat[self.df_lstat["Postleitzahl"] == postal_code]
-            logging.info(f"Filtered dataframe:\n{filtered_df}")
-
-            # Prepare the list of stations
-            stations = []
-            for _, row in filtered_df.iterrows():
-                try:
-                    lat = float(str(row["Breitengrad"]).replace(',', '.'))
-                    lon = float(str(row["Längengrad"]).replace(',', '.'))
-                    stations.append({
-                        "name": row["Anzeigename (Karte)"],
-                        "status": "Available",  # Assuming default status as "Available"
-                        "location": (lat, lon),
-                    })
-                except ValueError as e:
-                    logging.error(f"Error parsing location for row: {row}\n{e}")
-
-            return stations
+            logging.debug(f"Searching for postal code: {postal_code}")
+
+            start, stop = self.stations.slice(postal_code)
+            return [self.stations.station(i) for i in range(start, stop)]
 
         except Exception as e:
             logging.error(f"An unexpected error occurred: {e}")
             return []
-     
-
@@ -0,0 +1,91 @@
+import streamlit as st
+from charging.application.services.Search import SearchService
+from charging.application.services.Visualize import Visualize, LAYERS
+from charging.application.services.SuggestionStore import SQLiteSuggestionStore
+from shared.application.Placement import PlacementOptimizer
+
+
+class SharedState:
+    """
+    Datasets and derived objects shared read-only by every session of the
+    process: the preprocessed frames, the SearchService index, the coverage
+    model, the placement optimizer and the choropleth layers. Nothing in here may be modified after construction.
+    """
+
+    def __init__(self, version, l_stat, dframe1, dframe2, coverage=None, traffic=None, adjacency=None):
+        self.version = version
+        self.coverage = coverage
+        self.traffic = traffic
+        self.adjacency = adjacency
+        self.dframe1 = dframe1
+        self.dframe2 = dframe2
+        # Only the StationStore of the search index is kept, not the station frame
+        self.search_index = SearchService(l_stat, adjacency)
+        self.search_index.spatial_index
+
+        # Queue the map pages of all layers now, the default one first; the background worker builds them
+        # while the first session renders its sidebar, so no session pays for them
+        self.dframe1.attrs["data_version"] = f"{version}:lstat"
+        self.dframe2.attrs["data_version"] = f"{version}:resid"
+        self.visualize_service = Visualize()
+        layers = [(self.dframe2, *LAYERS["Residents"]), (self.dframe1, *LAYERS["Charging_Stations"])]
+        if coverage is not None:
+            coverage.version = version
+            layers.append((coverage.compute().layer(), *LAYERS["Coverage"]))
+        if traffic is not None:
+            self.traffic.attrs["data_version"] = f"{version}:traffic"
+            layers.append((self.traffic, *LAYERS["Traffic"]))
+        self.visualize_service.prefetch(layers)
+
+        # Demand grid and candidate matrix of the site recommendations
+        self.placement = None
+        if coverage is not None:
+            self.placement = PlacementOptimizer(coverage.areas, self.search_index.stations.lat,
+                                                self.search_index.stations.lon,
+                                                traffic=coverage.plz_traffic)
+            self.placement.place(1)
+
+    def memory_usage(self):
+        """Bytes held per component (deep for frames, buffers for the index and layers)"""
+        usage = {
+            name: int(frame.memory_usage(deep=True).sum())
+            for name, frame in (("dframe1", self.dframe1), ("dframe2", self.dframe2), ("traffic", self.traffic))
+            if frame is not None
+        }
+        usage["search_index"] = self.search_index.stations.nbytes + self.search_index.spatial_index.data.nbytes
+        if self.adjacency is not None:
+            usage["adjacency"] = self.adjacency.codes.nbytes + self.adjacency.indptr.nbytes + \
+                self.adjacency.indices.nbytes
+        with Visualize._lock:
+            layers, pages = list(Visualize._layer_cache.values()), list(Visualize._html_cache.values())
+        usage["map_layers"] = sum(len(geojson) for geojson in layers) + \
+            sum(len(page.result()) for page in pages if page.done() and not page.exception())
+        usage["total"] = sum(usage.values())
+        return usage
+
+
+# -----------------------------------------------------------------------------
+@st.cache_resource(show_spinner="Loading datasets...", max_entries=1)
+def _shared_state(version, _loader):
+    return SharedState(version, *_loader())
+
+
+def get_shared_state(version, loader):
+    """
+    Process-wide SharedState for a data version. loader() returning
+    (l_stat, dframe1, dframe2[, coverage, traffic, adjacency]) only runs when the version is not cached yet.
+    """
+    return _shared_state(version, loader)
+
+
+def invalidate_shared_state():
+    """Drops the shared state; the next get_shared_state call rebuilds it"""
+    _shared_state.clear()
+    Visualize._layer_cache.clear()
+    Visualize._html_cache.clear()
+
+
+@st.cache_resource
+def get_suggestion_store(path):
+    """One suggestion store per database file, shared by all sessions"""
+    return SQLiteSuggestionStore(path)
@@ -0,0 +1,190 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from shared.application.Preprocessor import parse_coordinates
+
+try:
+    import pyarrow as pa
+except ImportError:                     # distinct strings are then kept as Python objects
+    pa = None
+
+
+# -----------------------------------------------------------------------------
+def _strings(values):
+    """Distinct strings in one Arrow buffer (no Python object per string), else an object array"""
+    return pa.array(values, type=pa.string()) if pa is not None else np.asarray(values, dtype=object)
+
+
+def _strings_nbytes(values):
+    if pa is not None and isinstance(values, pa.Array):
+        return values.nbytes
+    return values.nbytes + sum(sys.getsizeof(s) for s in values)
+
+
+def _decode(codes, values, idx):
+    """Value for one position, or an object array for an index array or slice; code -1 is None"""
+    if isinstance(idx, (int, np.integer)):
+        code = codes[idx]
+        if code < 0:
+            return None
+        return values[code].as_py() if pa is not None and isinstance(values, pa.Array) else values[code]
+    codes = np.asarray(codes[idx])
+    missing = codes < 0
+    if pa is not None and isinstance(values, pa.Array):
+        return values.take(pa.array(codes, mask=missing)).to_numpy(zero_copy_only=False)
+    ret = values.take(np.maximum(codes, 0)) if len(values) else np.full(len(codes), None, dtype=object)
+    ret[missing] = None
+    return ret
+
+
+# -----------------------------------------------------------------------------
+
+
+class Station:
+    """
+    One station of a StationStore, read from the store's arrays on access.
+    Results of SearchService are lists of these instead of per-station dicts;
+    they still support station["name"], station["location"] etc. and compare
+    equal to the equivalent dict.
+    """
+
+    __slots__ = ("store", "index", "distance_m")
+
+    status = "Available"
+
+    def __init__(self, store, index, distance_m=None):
+        self.store = store
+        self.index = index
+        self.distance_m = distance_m
+
+    @property
+    def name(self):
+        return self.store.names_at(self.index)
+
+    @property
+    def operator(self):
+        return self.store.operators_at(self.index)
+
+    @property
+    def plz(self):
+        return int(self.store.plz[self.index])
+
+    @property
+    def location(self):
+        return float(self.store.lat[self.index]), float(self.store.lon[self.index])
+
+    def keys(self):
+        return ("name", "status", "location") if self.distance_m is None else \
+            ("name", "status", "location", "distance_m")
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def as_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, Station):
+            return self.as_dict() == other.as_dict()
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Station({self.as_dict()!r})"
+
+
+class StationStore:
+    """
+    Read-only columnar station table sorted by PLZ: int32 postal codes,
+    float64 coordinates (the KD-tree and exact distances need them) and names
+    and operators as categorical codes into the distinct values, which are
+    held in one Arrow string buffer. Python strings are only created for the
+    rows a result needs. Every PLZ occupies one contiguous slice; slices of
+    the arrays are views, so SearchService, Postal_search and BatchQuery all
+    read the same buffers.
+    """
+
+    def __init__(self, plz, lat, lon, name_codes, names, operator_codes=None, operators=None):
+        self.plz = plz
+        self.lat = lat
+        self.lon = lon
+        self.name_codes = name_codes
+        self.names = names
+        self.operator_codes = operator_codes
+        self.operators = operators
+        for arr in self.arrays():
+            arr.setflags(write=False)
+
+    @staticmethod
+    def _categorical(values):
+        """Smallest integer codes (-1 for missing) and the distinct values"""
+        cat = pd.Categorical(values)
+        return cat.codes, _strings(np.asarray(cat.categories, dtype=object))
+
+    @classmethod
+    def from_frame(cls, df_lstat):
+        """
+        Store of the rows with valid coordinates, stably sorted by PLZ; returns
+        it and the number of rows rejected for their coordinates. Reads the
+        register columns (Postleitzahl, Anzeigename (Karte), Breitengrad,
+        Längengrad and, if present, Betreiber) without modifying the frame.
+        """
+        plz         = pd.to_numeric(df_lstat["Postleitzahl"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+        lat         = parse_coordinates(df_lstat["Breitengrad"])[0].to_numpy()
+        lon         = parse_coordinates(df_lstat["Längengrad"])[0].to_numpy()
+        valid       = ~(np.isnan(lat) | np.isnan(lon))
+        order       = np.flatnonzero(valid)[np.argsort(plz[valid], kind="stable")]
+
+        name_codes, names = cls._categorical(df_lstat["Anzeigename (Karte)"].to_numpy()[order])
+        operator_codes = operators = None
+        if "Betreiber" in df_lstat.columns:
+            operator_codes, operators = cls._categorical(df_lstat["Betreiber"].to_numpy()[order])
+        store = cls(plz[order].astype(np.int32), np.ascontiguousarray(lat[order]), np.ascontiguousarray(lon[order]),
+                    name_codes, names, operator_codes, operators)
+        return store, int((~valid).sum())
+
+    def __len__(self):
+        return len(self.plz)
+
+    def arrays(self):
+        """The numpy arrays (the Arrow string buffers are immutable anyway)"""
+        return [arr for arr in (self.plz, self.lat, self.lon, self.name_codes, self.operator_codes,
+                                self.names, self.operators) if isinstance(arr, np.ndarray)]
+
+    @property
+    def nbytes(self):
+        """Array buffers plus the distinct name and operator strings"""
+        strings = sum(_strings_nbytes(values) for values in (self.names, self.operators) if values is not None)
+        return sum(arr.nbytes for arr in (self.plz, self.lat, self.lon, self.name_codes, self.operator_codes)
+                   if arr is not None) + strings
+
+    def slice(self, postal_code):
+        """[start, stop) of the stations of one PLZ"""
+        return (int(np.searchsorted(self.plz, postal_code, side="left")),
+                int(np.searchsorted(self.plz, postal_code, side="right")))
+
+    def names_at(self, idx):
+        """Name of one station, or an object array of names for an index array or slice"""
+        return _decode(self.name_codes, self.names, idx)
+
+    def operators_at(self, idx):
+        if self.operator_codes is None:
+            return None if isinstance(idx, (int, np.integer)) else np.full(len(self.plz[idx]), None, dtype=object)
+        return _decode(self.operator_codes, self.operators, idx)
+
+    def station(self, i, distance_m=None):
+        return Station(self, int(i), None if distance_m is None else float(distance_m))
+
+    def frame(self, idx):
+        """Stations at idx (index array or slice) as a small DataFrame for display"""
+        return pd.DataFrame({
+            "Name": self.names_at(idx),
+            "Operator": self.operators_at(idx),
+            "PLZ": self.plz[idx],
+            "Latitude": self.lat[idx],
+            "Longitude": self.lon[idx],
+        })
@@ -1,5 +1,7 @@
 import streamlit as st
 import pandas as pd
+from typing import Optional
+from charging.application.services.SuggestionStore import SuggestionStore, SQLiteSuggestionStore
 
 
 # Single Responsibility Principle (SRP)
@@ -8,18 +10,15 @@ import pandas as pd
 class SuggestionManager:
     """Handles storage and manipulation of suggestions."""
 
-    @staticmethod
-    def initialize():
-        """Initialize the suggestions DataFrame."""
-        if "suggestions" not in st.session_state:
-            st.session_state["suggestions"] = pd.DataFrame(
-                columns=["Postal Code", "Location Name", "Latitude", "Longitude", "Description"]
-            )
+    def __init__(self, store: Optional[SuggestionStore] = None):
+        self.store = store if store is not None else SQLiteSuggestionStore()
 
-    @staticmethod
-    def add_suggestion(postal_code: str, location_name: str, latitude: float, longitude: float,
-                       description: str) -> None:
-        """Add a new suggestion to the storage."""
+    def initialize(self):
+        """Nothing to do per session: the store is shared and creates its schema when opened."""
+
+    def add_suggestion(self, postal_code: str, location_name: str, latitude: float, longitude: float,
+                       description: str) -> bool:
+        """Add a new suggestion to the storage; duplicates (postal code, location name) are ignored."""
 
         if (
                 postal_code.isnumeric() and
@@ -27,30 +26,33 @@ class SuggestionManager:
                 isinstance(latitude, float) and isinstance(longitude,float)
                 and len(description) > 0
         ):
-            # Check for duplicates based on Postal Code and Location Name
-            existing_suggestions = st.session_state["suggestions"]
-            duplicate_check = existing_suggestions[
-                (existing_suggestions["Postal Code"] == postal_code) &
-                (existing_suggestions["Location Name"] == location_name)
-                ]
-
-            if duplicate_check.empty:
-                # If no duplicate is found, add the new suggestion
-                new_suggestion = pd.DataFrame({
-                    "Postal Code": [postal_code],
-                    "Location Name": [location_name],
-                    "Latitude": [latitude],
-                    "Longitude": [longitude],
-                    "Description": [description],
-                })
-                st.session_state["suggestions"] = pd.concat([st.session_state["suggestions"], new_suggestion],
-                                                            ignore_index=True)
-
+            # The unique index on (postal code, location name) rejects duplicates
+            return self.store.add(postal_code, location_name, latitude, longitude, description)
+        return False
 
-    @staticmethod
-    def get_suggestions() -> pd.DataFrame:
+    def get_suggestions(self) -> pd.DataFrame:
         """Retrieve the suggestions DataFrame."""
-        return st.session_state.get("suggestions", pd.DataFrame())
+        return self.store.get_all()
+
+    def vote(self, suggestion_id: int, delta: int):
+        """Add delta to a suggestion's votes; the count never drops below 0."""
+        return self.store.vote(suggestion_id, delta)
+
+    def get_top_suggestions(self, n: int = 3, postal_code: Optional[str] = None) -> pd.DataFrame:
+        """The n suggestions with most votes, from the store's vote index."""
+        return self.store.top(n, postal_code)
+
+    def get_page(self, page: int, page_size: int) -> pd.DataFrame:
+        """One page (0-based) of suggestions in insertion order."""
+        return self.store.page(page * page_size, page_size)
+
+    def count(self) -> int:
+        """Number of stored suggestions."""
+        return self.store.count()
+
+    def get_postal_codes(self):
+        """Postal codes that have suggestions."""
+        return self.store.postal_codes()
 
 
 # Open/Closed Principle (OCP)
@@ -100,19 +102,18 @@ class Suggestion:
         self.suggestion_manager = suggestion_manager
         self.ui = ui
     
-    def get_top_suggestions(self, suggestions_df, n: int = 3):
-        """Retrieve the top N suggestions based on votes."""
-        return suggestions_df.sort_values(by="Votes", ascending=False).head(n)
+    PAGE_SIZE = 20
+
+    def get_top_suggestions(self, n: int = 3, postal_code: Optional[str] = None):
+        """Retrieve the top N suggestions based on votes, globally or for one postal code."""
+        return self.suggestion_manager.get_top_suggestions(n, postal_code)
     
-    def _cast_vote(self, index: int, vote: str):
+    def _cast_vote(self, suggestion_id: int, vote: str):
         """Cast an upvote or downvote on a suggestion."""
-        suggestions_df = st.session_state["suggestions"]
         if vote == "up":
-            suggestions_df.at[index, "Votes"] += 1
+            self.suggestion_manager.vote(suggestion_id, 1)
         elif vote == "down":
-            current_votes = suggestions_df.at[index, "Votes"]
-            suggestions_df.at[index, "Votes"] = max(0, current_votes - 1)
-        st.session_state["suggestions"] = suggestions_df
+            self.suggestion_manager.vote(suggestion_id, -1)
 
 
     def display_suggestions_page(self):
@@ -126,8 +127,11 @@ class Suggestion:
                 try:
                     lat = float(lat)
                     longitude = float(longitude)
-                    self.suggestion_manager.add_suggestion(postal_code, location_name, lat, longitude, description)
-                    self.ui.show_success_message("Suggestion added successfully!")
+                    if self.suggestion_manager.add_suggestion(postal_code, location_name, lat, longitude, description):
+                        self.ui.show_success_message("Suggestion added successfully!")
+                    else:
+                        self.ui.show_error_message("This location was already suggested for this postal code, "
+                                                   "or the postal code is not numeric.")
                 except ValueError:
                     self.ui.show_error_message("Please enter valid numerical values for lat and longitude.")
             else:
@@ -137,45 +141,51 @@ class Suggestion:
         suggestions_df = self.suggestion_manager.get_suggestions()
         self.ui.render_suggestions_list(suggestions_df)
 
+    def _render_top_suggestions(self, title: str, postal_code: Optional[str] = None):
+        """Render a top 3 leaderboard."""
+        top_suggestions = self.get_top_suggestions(3, postal_code)
+
+        st.markdown(title)
+        if not top_suggestions.empty:
+            for row in top_suggestions.to_dict("records"):
+                st.markdown(
+                    f"- **{row['Location Name']}** (Postal Code: {row['Postal Code']}) - Votes: {row['Votes']}"
+                )
+        else:
+            st.write("No top suggestions available.")
+
     def display_voting_page(self):
         """Display voting options for suggestions."""
         self.suggestion_manager.initialize()
-        suggestions_df = self.suggestion_manager.get_suggestions()
+        total = self.suggestion_manager.count()
 
-        if suggestions_df.empty:
+        if total == 0:
             st.write("No suggestions available to vote on.")
             return
 
-        # Ensure Votes column exists
-        if "Votes" not in suggestions_df.columns:
-            suggestions_df["Votes"] = 0
-            st.session_state["suggestions"] = suggestions_df
-
-        # Display suggestions with voting buttons
+        # Only one page of suggestions (and buttons) is rendered per run
         st.markdown("### Vote on User Suggestions")
-        for index, row in suggestions_df.iterrows():
-            st.markdown(f"#### {row['Location Name']} (Postal Code: {row['Postal Code']})")
+        n_pages = (total + self.PAGE_SIZE - 1) // self.PAGE_SIZE
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+        suggestions_df = self.suggestion_manager.get_page(int(page) - 1, self.PAGE_SIZE)
+
+        for row in suggestions_df.to_dict("records"):
+            st.markdown(f"#### {row['Location Name']} (Postal Code: {row['Postal Code']}) - Votes: {row['Votes']}")
             st.write(f"Description: {row['Description']}")
             
 
             col1, col2 = st.columns(2)
             with col1:
-                if st.button("👍 Thumbs Up", key=f"upvote_{index}"):
-                    self._cast_vote(index, "up")
+                if st.button("👍 Thumbs Up", key=f"upvote_{row['ID']}"):
+                    self._cast_vote(row['ID'], "up")
             with col2:
-                if st.button("👎 Thumbs Down", key=f"downvote_{index}"):
-                    self._cast_vote(index, "down")
+                if st.button("👎 Thumbs Down", key=f"downvote_{row['ID']}"):
+                    self._cast_vote(row['ID'], "down")
 
 
         # Show top suggestions
-        top_suggestions = self.get_top_suggestions(suggestions_df)
-        
-        st.markdown("### Top 3 Suggestions")
-        if not top_suggestions.empty:
-            for _, row in top_suggestions.iterrows():
-                st.markdown(
-                    # st.write(f"Votes: {row['Votes']}"),
-                    f"- **{row['Location Name']}** (Postal Code: {row['Postal Code']}) - Votes: {row['Votes']}"
-                )
-        else:
-            st.write("No top suggestions available.")
+        self._render_top_suggestions("### Top 3 Suggestions")
+
+        postal_code = st.selectbox("Top 3 for Postal Code", self.suggestion_manager.get_postal_codes())
+        if postal_code:
+            self._render_top_suggestions(f"### Top 3 Suggestions in {postal_code}", postal_code)
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+from config import pdict
+
+# Column names of the DataFrames handed to the UI
+COLUMNS = ["ID", "Postal Code", "Location Name", "Latitude", "Longitude", "Description", "Votes"]
+
+
+class SuggestionStore(ABC):
+    """Storage interface for suggestions and their votes"""
+
+    @abstractmethod
+    def add(self, postal_code: str, location_name: str, latitude: float, longitude: float,
+            description: str) -> bool:
+        """Insert one suggestion; False if (postal code, location name) already exists."""
+
+    @abstractmethod
+    def add_many(self, rows: Iterable[Tuple[str, str, float, float, str]]) -> int:
+        """Insert many suggestions in one transaction; returns the number inserted."""
+
+    @abstractmethod
+    def vote(self, suggestion_id: int, delta: int) -> Optional[int]:
+        """Atomically add delta to the votes (never below 0); returns the new count."""
+
+    @abstractmethod
+    def get_all(self) -> pd.DataFrame:
+        """All suggestions in insertion order."""
+
+    @abstractmethod
+    def get(self, suggestion_id: int) -> Optional[dict]:
+        """One suggestion by id as a dict of COLUMNS; None if it does not exist."""
+
+    @abstractmethod
+    def top(self, n: int, postal_code: Optional[str] = None) -> pd.DataFrame:
+        """The n suggestions with most votes, optionally for one postal code."""
+
+    @abstractmethod
+    def page(self, offset: int, limit: int) -> pd.DataFrame:
+        """limit suggestions in insertion order, starting at offset."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored suggestions."""
+
+    @abstractmethod
+    def postal_codes(self) -> List[str]:
+        """Postal codes with at least one suggestion, ascending."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all suggestions."""
+
+
+class SQLiteSuggestionStore(SuggestionStore):
+    """
+    SQLite backed store shared by all users of the app. WAL mode lets readers
+    run alongside the single writer; each thread gets its own connection, and
+    votes are single UPDATE statements so concurrent voters cannot lose updates.
+    Top-N queries walk the (votes DESC, id) indexes, which SQLite keeps ordered
+    on every write, so they see the writes of every connection and process.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS suggestions (
+            id              INTEGER PRIMARY KEY,
+            postal_code     TEXT NOT NULL,
+            location_name   TEXT NOT NULL,
+            latitude        REAL,
+            longitude       REAL,
+            description     TEXT,
+            votes           INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (postal_code, location_name)
+        );
+        CREATE INDEX IF NOT EXISTS idx_suggestions_votes ON suggestions (votes DESC, id);
+        CREATE INDEX IF NOT EXISTS idx_suggestions_plz_votes ON suggestions (postal_code, votes DESC, id);
+    """
+
+    SELECT = ("SELECT id, postal_code, location_name, latitude, longitude, description, votes "
+              "FROM suggestions")
+
+    def __init__(self, path: Optional[str] = None, wal: bool = True, timeout: float = 30.0):
+        # Defaults to the database file of the config
+        path = path if path is not None else pdict["file_suggestions"]
+        self.path = path
+        self.wal = wal
+        self.timeout = timeout
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, in autocommit mode with explicit transactions"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            if self.wal:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _frame(self, rows) -> pd.DataFrame:
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def add(self, postal_code, location_name, latitude, longitude, description) -> bool:
+        return self.add_many([(postal_code, location_name, latitude, longitude, description)]) == 1
+
+    def add_many(self, rows) -> int:
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO suggestions "
+                "(postal_code, location_name, latitude, longitude, description) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return conn.total_changes - before
+
+    def vote(self, suggestion_id, delta) -> Optional[int]:
+        with self._transaction() as conn:
+            conn.execute("UPDATE suggestions SET votes = MAX(votes + ?, 0) WHERE id = ?",
+                         (int(delta), int(suggestion_id)))
+            row = conn.execute("SELECT votes FROM suggestions WHERE id = ?", (int(suggestion_id),)).fetchone()
+        return row[0] if row else None
+
+    def get_all(self) -> pd.DataFrame:
+        return self._frame(self._connection().execute(self.SELECT + " ORDER BY id").fetchall())
+
+    def get(self, suggestion_id) -> Optional[dict]:
+        row = self._connection().execute(self.SELECT + " WHERE id = ?", (int(suggestion_id),)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def top(self, n, postal_code=None) -> pd.DataFrame:
+        # Ties go to the older suggestion; both orders match an index, so no sort step runs
+        if postal_code is None:
+            rows = self._connection().execute(
+                self.SELECT + " ORDER BY votes DESC, id LIMIT ?", (int(n),)).fetchall()
+        else:
+            rows = self._connection().execute(
+                self.SELECT + " WHERE postal_code = ? ORDER BY votes DESC, id LIMIT ?",
+                (str(postal_code), int(n))).fetchall()
+        return self._frame(rows)
+
+    def page(self, offset, limit) -> pd.DataFrame:
+        return self._frame(self._connection().execute(
+            self.SELECT + " ORDER BY id LIMIT ? OFFSET ?", (int(limit), int(offset))).fetchall())
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM suggestions").fetchone()[0]
+
+    def postal_codes(self) -> List[str]:
+        return [row[0] for row in self._connection().execute(
+            "SELECT DISTINCT postal_code FROM suggestions ORDER BY postal_code")]
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM suggestions")
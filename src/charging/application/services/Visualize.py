@@ -1,74 +1,207 @@
-import folium
-from folium.plugins import MarkerCluster
-import streamlit as st
-from streamlit_folium import folium_static
-from branca.colormap import LinearColormap
-from typing import Any, Dict, List
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import threading
+import time
+import numpy as np
 import pandas as pd
+from shared.application.Metrics import timed
+
+# folium, branca, geopandas and shapely are imported where a map is built:
+# they dominate the import time of the app and are not needed by the
+# services that only search or aggregate
+
+# Simplification tolerance (degrees) per zoom level: the entry for the smallest
+# level >= the map zoom applies; 0 keeps full resolution
+SIMPLIFY_TOLERANCES = {10: 0.0005, 12: 0.0002, 14: 0.00005, 18: 0.0}
+
+# Coordinate decimals written to the GeoJSON (5 decimals ~ 1 m)
+COORD_DECIMALS = 5
+
+# Fill of areas without a value (NaN), e.g. PLZ without a charger on the coverage layer
+NO_DATA_COLOR = "#9e9e9e"
+
+# Size of the embedded map
+MAP_WIDTH, MAP_HEIGHT = 800, 600
+
+# Value column and extra tooltip fields of each map layer
+LAYERS = {
+    "Residents":            ("Einwohner", ()),
+    "Charging_Stations":    ("Number", ()),
+    "Coverage":             ("Residents_per_charger", ("Number", "Einwohner")),
+    "Traffic":              ("Kfz_km", ("Lkw_km",)),
+}
+
+
+def data_version(dframe, value_col):
+    """Hash of keys, values and geometry; dframe.attrs["data_version"] takes precedence"""
+    if "data_version" in dframe.attrs:
+        return f"{dframe.attrs['data_version']}:{value_col}"
+    import shapely
+    h = hashlib.blake2b(digest_size=8)
+    h.update(pd.util.hash_pandas_object(dframe[["PLZ", value_col]], index=False).to_numpy().tobytes())
+    for wkb in shapely.to_wkb(np.asarray(dframe.geometry.values)):
+        h.update(wkb)
+    return h.hexdigest()
 
 
 class Visualize:
-    """Handles map visualization"""
-    def __init__(self):
-        pass
-     
-    def render_map(self, dframe1, dframe2, layer_selection):
-        if layer_selection == "Residents":
-            self._render_residents_layer(dframe2)
-        elif layer_selection == "Charging_Stations":
-            self._render_charging_stations_layer(dframe1)
+    """
+    Handles map visualization. The HTML of a layer is built once by a
+    background worker and kept as a future, so a rerun that shows a layer
+    again only embeds the cached page, and a rerun interrupted by a widget
+    change does not lose the build.
+    """
 
-    def _render_residents_layer(self, dframe2):
-        # Create a Folium map
-        m = folium.Map(location=[52.52, 13.40], zoom_start=10)
-        color_map = LinearColormap(colors=['yellow', 'red'], vmin=dframe2['Einwohner'].min(), vmax=dframe2['Einwohner'].max())
-
-        # Add polygons to the map for Residents
-        for idx, row in dframe2.iterrows():
-            folium.GeoJson(
-                row['geometry'],
-                style_function=lambda x, color=color_map(row['Einwohner']): {
-                    'fillColor': color,
-                    'color': 'black',
-                    'weight': 1,
-                    'fillOpacity': 0.7
-                },
-                tooltip=f"PLZ: {row['PLZ']}, Einwohner: {row['Einwohner']}"
-            ).add_to(m)
-        
-        # Display the dataframe for Residents
-        # st.subheader('Residents Data')
-        # st.dataframe(gdf_residents2)
-        # Add color map to the map
-        color_map.add_to(m)
-    
-        folium_static(m, width=800, height=600)
+    # FeatureCollections and rendered map pages (futures) shared by all instances, i.e. across Streamlit reruns
+    _layer_cache = OrderedDict()
+    _layer_cache_size = 16
+    _html_cache = OrderedDict()
+    _lock = threading.Lock()
+    _worker = None
 
+    def __init__(self, zoom_start=10, tolerances=None):
+        self.zoom_start = zoom_start
+        self.tolerances = tolerances or SIMPLIFY_TOLERANCES
+        self.last_render = {}
 
-    def _render_charging_stations_layer(self, dframe1):
+    def render_map(self, dframe1, dframe2, layer_selection, coverage=None, traffic=None):
+        """Shows the selected layer and queues the other fixed layers, so switching to them is a cache hit"""
+        frames = {"Residents": dframe2, "Charging_Stations": dframe1, "Coverage": coverage, "Traffic": traffic}
+        if frames.get(layer_selection) is None:
+            return
+        future = self.map_html(frames[layer_selection], *LAYERS[layer_selection])
+        self.prefetch((frames[name], *LAYERS[name]) for name in ("Residents", "Charging_Stations", "Traffic")
+                      if frames[name] is not None)
+        self._show_html(future)
+
+    @classmethod
+    def _executor(cls):
+        with cls._lock:
+            if cls._worker is None:
+                cls._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="map-layers")
+            return cls._worker
+
+    def _layer_key(self, dframe, value_col, fields=()):
+        return (value_col, data_version(dframe, value_col), self._tolerance(), tuple(fields))
 
-        m = folium.Map(location=[52.52, 13.40], zoom_start=10)
+    def map_html(self, dframe, value_col, fields=()):
+        """Future of the map page of a layer, built in the background worker on first request"""
+        key = self._layer_key(dframe, value_col, fields)
+        worker = self._executor()
+        with self._lock:
+            future = self._html_cache.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = worker.submit(self._page, dframe, value_col, fields)
+                self._html_cache[key] = future
+                if len(self._html_cache) > self._layer_cache_size:
+                    self._html_cache.popitem(last=False)
+            self._html_cache.move_to_end(key)
+        return future
 
-        color_map = LinearColormap(colors=['yellow', 'red'], vmin=dframe1['Number'].min(), vmax=dframe1['Number'].max())
+    def prefetch(self, layers):
+        """Queues (dframe, value_col, fields) layers whose pages are not built yet"""
+        return [self.map_html(dframe, value_col, fields) for dframe, value_col, fields in layers]
 
-    # Add polygons to the map for Numbers
-        for idx, row in dframe1.iterrows():
-            folium.GeoJson(
-                row['geometry'],
-                style_function=lambda x, color=color_map(row['Number']): {
-                    'fillColor': color,
-                    'color': 'black',
-                    'weight': 1,
-                    'fillOpacity': 0.7
-                },
-                tooltip=f"PLZ: {row['PLZ']}, Number: {row['Number']}"
-            ).add_to(m)
+    def _page(self, dframe, value_col, fields=()):
+        """Self-contained HTML page of the layer's map, as embedded by streamlit_folium.folium_static"""
+        import folium
+        return folium.Figure().add_child(self._choropleth(dframe, value_col, list(fields))).render()
 
-        # Display the dataframe for Numbers
-        # st.subheader('Numbers Data')
-        # st.dataframe(gdf_lstat3)
+    @staticmethod
+    def _show_html(future):
+        """Embeds a page, waiting for the worker if it is still being built"""
+        import streamlit as st
+        if not future.done():
+            with st.spinner("Drawing map..."):
+                future.result()
+        if hasattr(st, "iframe"):
+            st.iframe(future.result(), width=MAP_WIDTH, height=MAP_HEIGHT + 10)
+        else:
+            import streamlit.components.v1 as components
+            components.html(future.result(), width=MAP_WIDTH, height=MAP_HEIGHT + 10)
 
-    # Add color map to the map
+    def _tolerance(self):
+        levels = sorted(level for level in self.tolerances if level >= self.zoom_start)
+        return self.tolerances[levels[0]] if levels else 0.0
+
+    @staticmethod
+    def _simplify(geoms, tolerance):
+        """Simplifies polygons as a coverage so neighbouring PLZ keep shared borders"""
+        if tolerance <= 0:
+            return geoms
+        import shapely
+        polygonal = np.isin(shapely.get_type_id(geoms), (3, 6)).all()
+        if polygonal and hasattr(shapely, "coverage_simplify"):
+            return shapely.coverage_simplify(geoms, tolerance)
+        return shapely.simplify(geoms, tolerance, preserve_topology=True)
+
+    def _feature_collection(self, dframe, value_col, color_map, fields=()):
+        """GeoJSON FeatureCollection with simplified geometry and precomputed fill colors"""
+        key = self._layer_key(dframe, value_col, fields)
+        tolerance = key[2]
+        with self._lock:
+            cached = self._layer_cache.get(key)
+            if cached is not None:
+                self._layer_cache.move_to_end(key)
+                return cached, True
+
+        import geopandas as gpd
+        import shapely
+
+        geoms = self._simplify(np.asarray(dframe.geometry.values), tolerance)
+        geoms = shapely.transform(geoms, lambda coords: np.round(coords, COORD_DECIMALS))
+        features = gpd.GeoDataFrame({
+            "PLZ": dframe["PLZ"].to_numpy(),
+            value_col: dframe[value_col].to_numpy(),
+            **{field: dframe[field].to_numpy() for field in fields},
+            "fill": [color_map(v) if v == v else NO_DATA_COLOR for v in dframe[value_col].tolist()],
+        }, geometry=geoms, crs=dframe.crs)
+        geojson = features.to_json(drop_id=True)
+
+        with self._lock:
+            self._layer_cache[key] = geojson
+            if len(self._layer_cache) > self._layer_cache_size:
+                self._layer_cache.popitem(last=False)
+        return geojson, False
+
+    @timed()
+    def _choropleth(self, dframe, value_col, fields=()):
+        """Folium map with one GeoJson layer for all polygons; fields are extra tooltip columns"""
+        import folium
+        from branca.colormap import LinearColormap
+
+        start = time.perf_counter()
+        m = folium.Map(location=[52.52, 13.40], zoom_start=self.zoom_start)
+        # The scale spans the values present; NaN areas get NO_DATA_COLOR
+        color_map = LinearColormap(colors=['yellow', 'red'], vmin=np.nan_to_num(dframe[value_col].min()),
+                                   vmax=np.nan_to_num(dframe[value_col].max()))
+
+        geojson, cache_hit = self._feature_collection(dframe, value_col, color_map, fields)
+        folium.GeoJson(
+            geojson,
+            style_function=lambda feature: {
+                'fillColor': feature['properties']['fill'],
+                'color': 'black',
+                'weight': 1,
+                'fillOpacity': 0.7
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["PLZ", value_col, *fields],
+                                          aliases=["PLZ:", f"{value_col}:", *(f"{f}:" for f in fields)]),
+        ).add_to(m)
         color_map.add_to(m)
-        folium_static(m, width=800, height=600)
-        
\ No newline at end of file
+
+        self.last_render = {
+            "layer": value_col,
+            "features": len(dframe),
+            "payload_bytes": len(geojson),
+            "build_ms": (time.perf_counter() - start) * 1000,
+            "cache_hit": cache_hit,
+        }
+        return m
+
+    def _render_residents_layer(self, dframe2):
+        self._show_html(self.map_html(dframe2, *LAYERS["Residents"]))
+
+    def _render_charging_stations_layer(self, dframe1):
+        self._show_html(self.map_html(dframe1, *LAYERS["Charging_Stations"]))
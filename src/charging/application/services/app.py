@@ -1,47 +1,100 @@
-import folium
 import streamlit as st
-from folium.plugins import HeatMap, MarkerCluster
-from streamlit_folium import folium_static
 from shared.application import HelperTools as ht
-import pandas as pd
-from branca.colormap import LinearColormap
-from streamlit_folium import st_folium
-from charging.application.services.Search import SearchService
-from charging.application.services import Search, Visualize, Suggestion
 from charging.application.services.Suggestion import SuggestionManager, SuggestionUI, Suggestion
-from charging.application.services.Visualize import Visualize
+from charging.application.services.Visualize import Visualize, LAYERS
 from charging.application.services.Postal_search import Search
+from charging.application.services.Recommend import Recommendation
+from charging.application.services.Debug import DebugPanel
+from shared.application.Metrics import registry
 
 class Application:
     """Main application class to coordinate all services"""
 
-    def __init__(self, l_stat, dframe1, dframe2):
+    # Layers whose per-PLZ values can be averaged over the neighbouring PLZ
+    SMOOTHED_LAYERS = ("Residents", "Charging_Stations", "Traffic")
+
+    # Charger power classes (kW) offered by the coverage filter
+    POWER_CLASSES = (0, 11, 22, 50, 150, 350)
+
+    def __init__(self, l_stat, dframe1, dframe2, search_index=None, visualize_service=None, suggestion_store=None,
+                 coverage=None, traffic=None, placement=None, adjacency=None):
+        # The frames are shared read-only between sessions, so they are not copied
         self.l_stat = l_stat
-        self.dframe1 = dframe1.copy()
-        self.dframe2 = dframe2.copy()
-        self.search_service = Search()
-        self.visualize_service = Visualize()
-        self.suggestion_service = Suggestion(SuggestionManager(),SuggestionUI())
+        self.dframe1 = dframe1
+        self.dframe2 = dframe2
+        self.coverage = coverage
+        self.traffic = traffic
+        self.adjacency = adjacency
+        self.search_service = Search(search_index)
+        self.visualize_service = visualize_service or Visualize()
+        self.suggestion_service = Suggestion(SuggestionManager(suggestion_store),SuggestionUI())
+        self.recommendation_service = Recommendation(placement, self.suggestion_service.suggestion_manager) \
+            if placement is not None else None
 
     def run(self):
         """Run the Streamlit application"""
         st.title("Heatmaps: Electric Charging Stations and Residents")
 
-        # Show heatmap layer selection
-        layer_selection = self._show_layer_selection()
-        self.visualize_service.render_map(self.dframe1, self.dframe2, layer_selection)
+        # The map keeps its place above the menu output, but is filled last: the sidebar
+        # is live while the map page is still being built
+        map_area = st.container()
 
         # Handle menu options
         self._handle_menu()
 
+        with map_area:
+            self._show_map()
+
+        if registry.enabled:
+            DebugPanel(registry).render()
+
+    @st.fragment
+    def _show_map(self):
+        """Layer selection and map; changing the layer or filter reruns only this fragment"""
+        layer_selection = self._show_layer_selection()
+        coverage = self._show_coverage() if layer_selection == "Coverage" else None
+        frames = {"Charging_Stations": self.dframe1, "Residents": self.dframe2, "Traffic": self.traffic}
+        rings = self._show_smoothing() if layer_selection in self.SMOOTHED_LAYERS else 0
+        if rings:
+            value_col, _ = LAYERS[layer_selection]
+            frames[layer_selection] = self.adjacency.smooth_frame(frames[layer_selection], value_col, rings)
+        self.visualize_service.render_map(frames["Charging_Stations"], frames["Residents"], layer_selection,
+                                          coverage=coverage.layer() if coverage is not None else None,
+                                          traffic=frames["Traffic"])
+
+    def _show_smoothing(self):
+        """Number of neighbour rings the per-PLZ values are averaged over; 0 without a PLZ graph"""
+        if self.adjacency is None:
+            return 0
+        return st.slider("Neighbourhood smoothing (PLZ rings)", 0, 3, 0)
+
     def _show_layer_selection(self):
         """Display layer selection radio buttons"""
-        return st.radio("Select Layer", ("Residents", "Charging_Stations"))
+        layers = ("Residents", "Charging_Stations") + (("Coverage",) if self.coverage is not None else ()) \
+            + (("Traffic",) if self.traffic is not None else ())
+        return st.radio("Select Layer", layers)
+
+    def _show_coverage(self):
+        """Minimum power filter and the worst served PLZ and districts"""
+        min_kw = st.select_slider("Minimum charger power (kW)", self.POWER_CLASSES, value=0)
+        result = self.coverage.compute(min_kw)
+        st.caption(f"Grey PLZ have residents but no charger of at least {min_kw} kW.")
+        col_plz, col_dis = st.columns(2)
+        col_plz.markdown("#### Under-served PLZ")
+        col_plz.dataframe(result.underserved(10, "plz")[["PLZ", "Bezirk", "Einwohner", "Number", "Residents_per_charger"]],
+                          hide_index=True)
+        col_dis.markdown("#### Under-served districts")
+        districts = result.underserved(12, "district")
+        col_dis.dataframe(districts[[c for c in ("Bezirk", "Einwohner", "Number", "Residents_per_charger", "KW_per_1000",
+                                                 "Kfz_km_per_charger") if c in districts]], hide_index=True)
+        return result
 
     def _handle_menu(self):
         """Display sidebar menu and call the appropriate service"""
         #st.title("Charging Station Finder & Suggestions")
         menu = ["Search Charging Stations", "Suggest a New Location", "Vote on Suggestions"]
+        if self.recommendation_service is not None:
+            menu.append("Recommend New Sites")
         choice = st.sidebar.selectbox("Menu", menu)
 
         if choice == "Search Charging Stations":
@@ -50,6 +103,14 @@ class Application:
             self.suggestion_service.display_suggestions_page()
         elif choice == "Vote on Suggestions":
             self.suggestion_service.display_voting_page()
+        elif choice == "Recommend New Sites":
+            self.recommendation_service.display_recommendation_page()
+
+    @classmethod
+    def from_shared_state(cls, state, suggestion_store=None):
+        """Application on top of the process-wide SharedState"""
+        return cls(None, state.dframe1, state.dframe2, state.search_index, state.visualize_service,
+                   suggestion_store, state.coverage, state.traffic, state.placement, state.adjacency)
 
 # ---------------------------------------------------------------------------
 
@@ -0,0 +1,138 @@
+"""
+Headless batch mode: bulk station lookups and coverage reports from the
+command line, without the Streamlit UI. Uses the same datasets, snapshots
+and SearchService index as the app; run it from src/ like main.py.
+
+    python cli.py plz codes.csv -o stations.csv
+    python cli.py nearest points.csv -k 3 -o nearest.parquet
+    python cli.py radius points.csv --radius 1000 -o within.geojson
+    python cli.py coverage --min-kw 50 --level district -o coverage.geojson
+
+Inputs are CSV files ("-" for stdin) read in chunks; results are written
+chunk by chunk as CSV (default, "-" for stdout), Parquet or GeoJSON, chosen
+by the output extension or --format. Progress goes to stderr.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+import pandas as pd
+from shared.application.Preprocessor import parse_coordinates
+from shared.infrastructure.Writer import open_writer, output_format
+from charging.application.services.Batch import BatchQuery
+from charging.application.services.Search import SearchService
+from main import ApplicationManager, DirectoryManager
+from config import pdict
+
+# Input rows per chunk; bounds the memory of a run independently of the input size
+CHUNKSIZE = 100_000
+
+
+# ---------------------------------------------------------------------------
+def read_chunks(path, chunksize=CHUNKSIZE, header=True):
+    """The input CSV as chunks of strings, so postal codes keep their leading zeros"""
+    return pd.read_csv(sys.stdin if path == "-" else path, dtype=str, chunksize=chunksize,
+                       header=0 if header else None, skipinitialspace=True)
+
+
+def column(chunk, name, default):
+    """Column by name, or by position for files without header"""
+    name = default if name is None else name
+    if name not in chunk.columns and str(name).isdigit():
+        return chunk.iloc[:, int(name)]
+    return chunk[name]
+
+
+def run_queries(batch, args, chunks, writer):
+    """Answers all chunks; returns the number of queries"""
+    n = 0
+    for chunk in chunks:
+        if args.command == "plz":
+            frame = batch.postal_codes(column(chunk, args.column, chunk.columns[0]), offset=n)
+        else:
+            lat = parse_coordinates(column(chunk, args.lat, "Latitude"))[0].to_numpy()
+            lon = parse_coordinates(column(chunk, args.lon, "Longitude"))[0].to_numpy()
+            if args.command == "nearest":
+                frame = batch.nearest(lat, lon, k=args.k, offset=n)
+            else:
+                frame = batch.within_radius(lat, lon, args.radius, offset=n)
+        writer.write(frame)
+        n += len(chunk)
+    return n
+
+
+def coverage_report(coverage, args, writer):
+    """Coverage per PLZ or district, worst served first"""
+    result = coverage.compute(args.min_kw)
+    frame = result.plz if args.level == "plz" else result.districts
+    frame = frame.sort_values("Rank", kind="stable").reset_index(drop=True)
+    writer.write(frame.head(args.top) if args.top else frame)
+    return len(frame)
+
+
+# ---------------------------------------------------------------------------
+def parser():
+    ret = argparse.ArgumentParser(description="Bulk charging station queries and coverage reports")
+    sub = ret.add_subparsers(dest="command", required=True)
+
+    def query_command(name, help):
+        cmd = sub.add_parser(name, help=help)
+        cmd.add_argument("input", help='CSV file with the queries, "-" for stdin')
+        cmd.add_argument("--no-header", action="store_true", help="input has no header; columns by position")
+        cmd.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="input rows per chunk")
+        return cmd
+
+    cmd = query_command("plz", "stations per postal code")
+    cmd.add_argument("--column", help="postal code column (default: the first)")
+    for name, help in (("nearest", "k nearest stations per point"), ("radius", "stations within a radius")):
+        cmd = query_command(name, help)
+        cmd.add_argument("--lat", help="latitude column (default: Latitude)")
+        cmd.add_argument("--lon", help="longitude column (default: Longitude)")
+        if name == "nearest":
+            cmd.add_argument("-k", type=int, default=5, help="stations per point")
+        else:
+            cmd.add_argument("--radius", type=float, default=1000.0, help="radius in metres")
+
+    cmd = sub.add_parser("coverage", help="residents and chargers per PLZ or district")
+    cmd.add_argument("--level", choices=("plz", "district"), default="plz")
+    cmd.add_argument("--min-kw", type=float, default=0.0, help="count only chargers with at least this power")
+    cmd.add_argument("--top", type=int, help="only the n worst served areas")
+
+    for cmd in sub.choices.values():
+        cmd.add_argument("-o", "--output", default="-", help='result file, "-" for stdout (CSV)')
+        cmd.add_argument("--format", choices=("csv", "parquet", "geojson"), help="default: by output extension")
+    return ret
+
+
+def main(argv=None, config=pdict):
+    args = parser().parse_args(argv)
+    fmt = output_format(args.output, args.format)
+
+    # Paths are relative to the caller, the dataset paths in the config relative to src/
+    output = args.output if args.output == "-" else os.path.abspath(args.output)
+    source = getattr(args, "input", None)
+    source = source if source in (None, "-") else os.path.abspath(source)
+    with contextlib.redirect_stdout(sys.stderr):
+        DirectoryManager.set_working_directory()
+        lstat_raw, _, _, coverage, *_ = ApplicationManager(config).load_datasets()
+
+    start = time.perf_counter()
+    with open_writer(output, fmt) as writer:
+        if args.command == "coverage":
+            n = coverage_report(coverage, args, writer)
+        else:
+            batch = BatchQuery(SearchService(lstat_raw))
+            n = run_queries(batch, args, read_chunks(source, args.chunksize, not args.no_header), writer)
+    seconds = time.perf_counter() - start
+    if args.command == "coverage":
+        print(f"{writer.rows} of {n} areas in {seconds:.2f} secs", file=sys.stderr)
+    else:
+        print(f"{n} queries, {writer.rows} rows in {seconds:.2f} secs ({n / max(seconds, 1e-9):,.0f} queries/s)",
+              file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    main()
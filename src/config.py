@@ -7,11 +7,25 @@ p['geocode']                = 'PLZ'
 p["file_lstations"]         = "./shared/infrastructure/datasets/Ladesaeulenregister.csv"
 # p["file_buildings"]         = "gebaeude.csv"
 p["file_residents"]         = "./shared/infrastructure/datasets/plz_einwohner.csv"
-# p["file_amounttraf"]        = "Verkehrsaufkommen.csv"
+p["file_amounttraf"]        = "./shared/infrastructure/datasets/Verkehrsaufkommen.csv"
 
 p["file_geodat_plz"]       = "./shared/infrastructure/datasets/geodata_berlin_plz.csv"
 p["file_geodat_dis"]       = "./shared/infrastructure/datasets/geodata_berlin_dis.csv"
 
+# Polygon source: "shapefile" (binary), "csv" (the WKT files above) or "parquet"
+# (GeoParquet derived with GeometrySource.to_parquet, paths in file_geoparquet_*)
+p["geometry_source"]        = "shapefile"
+p["file_shape_plz"]         = "./shared/infrastructure/datasets/berlin_postleitzahlen/berlin_postleitzahlen.shp"
+p["file_shape_dis"]         = "./shared/infrastructure/datasets/berlin_bezirke/bezirksgrenzen.shp"
+# p["file_geoparquet_plz"]    = "./shared/infrastructure/datasets/geodata_berlin_plz.parquet"
+# p["file_geoparquet_dis"]    = "./shared/infrastructure/datasets/geodata_berlin_dis.parquet"
+# Only polygons intersecting (west, south, east, north) are loaded; None loads all
+p["geometry_bbox"]          = None
+# PLZ neighbours: "queen" if the areas share any point, "rook" only if they share a border line
+p["plz_contiguity"]         = "queen"
+
+p["file_suggestions"]       = "./shared/infrastructure/datasets/suggestions.sqlite"
+
 # p["gebaeude_filter"]        = ["Freistehendes Einzelgebäude", "Doppelhaushälfte"]
 
 # -----------------------------------
@@ -2,9 +2,19 @@ import os
 import pandas as pd
 from shared.application import Preprocessor as prep
 from shared.application import HelperTools as ht
-from charging.application.services.app import Application as app
+from shared.application import Aggregation as agg
+from shared.application import Coverage as cov
+from shared.application.Adjacency import PlzGraph
+from shared.application.DatasetCache import DatasetCache, source_stamp
+from shared.application.Pipeline import Pipeline, enable_copy_on_write
+from shared.application.Metrics import registry
+from shared.infrastructure.Loader import read_lstat, read_traffic
+from shared.infrastructure.GeometrySource import geometry_source
 from config import pdict
 
+# Datasets are shared between stages and sessions without copies
+enable_copy_on_write()
+
 # ---------------------------------------------------------------------------
 class DataLoader:
     """Handles loading and preprocessing of datasets"""
@@ -12,26 +22,61 @@ class DataLoader:
     def __init__(self, config):
         self.config = config
 
-    def load_geodata(self):
-        """Load geospatial data for Berlin PLZ"""
-        return pd.read_csv(self.config["file_geodat_plz"], delimiter=";")
+    def geometry_sources(self):
+        """PLZ and district polygon sources selected by config["geometry_source"]"""
+        return (geometry_source(self.config, "plz", self.config["geocode"]),
+                geometry_source(self.config, "dis", "Bezirk"))
 
-    def load_charging_stations(self):
-        """Load electric charging stations dataset"""
-        return pd.read_csv(self.config["file_lstations"], delimiter=";", encoding='utf-8')
+    def source_files(self):
+        """Source files the preprocessed datasets are derived from"""
+        plz, dis = self.geometry_sources()
+        return [self.config["file_lstations"], self.config["file_residents"], *plz.files, *dis.files,
+                self.config["file_amounttraf"]]
 
-    def preprocess_charging_stations(self, df_charging_stations, df_geodata):
-        """Preprocess charging stations data"""
-        df_preprocessed = prep.preprop_lstat(df_charging_stations, df_geodata, self.config)
-        return prep.count_plz_occurrences(df_preprocessed)
+    def load_plz_polygons(self):
+        """PLZ polygons, limited to config["geometry_bbox"] if set"""
+        return self.geometry_sources()[0].load(self.config.get("geometry_bbox"))
+
+    def load_district_polygons(self):
+        """District polygons, limited to config["geometry_bbox"] if set"""
+        return self.geometry_sources()[1].load(self.config.get("geometry_bbox"))
+
+    def load_charging_stations(self):
+        """Load the Berlin rows of the electric charging stations dataset"""
+        return read_lstat(self.config["file_lstations"], bundesland="Berlin", encoding='utf-8')
+
+    def preprocess_charging_stations(self, df_joined, plz_polygons):
+        """Count stations and sum kW per PLZ polygon, from the stations joined to their polygons"""
+        key = self.config["geocode"]
+        return agg.aggregate_by_polygon(df_joined[key + "_idx"].to_numpy(), plz_polygons, key,
+                                        sums={"KW": df_joined["KW"].to_numpy()})
+
+    def join_charging_stations(self, df_charging_stations, plz_polygons, district_polygons):
+        """PLZ and district polygon of every station by location, plus its kW"""
+        joined = agg.join_lstat(df_charging_stations, {self.config["geocode"]: plz_polygons, "Bezirk": district_polygons})
+        return joined[[self.config["geocode"] + "_idx", "Bezirk_idx", "KW"]].reset_index(drop=True)
+
+    def build_plz_adjacency(self, plz_polygons):
+        """Adjacency of the PLZ polygons as an edge list (see PlzGraph.to_frame)"""
+        return PlzGraph.from_polygons(plz_polygons, self.config["geocode"],
+                                      self.config.get("plz_contiguity", "queen")).to_frame()
+
+    def load_traffic_data(self):
+        """Load the daily traffic volumes per road segment"""
+        return read_traffic(self.config["file_amounttraf"])
+
+    def preprocess_traffic_by_plz(self, gdf_traffic_dis, district_polygons, plz_polygons):
+        """Traffic per PLZ by the area share of each district"""
+        return agg.redistribute(gdf_traffic_dis, agg.TRAFFIC_SUMS, plz_polygons, self.config["geocode"],
+                                agg.area_weights(district_polygons, plz_polygons))
 
     def load_residents_data(self):
         """Load population data by PLZ"""
         return pd.read_csv(self.config["file_residents"])
 
-    def preprocess_residents_data(self, df_residents, df_geodata):
+    def preprocess_residents_data(self, df_residents, plz_polygons):
         """Preprocess population data"""
-        return prep.preprop_resid(df_residents, df_geodata, self.config)
+        return prep.preprop_resid(df_residents, plz_polygons, self.config)
 
 
 # ---------------------------------------------------------------------------
@@ -54,32 +99,80 @@ class ApplicationManager:
         self.config = config
         self.data_loader = DataLoader(config)
 
+    def pipeline(self, cache):
+        """
+        Loading and preprocessing stages; the stages with a name in SNAPSHOTS
+        are read from and written to the dataset cache
+        """
+        dl = self.data_loader
+        pipe = Pipeline()
+
+        def add(name, func, deps=()):
+            snapshot = name in self.SNAPSHOTS
+            pipe.add(name, func, deps,
+                     load=(lambda: cache.load(name)) if snapshot else None,
+                     store=(lambda dframe: cache.store(name, dframe)) if snapshot else None)
+
+        # Sources; the PLZ polygons are read once and shared by all later stages
+        add("plz_polygons", dl.load_plz_polygons)
+        add("districts", dl.load_district_polygons)
+        add("lstat_raw", dl.load_charging_stations)
+        add("residents_raw", dl.load_residents_data)
+        add("traffic_raw", dl.load_traffic_data)
+
+        # Stations
+        add("lstat_joined", dl.join_charging_stations, ["lstat_raw", "plz_polygons", "districts"])
+        add("lstat", dl.preprocess_charging_stations, ["lstat_joined", "plz_polygons"])
+
+        # Residents
+        add("resid", dl.preprocess_residents_data, ["residents_raw", "plz_polygons"])
+        add("plz_areas", cov.plz_areas, ["plz_polygons", "districts", "resid"])
+        add("plz_adjacency", dl.build_plz_adjacency, ["plz_polygons"])
+
+        # Traffic
+        add("traffic_dis", agg.traffic_by_district, ["traffic_raw", "districts"])
+        add("traffic_plz", dl.preprocess_traffic_by_plz, ["traffic_dis", "districts", "plz_polygons"])
+        return pipe
+
+    # Stage results kept as dataset snapshots
+    SNAPSHOTS = ("lstat_raw", "lstat_joined", "lstat", "resid", "districts", "plz_areas", "plz_adjacency",
+                 "traffic_dis", "traffic_plz")
+
+    def load_datasets(self):
+        """Load preprocessed datasets, reusing snapshots while the sources are unchanged"""
+        print("Loading datasets...")
+        cache = DatasetCache(self.config["picklefolder"], self.data_loader.source_files(), self.config)
+        pipe = self.pipeline(cache)
+        r = pipe.run(self.SNAPSHOTS)
+        pipe.report()
+
+        coverage = cov.CoverageModel.from_frames(r["lstat_joined"], r["plz_areas"], r["districts"],
+                                                 traffic=(r["traffic_plz"], r["traffic_dis"]))
+        adjacency = PlzGraph.from_frame(r["plz_adjacency"])
+        return r["lstat_raw"], r["lstat"], r["resid"], coverage, r["traffic_plz"], adjacency
+
     @ht.timer
     def run(self):
         """Run the main application"""
-        DirectoryManager.set_working_directory()
-
-        # Load and preprocess data
-        print("Loading datasets...")
-        df_geodata = self.data_loader.load_geodata()
-        print("Geodata for Berlin loaded.")
-
-        df_charging_stations = self.data_loader.load_charging_stations()
-        print("Charging stations dataset loaded.")
-        print(df_charging_stations.columns)
+        # The UI modules import Streamlit; the batch CLI uses this class without them
+        from charging.application.services.app import Application as app
+        from charging.application.services.State import get_shared_state, get_suggestion_store
 
-        gdf_charging_stations = self.data_loader.preprocess_charging_stations(
-            df_charging_stations, df_geodata
-        )
-        print("Charging stations preprocessed.")
+        DirectoryManager.set_working_directory()
+        # CHARGING_METRICS=1 records stage metrics and shows the debug panel, =memory also peak memory;
+        # kept out of the config so switching it does not invalidate the dataset snapshots
+        metrics = os.environ.get("CHARGING_METRICS", "")
+        if metrics and not registry.enabled:
+            registry.enable(memory=metrics == "memory")
 
-        df_residents = self.data_loader.load_residents_data()
-        gdf_residents = self.data_loader.preprocess_residents_data(df_residents, df_geodata)
-        print("Population data processed.")
+        # Datasets, search index and map layers are built once per process and data version;
+        # on a Streamlit rerun this is a cache lookup
+        version = source_stamp(self.data_loader.source_files(), self.config)
+        state = get_shared_state(version, self.load_datasets)
 
         # Launch the Streamlit app
         print("Launching Streamlit app...")
-        app_instance = app(df_charging_stations, gdf_charging_stations, gdf_residents)
+        app_instance = app.from_shared_state(state, get_suggestion_store(self.config["file_suggestions"]))
         app_instance.run()
         print("Streamlit app running.")
 
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+from shared.application.Metrics import timed
+
+# Contiguity of two PLZ areas: "queen" counts any shared point, "rook" only a shared border line
+CONTIGUITY = ("queen", "rook")
+
+
+# -----------------------------------------------------------------------------
+class PlzGraph:
+    """
+    Adjacency of the PLZ areas as a CSR graph over the sorted postal codes:
+    the neighbours of codes[i] are codes[indices[indptr[i]:indptr[i + 1]]].
+    Built once from the polygons through an STRtree and stored as an edge
+    frame (see to_frame), so it is cached with the other dataset snapshots.
+    n-ring lookups are a breadth-first walk over the arrays, cached per
+    (code, rings); neighbourhood aggregates are a sparse matrix product.
+    """
+
+    def __init__(self, codes, indptr, indices):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        for arr in (self.codes, self.indptr, self.indices):
+            arr.setflags(write=False)
+        self._position = dict(zip(self.codes.tolist(), range(len(self.codes))))
+        self._rings = {}
+        self._matrices = {}
+
+    @classmethod
+    def from_edges(cls, codes, src, dst):
+        """Graph of the sorted codes and edges between their positions; edges are made symmetric"""
+        n = len(codes)
+        src, dst = np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)
+        src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+        pairs = np.unique(src[src != dst] * n + dst[src != dst])
+        src, dst = np.divmod(pairs, n)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=n))])
+        return cls(codes, indptr, dst)
+
+    @classmethod
+    @timed()
+    def from_polygons(cls, polygons, key="PLZ", contiguity="queen"):
+        """
+        Graph of the areas polygons[key] whose polygons intersect ("queen") or
+        share a border line ("rook"); several polygons of one code form one node
+        """
+        import shapely
+
+        if contiguity not in CONTIGUITY:
+            raise ValueError(f"Unknown contiguity {contiguity!r}; use one of {CONTIGUITY}")
+        geoms = np.asarray(polygons.geometry.values)
+        codes, node = np.unique(polygons[key].to_numpy(dtype=np.int64), return_inverse=True)
+        left, right = shapely.STRtree(geoms).query(geoms, predicate="intersects")
+        pairs = left < right
+        left, right = left[pairs], right[pairs]
+        if contiguity == "rook":
+            shared = shapely.get_dimensions(shapely.intersection(geoms[left], geoms[right])) >= 1
+            left, right = left[shared], right[shared]
+        return cls.from_edges(codes, node[left], node[right])
+
+    def to_frame(self):
+        """Edge list (PLZ, Neighbour), both directions; codes without neighbours have Neighbour -1"""
+        src = np.repeat(np.arange(len(self.codes)), np.diff(self.indptr))
+        isolated = np.flatnonzero(np.diff(self.indptr) == 0)
+        return pd.DataFrame({
+            "PLZ": np.concatenate([self.codes[src], self.codes[isolated]]),
+            "Neighbour": np.concatenate([self.codes[self.indices], np.full(len(isolated), -1)]),
+        })
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Graph of an edge list written by to_frame"""
+        plz, neighbour = frame["PLZ"].to_numpy(dtype=np.int64), frame["Neighbour"].to_numpy(dtype=np.int64)
+        codes = np.unique(plz)
+        edge = neighbour >= 0
+        return cls.from_edges(codes, np.searchsorted(codes, plz[edge]), np.searchsorted(codes, neighbour[edge]))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return self._node(code) >= 0
+
+    def _node(self, code):
+        return self._position.get(int(code), -1)
+
+    def neighbours(self, code):
+        """Postal codes adjacent to code, ascending; empty for unknown codes"""
+        i = self._node(code)
+        return self.codes[self.indices[self.indptr[i]:self.indptr[i + 1]]] if i >= 0 else self.codes[:0]
+
+    def ring(self, code, rings=1):
+        """
+        Postal codes at most rings steps from code and their distance in steps,
+        the code itself (0) first, then by distance and code. Unknown codes
+        only return themselves.
+        """
+        key = (int(code), int(rings))
+        cached = self._rings.get(key)
+        if cached is not None:
+            return cached
+
+        node = self._node(code)
+        if node < 0:
+            ret = (np.array([key[0]], dtype=np.int64), np.zeros(1, dtype=np.int64))
+        else:
+            dist = np.full(len(self.codes), -1, dtype=np.int64)
+            dist[node] = 0
+            frontier = np.array([node])
+            for step in range(1, key[1] + 1):
+                reached = np.concatenate([self.indices[self.indptr[i]:self.indptr[i + 1]] for i in frontier]) \
+                    if frontier.size else frontier
+                frontier = np.unique(reached[dist[reached] < 0])
+                dist[frontier] = step
+            found = np.flatnonzero(dist >= 0)
+            found = found[np.argsort(dist[found], kind="stable")]
+            ret = (self.codes[found], dist[found])
+        for arr in ret:
+            arr.setflags(write=False)
+        self._rings[key] = ret
+        return ret
+
+    def matrix(self, rings=1):
+        """Sparse 0/1 matrix of the n-ring neighbourhoods, each code included in its own"""
+        if rings not in self._matrices:
+            from scipy import sparse
+            n = len(self.codes)
+            step = sparse.csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr), shape=(n, n)) + \
+                sparse.identity(n, format="csr")
+            reach = sparse.identity(n, format="csr")
+            for _ in range(rings):
+                reach = reach @ step
+            reach.data[:] = 1.0
+            self._matrices[rings] = reach
+        return self._matrices[rings]
+
+    def smooth(self, codes, values, rings=1, how="mean"):
+        """
+        Sum or mean of values over the n-ring neighbourhood of each code, for
+        values given per code in any order. The mean runs over the areas of the
+        neighbourhood that have a value; codes outside the graph keep their own.
+        """
+        codes, values = np.asarray(codes, dtype=np.int64), np.asarray(values, dtype="float64")
+        if not len(self.codes):
+            return values.copy()
+        pos         = np.searchsorted(self.codes, codes).clip(max=len(self.codes) - 1)
+        in_graph    = self.codes[pos] == codes
+        known       = in_graph & ~np.isnan(values)
+        reach       = self.matrix(rings)
+        totals      = reach @ np.bincount(pos[known], weights=values[known], minlength=len(self.codes))
+        if how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                totals = totals / (reach @ np.bincount(pos[known], minlength=len(self.codes)).astype("float64"))
+        elif how != "sum":
+            raise ValueError(f"Unknown aggregate {how!r}; use 'mean' or 'sum'")
+        return np.where(in_graph, totals[pos], values)
+
+    def smooth_frame(self, frame, value_col, rings=1, how="mean", key="PLZ"):
+        """frame with value_col replaced by its n-ring aggregate; the data version records the smoothing"""
+        if rings < 1:
+            return frame
+        ret = frame.copy(deep=False)
+        ret[value_col] = self.smooth(frame[key].to_numpy(), frame[value_col].to_numpy(), rings, how)
+        ret.attrs = dict(frame.attrs)
+        if "data_version" in frame.attrs:
+            ret.attrs["data_version"] = f"{frame.attrs['data_version']}:{how}{rings}"
+        return ret
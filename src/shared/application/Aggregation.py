@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from shared.application import HelperTools as ht
+from shared.application.Preprocessor import select_lstat
+
+# Lambert azimuthal equal-area (ETRS89-LAEA Europe): areas are not distorted by the projection
+EQUAL_AREA_CRS = "EPSG:3035"
+
+
+# -----------------------------------------------------------------------------
+def polygons_from_wkt(df_geo, key):
+    """Parses a polygon table with WKT geometry (geodata_berlin_*.csv) once into a GeoDataFrame"""
+    return gpd.GeoDataFrame(
+        df_geo[[key]].reset_index(drop=True),
+        geometry=gpd.GeoSeries.from_wkt(df_geo['geometry'].to_numpy()),
+        crs="EPSG:4326",
+    )
+
+
+def assign_polygons(lat, lon, polygons):
+    """
+    Position of the polygon containing each point, -1 where there is none.
+    An STRtree over the polygons yields bounding-box candidates for all points
+    in one call; the exact test then runs against prepared polygons. A point on
+    a shared border goes to the first polygon in table order.
+    """
+    points                  = shapely.points(np.asarray(lon, dtype='float64'), np.asarray(lat, dtype='float64'))
+    geoms                   = polygons.geometry.to_numpy()
+    shapely.prepare(geoms)                      # cached on the geometries, reused by later calls
+
+    point_idx, poly_idx     = shapely.STRtree(geoms).query(points)
+    hit                     = shapely.intersects(geoms[poly_idx], points[point_idx])
+    point_idx, poly_idx     = point_idx[hit], poly_idx[hit]
+
+    # Later writes win, so write the matches in descending polygon order
+    order                   = np.lexsort((-poly_idx, point_idx))
+    ret                     = np.full(len(points), -1, dtype=np.int64)
+    ret[point_idx[order]]   = poly_idx[order]
+    return ret
+
+
+def aggregate_by_polygon(poly_idx, polygons, key, sums=None):
+    """
+    Counts points ("Number") and sums value arrays per polygon with bincount.
+    sums maps output column name to a value array aligned with poly_idx.
+    Geometry is attached once per polygon, never per point.
+    """
+    matched                 = poly_idx >= 0
+    idx                     = poly_idx[matched]
+    n                       = len(polygons)
+
+    ret                     = pd.DataFrame({key: polygons[key].to_numpy()})
+    ret['Number']           = np.bincount(idx, minlength=n)
+    for name, values in (sums or {}).items():
+        weights             = np.nan_to_num(np.asarray(values, dtype='float64')[matched])
+        ret[name]           = np.bincount(idx, weights=weights, minlength=n)
+
+    return gpd.GeoDataFrame(ret, geometry=polygons.geometry.to_numpy(), crs=polygons.crs)
+
+
+# -----------------------------------------------------------------------------
+def join_lstat(dfr, layers):
+    """
+    Assigns every station to the polygons of each layer by location.
+    layers maps a key column (e.g. "PLZ", "Bezirk") to its polygon GeoDataFrame;
+    the key column of the result holds the containing polygon's key (NaN if none)
+    and the self-reported postal code is kept as "PLZ_gemeldet".
+    """
+    dframe2                 = select_lstat(dfr).rename(columns={"PLZ": "PLZ_gemeldet"})
+    lat                     = dframe2['Breitengrad'].to_numpy()
+    lon                     = dframe2['Längengrad'].to_numpy()
+
+    for key, polygons in layers.items():
+        poly_idx            = assign_polygons(lat, lon, polygons)
+        keys                = polygons[key].to_numpy()
+        dframe2[key + '_idx'] = poly_idx
+        dframe2[key]        = pd.Series(keys[poly_idx], index=dframe2.index).where(poly_idx >= 0)
+    return dframe2
+
+
+@ht.timer
+def aggregate_lstat(dfr, polygons, key):
+    """Counts loading stations and sums kW per polygon via spatial join"""
+    joined                  = join_lstat(dfr, {key: polygons})
+    return aggregate_by_polygon(
+        joined[key + '_idx'].to_numpy(), polygons, key, sums={'KW': joined['KW'].to_numpy()}
+    )
+
+
+# -----------------------------------------------------------------------------
+TRAFFIC_SUMS                = ['Kfz', 'Lkw', 'Kfz_km', 'Lkw_km']
+
+
+def traffic_by_district(dframe, districts):
+    """
+    Road segments ("Number"), summed daily traffic (Kfz, Lkw) and vehicle
+    kilometres per day (Kfz_km, Lkw_km) per district polygon. Segments are
+    matched by district name; the segment length is Bis- minus Von-Station.
+    """
+    codes                   = pd.Categorical(dframe['Bezirk'].astype(object), categories=districts['Bezirk']).codes
+    length_km               = (dframe['Bis-Station'] - dframe['Von-Station']).clip(lower=0).to_numpy() / 1000
+    kfz                     = dframe['DTVw-2019-Kfz'].to_numpy(dtype='float64')
+    lkw                     = dframe['DTVw-2019-Lkw'].to_numpy(dtype='float64')
+    return aggregate_by_polygon(
+        codes.astype(np.int64), districts, 'Bezirk',
+        sums={'Kfz': kfz, 'Lkw': lkw, 'Kfz_km': kfz * length_km, 'Lkw_km': lkw * length_km},
+    )
+
+
+def area_weights(source, target, crs=EQUAL_AREA_CRS):
+    """
+    Overlapping (source, target) polygon pairs and the share of the source
+    area inside the target, computed in an equal-area CRS.
+    """
+    src                     = source.geometry.to_crs(crs).to_numpy()
+    tgt                     = target.geometry.to_crs(crs).to_numpy()
+    src_idx, tgt_idx        = shapely.STRtree(tgt).query(src, predicate='intersects')
+    overlap                 = shapely.area(shapely.intersection(src[src_idx], tgt[tgt_idx]))
+    share                   = overlap / shapely.area(src)[src_idx]
+    return src_idx, tgt_idx, share
+
+
+def redistribute(frame, columns, target, key, weights):
+    """Moves the source totals in columns onto the target polygons in proportion to the overlapping area"""
+    src_idx, tgt_idx, share = weights
+    ret                     = pd.DataFrame({key: target[key].to_numpy()})
+    for c in columns:
+        values              = frame[c].to_numpy(dtype='float64')[src_idx] * share
+        ret[c]              = np.bincount(tgt_idx, weights=values, minlength=len(target))
+    return gpd.GeoDataFrame(ret, geometry=target.geometry.to_numpy(), crs=target.crs)
+
+
+@ht.timer
+def aggregate_traffic(dframe, districts, plz_polygons, key):
+    """Traffic per district, and per PLZ by area share of each district"""
+    dis                     = traffic_by_district(dframe, districts)
+    plz                     = redistribute(dis, TRAFFIC_SUMS, plz_polygons, key, area_weights(districts, plz_polygons))
+    return dis, plz
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shared.application import Aggregation as agg
+from shared.application.Metrics import timed
+
+
+# -----------------------------------------------------------------------------
+def plz_areas(plz_polygons, districts, dframe_resid, key="PLZ"):
+    """
+    One row per PLZ polygon with its residents and the district ("Bezirk")
+    its representative point lies in. PLZ without resident data get 0.
+    """
+    points                  = plz_polygons.geometry.representative_point()
+    district_idx            = agg.assign_polygons(points.y.to_numpy(), points.x.to_numpy(), districts)
+    residents               = dframe_resid.groupby(key)['Einwohner'].sum()
+
+    ret                     = gpd.GeoDataFrame({
+        key:                plz_polygons[key].to_numpy(),
+        'Bezirk_idx':       district_idx,
+        'Einwohner':        plz_polygons[key].map(residents).fillna(0).to_numpy(dtype='float64'),
+    }, geometry=plz_polygons.geometry.to_numpy(), crs=plz_polygons.crs)
+    return ret
+
+
+def coverage_metrics(residents, chargers, kw):
+    """
+    Residents per charger and kW per 1000 residents. An area with residents
+    but no charger has infinitely many residents per charger; areas without
+    residents have no value (NaN).
+    """
+    residents               = np.asarray(residents, dtype='float64')
+    chargers                = np.asarray(chargers, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_charger         = np.where(chargers > 0, residents / chargers,
+                                       np.where(residents > 0, np.inf, np.nan))
+        kw_per_1000         = np.where(residents > 0, np.asarray(kw, dtype='float64') / residents * 1000, np.nan)
+    return per_charger, kw_per_1000
+
+
+def underserved_rank(per_charger, residents):
+    """Rank 1 is the worst served area: most residents per charger, ties by more residents, NaN last"""
+    order                   = np.lexsort((-np.asarray(residents, dtype='float64'),
+                                          -np.nan_to_num(per_charger, nan=-1.0, posinf=np.finfo('float64').max)))
+    rank                    = np.empty(len(order), dtype=np.int64)
+    rank[order]             = np.arange(1, len(order) + 1)
+    return rank
+
+
+# -----------------------------------------------------------------------------
+class CoverageResult:
+    """Supply/demand tables for one filter setting, per PLZ and per district"""
+
+    def __init__(self, plz, districts, min_kw):
+        self.plz = plz
+        self.districts = districts
+        self.min_kw = min_kw
+
+    def underserved(self, n=10, level="plz"):
+        """The n worst served areas, worst first"""
+        frame = self.plz if level == "plz" else self.districts
+        return frame.sort_values('Rank').head(n).drop(columns='geometry')
+
+    def layer(self):
+        """
+        Per-PLZ frame for the map. Areas with residents but no charger at or
+        above min_kw are NaN, which the map draws in its no-data colour instead
+        of the colour scale; areas without residents are 0.
+        """
+        values = self.plz['Residents_per_charger'].to_numpy()
+        ret = self.plz[['PLZ', 'Number', 'Einwohner', 'Residents_per_charger', 'geometry']].copy(deep=False)
+        ret['Residents_per_charger'] = np.round(np.where(np.isinf(values), np.nan, np.nan_to_num(values, nan=0.0)), 1)
+        ret.attrs = dict(self.plz.attrs)
+        return ret
+
+
+class CoverageModel:
+    """
+    Joins charging supply and residents on PLZ and district. The station to
+    area assignment is computed once with the datasets; compute() is then a
+    handful of bincounts over the station arrays, so filters such as a minimum
+    charger power can be applied on every rerun.
+    """
+
+    def __init__(self, areas, districts, station_plz_idx, station_district_idx, station_kw, version=None,
+                 traffic=None):
+        self.areas = areas
+        self.districts = districts
+        self.station_plz_idx = np.asarray(station_plz_idx, dtype=np.int64)
+        self.station_district_idx = np.asarray(station_district_idx, dtype=np.int64)
+        self.station_kw = np.nan_to_num(np.asarray(station_kw, dtype='float64'))
+        self.version = version
+
+        # Optional (per PLZ, per district) traffic frames aligned with areas and districts
+        self.plz_traffic = self.district_traffic = None
+        if traffic is not None:
+            self.plz_traffic = traffic[0]['Kfz_km'].to_numpy(dtype='float64')
+            self.district_traffic = traffic[1]['Kfz_km'].to_numpy(dtype='float64')
+
+        # Residents per district, summed from the PLZ they contain
+        plz_district = areas['Bezirk_idx'].to_numpy()
+        inside = plz_district >= 0
+        self.district_residents = np.bincount(plz_district[inside], weights=areas['Einwohner'].to_numpy()[inside],
+                                              minlength=len(districts))
+
+    @classmethod
+    def from_frames(cls, joined, areas, districts, version=None, traffic=None):
+        """
+        Model from join_lstat output (PLZ_idx, Bezirk_idx, KW), plz_areas and
+        the district polygons; traffic is an optional (per PLZ, per district)
+        pair of aggregate_traffic frames
+        """
+        return cls(areas, districts, joined['PLZ_idx'].to_numpy(), joined['Bezirk_idx'].to_numpy(),
+                   joined['KW'].to_numpy(), version, traffic)
+
+    def _table(self, key, keys, geometry, crs, idx, kw, residents, traffic=None):
+        matched = idx >= 0
+        n = len(keys)
+        chargers = np.bincount(idx[matched], minlength=n)
+        kw_sum = np.bincount(idx[matched], weights=kw[matched], minlength=n)
+        per_charger, kw_per_1000 = coverage_metrics(residents, chargers, kw_sum)
+        return gpd.GeoDataFrame({
+            key: keys,
+            'Einwohner': residents,
+            'Number': chargers,
+            'KW': kw_sum,
+            'Residents_per_charger': per_charger,
+            'KW_per_1000': kw_per_1000,
+            'Rank': underserved_rank(per_charger, residents),
+            **self._traffic_columns(traffic, chargers),
+        }, geometry=geometry, crs=crs)
+
+    @staticmethod
+    def _traffic_columns(traffic, chargers):
+        """Vehicle kilometres per day and per charger, if traffic data is loaded"""
+        if traffic is None:
+            return {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_charger = np.where(chargers > 0, traffic / chargers, np.where(traffic > 0, np.inf, np.nan))
+        return {'Kfz_km': traffic, 'Kfz_km_per_charger': per_charger}
+
+    @timed()
+    def compute(self, min_kw=0.0):
+        """Coverage per PLZ and district counting only chargers with at least min_kw"""
+        keep = self.station_kw >= min_kw if min_kw > 0 else np.ones(len(self.station_kw), dtype=bool)
+        kw = self.station_kw[keep]
+
+        plz = self._table('PLZ', self.areas['PLZ'].to_numpy(), self.areas.geometry.to_numpy(), self.areas.crs,
+                          self.station_plz_idx[keep], kw, self.areas['Einwohner'].to_numpy(), self.plz_traffic)
+        districts = self._table('Bezirk', self.districts['Bezirk'].to_numpy(), self.districts.geometry.to_numpy(),
+                                self.districts.crs, self.station_district_idx[keep], kw, self.district_residents,
+                                self.district_traffic)
+        plz['Bezirk'] = pd.Series(self.districts['Bezirk'].to_numpy()[self.areas['Bezirk_idx'].to_numpy()]) \
+            .where(self.areas['Bezirk_idx'].to_numpy() >= 0).to_numpy()
+        if self.version is not None:
+            plz.attrs["data_version"] = f"{self.version}:coverage:{min_kw}"
+        return CoverageResult(plz, districts, min_kw)
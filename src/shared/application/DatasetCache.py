@@ -0,0 +1,113 @@
+import os
+import glob
+import json
+import hashlib
+import pickle
+import tempfile
+
+import pandas as pd
+import geopandas as gpd
+from geopandas.array import GeometryDtype
+from shared.application import HelperTools as ht
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:                     # pickle snapshots if pyarrow is not installed
+    pq = None
+
+# Bump whenever the preprocessing changes its output, so old snapshots are not reused
+SNAPSHOT_VERSION = 7
+
+
+# -----------------------------------------------------------------------------
+def file_digest(path, blocksize=1 << 20):
+    """Content hash of a single source file"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(blocksize), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def dataset_version(source_files, pdict):
+    """Version key: hash of all source file contents plus the config"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(str(SNAPSHOT_VERSION).encode())
+    for path in sorted(source_files):
+        h.update(path.encode())
+        h.update(file_digest(path).encode() if os.path.exists(path) else b"missing")
+    h.update(json.dumps(pdict, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def source_stamp(source_files, pdict):
+    """Cheap change marker from file size and mtime, for keys checked on every rerun"""
+    stats = [(p, os.stat(p).st_size, os.stat(p).st_mtime_ns) if os.path.exists(p) else (p, None, None)
+             for p in sorted(source_files)]
+    return dataset_version([], {"stats": stats, "pdict": pdict})
+
+
+# -----------------------------------------------------------------------------
+class DatasetCache:
+    """Versioned on-disk snapshots of preprocessed datasets (GeoParquet, WKB geometry)"""
+
+    def __init__(self, folder, source_files, pdict):
+        self.folder     = folder
+        self.version    = dataset_version(source_files, pdict)
+        self.extension  = ".parquet" if pq is not None else ".pkl"
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, name, version=None):
+        return os.path.join(self.folder, f"{name}-{version or self.version}{self.extension}")
+
+    def load(self, name):
+        """Returns the snapshot for the current version, or None if there is none or it is unreadable"""
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            if pq is None:
+                return ht.pickle_in(path)
+            metadata = pq.read_schema(path).metadata or {}
+            if b"geo" in metadata:
+                return gpd.read_parquet(path)
+            return pd.read_parquet(path)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            # Truncated or corrupt snapshot: rebuilt and replaced by the next store
+            return None
+
+    def store(self, name, dframe):
+        """
+        Writes the snapshot for the current version and drops outdated ones. The
+        file is written under a temporary name and moved into place, so readers
+        never see a partly written snapshot.
+        """
+        path = self._path(name)
+        fd, tmp = tempfile.mkstemp(dir=self.folder, prefix=f".{name}-", suffix=".tmp")
+        os.close(fd)
+        try:
+            if pq is None:
+                ht.pickle_out(dframe, tmp)
+            else:
+                if not isinstance(dframe, gpd.GeoDataFrame) and "geometry" in dframe.columns \
+                        and isinstance(dframe["geometry"].dtype, GeometryDtype):
+                    dframe = gpd.GeoDataFrame(dframe, geometry="geometry")
+                dframe.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        for old in glob.glob(self._path(name, "*")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:       # removed by another process
+                    pass
+
+    def get_or_build(self, name, builder):
+        """Loads the named snapshot, or builds and stores it on a miss"""
+        dframe = self.load(name)
+        if dframe is None:
+            dframe = builder()
+            self.store(name, dframe)
+        return dframe
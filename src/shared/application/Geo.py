@@ -0,0 +1,22 @@
+import numpy as np
+
+# Mean earth radius in metres
+EARTH_RADIUS_M = 6_371_008.8
+
+
+def to_xyz(lat, lon):
+    """Projects lat/lon (degrees) onto 3D cartesian coordinates in metres on a sphere"""
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1) * EARTH_RADIUS_M
+
+
+def chord_to_arc(chord):
+    """Straight-line distance through the sphere to great-circle distance (metres)"""
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.clip(chord / (2 * EARTH_RADIUS_M), 0, 1))
+
+
+def arc_to_chord(arc):
+    """Great-circle distance to straight-line distance through the sphere (metres)"""
+    return 2 * EARTH_RADIUS_M * np.sin(np.minimum(arc, np.pi * EARTH_RADIUS_M) / (2 * EARTH_RADIUS_M))
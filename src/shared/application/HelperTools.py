@@ -3,25 +3,15 @@ import pandas as pd
 
 import pickle
 
-import time    
-import functools   
 import random
 from collections import Counter, OrderedDict
+from shared.application.Metrics import timed
 
 #------------------------------------------------------------------------------
 
 def timer(func):
-    """Print the runtime of the decorated function"""
-    @functools.wraps(func)
-    def wrapper_timer(*args, **kwargs):
-        start_time = time.perf_counter()  # 1
-        value = func(*args, **kwargs)
-        end_time = time.perf_counter()  # 2
-        run_time = end_time - start_time  # 3
-        print(" ====> Duration {:.2f} secs: {}".format(run_time, func.__doc__))
-        return value
-
-    return wrapper_timer #  no "()" here, we need the object to be returned.
+    """Record the runtime of the decorated function in the metrics registry (see Metrics.timed)"""
+    return timed()(func)
 
 #------------------------------------------------------------------------------
 # predicates
@@ -127,33 +117,27 @@ def popRowFromDF(dframe, indexVal):
     ShrinkedDF = dframe.drop(indexVal)
     return poppedRow, ShrinkedDF
 
+def _is_selectable(ser):
+    """nsmallest/nlargest handle numbers only, and would drop NaN rows"""
+    return pd.api.types.is_numeric_dtype(ser) and not pd.api.types.is_bool_dtype(ser) and not ser.hasnans
+
 @timer    
-def sortDF(dframe,col,asc):         #Pandas-df, String, Boolean
+def sortDF(dframe,col,asc,k=None):         #Pandas-df, String or list, Boolean or list, int
     """Sorts DataFrame"""
 
-    dfColList = dframe.columns.values
-    retDF = pd.DataFrame(columns=dfColList)
-    while not dframe.empty:
-    #for i in range(4):      
-
-        dfCol = dframe[col]     
-
-        poppedStackdfCol = min(dfCol) if asc == True else max(dfCol)
-        poppedStackIndexVal = dframe \
-            .index[dframe[col] == poppedStackdfCol] \
-            .tolist()
-
-        #falls höchster/niedrigster Rang mehrfach vorliegt, wird der erste in Liste genommen 
-        poppedRow, dframe = popRowFromDF(dframe, poppedStackIndexVal[0])        
-        dict_row = dict(zip(dfColList, poppedRow))
-#        retDF = pd.concat([retDF, dict_row], axis = 1, ignore_index = True)
-        
-        # retDF = retDF \
-        #     .append(dict_row, ignore_index = True)
-            
-        retDF = pd.concat([retDF, pd.DataFrame([dict_row])], ignore_index=True)
-
-    return retDF
+    # Stable sort: among equal values the row that comes first stays first, as the
+    # former pop-min/max loop did. col/asc may be lists for multi-key sorts.
+    # With k only the first k rows are returned, selected via partial sort.
+    if k is not None and isinstance(col, str) and _is_selectable(dframe[col]):
+        retDF = dframe.nsmallest(k, col, keep="first") if asc == True \
+            else dframe.nlargest(k, col, keep="first")
+        return retDF.reset_index(drop=True)
+
+    retDF = dframe.sort_values(by=col, ascending=asc, kind="stable", na_position="last")
+    if k is not None:
+        retDF = retDF.head(k)
+
+    return retDF.reset_index(drop=True)
 
 # END
 #------------------------------------------------------------------------------
@@ -0,0 +1,185 @@
+import bisect
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+# -----------------------------------------------------------------------------
+class StageMetrics:
+    """Call count, latency histogram and peak traced memory of one stage"""
+
+    __slots__ = ("count", "total", "min", "max", "buckets", "peak_bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.peak_bytes = None
+
+    def observe(self, seconds, peak_bytes=None):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if peak_bytes is not None:
+            self.peak_bytes = max(self.peak_bytes or 0, peak_bytes)
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else None,
+            "min_s": self.min if self.count else None,
+            "max_s": self.max,
+            "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.buckets)),
+            "peak_bytes": self.peak_bytes,
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process store of StageMetrics by stage name. Disabled by default: the
+    timed decorator then costs one attribute check per call. With memory
+    tracking, tracemalloc runs and every stage also records the peak of the
+    memory it allocated; this slows allocations down and is meant for
+    profiling sessions only. tracemalloc has a single peak per process, so
+    the peak of a stage includes stages running concurrently in other threads.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_memory = False
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, memory=False):
+        self.enabled = True
+        self.track_memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.track_memory = False
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+
+    def observe(self, stage, seconds, peak_bytes=None):
+        """Records one call of stage"""
+        with self._lock:
+            metrics = self._stages.get(stage)
+            if metrics is None:
+                metrics = self._stages[stage] = StageMetrics()
+            metrics.observe(seconds, peak_bytes)
+
+    def get(self, stage):
+        return self._stages.get(stage)
+
+    def snapshot(self):
+        """All stages as plain dicts, by name"""
+        with self._lock:
+            return {name: m.as_dict() for name, m in sorted(self._stages.items())}
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix="charging"):
+        """Prometheus text exposition format: a latency histogram and a peak memory gauge per stage"""
+        lines = [f"# TYPE {prefix}_stage_duration_seconds histogram"]
+        stages = self.snapshot()
+        for name, m in stages.items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, n in m["buckets"].items():
+                cumulative += n
+                lines.append(f'{prefix}_stage_duration_seconds_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_duration_seconds_sum{{stage="{label}"}} {m["total_s"]}')
+            lines.append(f'{prefix}_stage_duration_seconds_count{{stage="{label}"}} {m["count"]}')
+        lines.append(f"# TYPE {prefix}_stage_peak_memory_bytes gauge")
+        for name, m in stages.items():
+            if m["peak_bytes"] is not None:
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{prefix}_stage_peak_memory_bytes{{stage="{label}"}} {m["peak_bytes"]}')
+        return "\n".join(lines) + "\n"
+
+    # -- measurement ---------------------------------------------------------
+    def _frames(self):
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _enter_memory(self):
+        """
+        Starts a nested peak measurement. tracemalloc has one global peak, so
+        the peak reached so far is handed to the enclosing stage before reset.
+        """
+        frames = self._frames()
+        current, peak = tracemalloc.get_traced_memory()
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        tracemalloc.reset_peak()
+        frames.append([current, current])
+
+    def _exit_memory(self):
+        frames = self._frames()
+        start, child_peak = frames.pop()
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, child_peak)
+        if frames:
+            frames[-1][1] = max(frames[-1][1], peak)
+        return peak - start
+
+    def measure(self, stage, func, *args, **kwargs):
+        """Calls func and records its latency (and peak memory) under stage"""
+        memory = self.track_memory and tracemalloc.is_tracing()
+        if memory:
+            self._enter_memory()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(stage, seconds, self._exit_memory() if memory else None)
+
+
+# Process-wide registry used by timed() and HelperTools.timer
+registry = MetricsRegistry()
+
+
+def stage_name(func):
+    """'<module>.<qualname>' with the last component of the module path"""
+    return f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+
+def timed(stage=None, metrics=None):
+    """
+    Decorator recording calls of the function in the registry under stage
+    (default: stage_name(func)). When the registry is disabled the function
+    is called directly.
+    """
+    def decorator(func):
+        name = stage or stage_name(func)
+        reg = metrics or registry
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not reg.enabled:
+                return func(*args, **kwargs)
+            return reg.measure(name, func, *args, **kwargs)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,125 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+from shared.application.Metrics import registry
+
+
+def enable_copy_on_write():
+    """
+    Turns on pandas copy-on-write (always on from pandas 3). Frames derived
+    from a stage result then share its buffers until one of them is written,
+    so stages need no defensive copies and cannot modify each other's inputs.
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def view(value):
+    """
+    Frames and series as a shallow copy: no data is copied, but columns a
+    consumer adds, drops or (with copy-on-write) writes stay its own
+    """
+    return value.copy(deep=False) if isinstance(value, (pd.DataFrame, pd.Series)) else value
+
+
+class Stage:
+    """One named step: func(*results of deps), optionally loaded from / stored to a snapshot"""
+
+    def __init__(self, name, func, deps=(), load=None, store=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.load = load
+        self.store = store
+
+
+class Pipeline:
+    """
+    Dataset loading and preprocessing as a small dependency graph.
+
+    run() first tries the snapshot loads of all reachable stages at once,
+    then executes only the stages a missing result depends on; every stage
+    starts as soon as its dependencies are done, so independent branches
+    (stations, residents, traffic) run side by side. A thread pool is used
+    rather than processes: the heavy parts (CSV parsing, GEOS, parquet)
+    release the GIL, and results such as the parsed geodata are shared
+    between stages without pickling or copying.
+
+    Each stage receives views of its inputs (see view()), so a result exists
+    once in memory however many stages read it, and with copy-on-write a
+    stage that modifies its input only copies the columns it writes.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.stages = {}
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, func, deps=(), load=None, store=None):
+        """Registers a stage; deps are stage names whose results are passed to func in order"""
+        unknown = [d for d in deps if d not in self.stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on unknown stages {unknown}")
+        self.stages[name] = Stage(name, func, deps, load, store)
+        return self
+
+    def _reachable(self, targets):
+        seen, todo = [], list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in seen:
+                seen.append(name)
+                todo.extend(self.stages[name].deps)
+        return seen
+
+    def _timed(self, label, func, *args):
+        start = time.perf_counter()
+        value = registry.measure("pipeline." + label, func, *args) if registry.enabled else func(*args)
+        with self._lock:
+            self.timings[label] = time.perf_counter() - start
+        return value
+
+    def _execute(self, stage, *args):
+        value = self._timed(stage.name, stage.func, *args)
+        if stage.store is not None:
+            self._timed(stage.name + ":store", stage.store, value)
+        return value
+
+    def run(self, targets):
+        """Results of the target stages (and everything computed on the way) by name"""
+        self.timings = {}
+        results = {}
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            loads = {name: pool.submit(self._timed, name + ":load", self.stages[name].load)
+                     for name in self._reachable(targets) if self.stages[name].load is not None}
+            for name, future in loads.items():
+                value = future.result()
+                if value is not None:
+                    results[name] = value
+
+            # Stages to execute: missing targets and, recursively, their missing dependencies
+            pending, todo = set(), [t for t in targets if t not in results]
+            while todo:
+                name = todo.pop()
+                if name not in pending:
+                    pending.add(name)
+                    todo.extend(d for d in self.stages[name].deps if d not in results)
+
+            running = {}
+            while pending or running:
+                for name in [n for n in pending if all(d in results for d in self.stages[n].deps)]:
+                    stage = self.stages[name]
+                    running[pool.submit(self._execute, stage, *(view(results[d]) for d in stage.deps))] = name
+                    pending.discard(name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return results
+
+    def report(self):
+        """Prints the stage timings of the last run, slowest first"""
+        for label, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            print(" ====> Duration {:.2f} secs: stage {}".format(seconds, label))
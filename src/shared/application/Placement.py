@@ -0,0 +1,209 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial import cKDTree
+from shared.application import Aggregation as agg
+from shared.application.Geo import to_xyz, chord_to_arc, arc_to_chord
+from shared.application.Metrics import timed
+
+# Length of one degree of latitude in metres
+METRES_PER_DEGREE = 111_320.0
+
+
+# -----------------------------------------------------------------------------
+def grid_points(bounds, spacing_m):
+    """Cell centres of a regular grid with about spacing_m metres between points over (west, south, east, north)"""
+    west, south, east, north = bounds
+    dlat                    = spacing_m / METRES_PER_DEGREE
+    dlon                    = spacing_m / (METRES_PER_DEGREE * np.cos(np.radians((south + north) / 2)))
+    lat, lon                = np.meshgrid(np.arange(south + dlat / 2, north, dlat),
+                                          np.arange(west + dlon / 2, east, dlon), indexing='ij')
+    return lat.ravel(), lon.ravel()
+
+
+def demand_grid(areas, spacing_m):
+    """
+    Residents of every PLZ spread evenly over the grid cells inside it; PLZ
+    smaller than a cell put theirs on their representative point.
+    Returns lat, lon, residents and the PLZ position of each demand point.
+    """
+    lat, lon                = grid_points(areas.total_bounds, spacing_m)
+    idx                     = agg.assign_polygons(lat, lon, areas)
+    inside                  = idx >= 0
+    lat, lon, idx           = lat[inside], lon[inside], idx[inside]
+
+    residents               = areas['Einwohner'].to_numpy(dtype='float64')
+    cells                   = np.bincount(idx, minlength=len(areas))
+    missing                 = np.flatnonzero((cells == 0) & (residents > 0))
+    if missing.size:
+        points              = areas.geometry.iloc[missing].representative_point()
+        lat                 = np.concatenate([lat, points.y.to_numpy()])
+        lon                 = np.concatenate([lon, points.x.to_numpy()])
+        idx                 = np.concatenate([idx, missing])
+        cells[missing]      = 1
+    return lat, lon, residents[idx] / cells[idx], idx
+
+
+# -----------------------------------------------------------------------------
+class PlacementOptimizer:
+    """
+    Scores candidate charger sites by the residents they would bring within
+    radius_m of a charger, and picks k new sites by greedy max coverage.
+
+    Demand is a grid of resident points (see demand_grid); points that already
+    have a station within radius_m count as covered. With per-PLZ traffic the
+    residents of a PLZ are weighted by 1 + traffic_weight * its traffic
+    density relative to the busiest PLZ, which keeps the objective submodular.
+    Candidates and demand points are matched once into a sparse candidate x
+    demand matrix through KD-trees, so scoring is a matrix-vector product.
+    """
+
+    def __init__(self, areas, station_lat, station_lon, radius_m=500.0, spacing_m=250.0, traffic=None,
+                 traffic_weight=0.5):
+        self.areas = areas
+        self.radius_m = radius_m
+        self.spacing_m = spacing_m
+        self._grid = None
+
+        lat, lon, weight, idx = demand_grid(areas, spacing_m)
+        if traffic is not None:
+            # PLZ without traffic data count as no traffic; without any traffic all weights stay 1
+            density = np.asarray(traffic, dtype='float64') / areas.to_crs(agg.EQUAL_AREA_CRS).area.to_numpy()
+            density = np.nan_to_num(density, nan=0.0)
+            peak = density.max() if density.size else 0.0
+            if peak > 0:
+                weight = weight * (1 + traffic_weight * (density / peak)[idx])
+        self.demand_lat, self.demand_lon, self.weight = lat, lon, weight
+        self.demand_tree = cKDTree(to_xyz(lat, lon))
+
+        station_lat = np.asarray(station_lat, dtype='float64')
+        station_lon = np.asarray(station_lon, dtype='float64')
+        valid = np.isfinite(station_lat) & np.isfinite(station_lon)
+        self.station_tree = cKDTree(to_xyz(station_lat[valid], station_lon[valid])) if valid.any() else None
+        if self.station_tree is not None:
+            distance, _ = self.station_tree.query(self.demand_tree.data, distance_upper_bound=arc_to_chord(radius_m))
+            self.uncovered = ~np.isfinite(distance)
+        else:
+            self.uncovered = np.ones(len(weight), dtype=bool)
+
+    def candidates(self):
+        """Grid of candidate sites inside the PLZ areas, spacing_m apart"""
+        lat, lon = grid_points(self.areas.total_bounds, self.spacing_m)
+        inside = agg.assign_polygons(lat, lon, self.areas) >= 0
+        return lat[inside], lon[inside]
+
+    def coverage_matrix(self, lat, lon):
+        """
+        Sparse (candidate x demand point) matrix, 1 where the demand point lies
+        within radius_m; candidates without valid coordinates get empty rows
+        """
+        lat = np.asarray(lat, dtype='float64')
+        lon = np.asarray(lon, dtype='float64')
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        tree = cKDTree(to_xyz(lat[valid], lon[valid]))
+        pairs = tree.sparse_distance_matrix(self.demand_tree, arc_to_chord(self.radius_m), output_type='ndarray')
+        return sparse.csr_matrix((np.ones(len(pairs)), (valid[pairs['i']], pairs['j'])),
+                                 shape=(len(lat), len(self.weight)))
+
+    def _grid_matrix(self):
+        if self._grid is None:
+            lat, lon = self.candidates()
+            self._grid = lat, lon, self.coverage_matrix(lat, lon)
+        return self._grid
+
+    @timed()
+    def score(self, lat, lon):
+        """
+        Per candidate: residents within radius_m ("Population"), the part of
+        them not yet within radius_m of a station ("Uncovered", the Score),
+        and the distance to the nearest existing station. Candidates without
+        valid coordinates get NaN.
+        """
+        lat = np.asarray(lat, dtype='float64')
+        lon = np.asarray(lon, dtype='float64')
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        ret = pd.DataFrame(np.nan, index=range(len(lat)),
+                           columns=['Population', 'Uncovered', 'Nearest_station_m', 'Score'])
+        if not valid.any():
+            return ret
+
+        matrix = self.coverage_matrix(lat[valid], lon[valid])
+        ret.loc[valid, 'Population'] = matrix @ self.weight
+        ret.loc[valid, 'Uncovered'] = matrix @ (self.weight * self.uncovered)
+        if self.station_tree is not None:
+            distance, _ = self.station_tree.query(to_xyz(lat[valid], lon[valid]))
+            ret.loc[valid, 'Nearest_station_m'] = chord_to_arc(distance)
+        ret['Score'] = ret['Uncovered']
+        return ret
+
+    def score_suggestions(self, suggestions):
+        """Suggestions (SuggestionStore columns) with their scores, best first, nearest station breaking ties"""
+        scores = self.score(suggestions['Latitude'].to_numpy(dtype='float64'),
+                            suggestions['Longitude'].to_numpy(dtype='float64'))
+        ret = pd.concat([suggestions.reset_index(drop=True), scores], axis=1)
+        return ret.sort_values(['Score', 'Nearest_station_m'], ascending=False, kind='stable')
+
+    @timed()
+    def place(self, k, lat=None, lon=None, lazy=True):
+        """
+        The k sites among the candidates (default: the candidate grid) that
+        together cover the most uncovered demand. Each pick removes the demand
+        it covers; picks stop early once no candidate adds anything.
+        Lazy greedy re-evaluates a candidate only when it reaches the top of
+        the heap, since gains can only shrink; like plain greedy it breaks ties
+        by the lower candidate index.
+        """
+        if lat is None:
+            lat, lon, matrix = self._grid_matrix()
+        else:
+            lat, lon = np.asarray(lat, dtype='float64'), np.asarray(lon, dtype='float64')
+            matrix = self.coverage_matrix(lat, lon)
+
+        remaining = self.weight * self.uncovered
+        picks = self._lazy_greedy(matrix, remaining, k) if lazy else self._greedy(matrix, remaining, k)
+        idx = np.array([i for i, _ in picks], dtype=np.int64)
+        gain = np.array([g for _, g in picks], dtype='float64')
+        return pd.DataFrame({
+            'Candidate': idx,
+            'Latitude': lat[idx],
+            'Longitude': lon[idx],
+            'Gain': gain,
+            'Covered': np.cumsum(gain),
+        })
+
+    @staticmethod
+    def _row(matrix, i):
+        return matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]]
+
+    def _greedy(self, matrix, remaining, k):
+        remaining = remaining.copy()
+        picks = []
+        for _ in range(k):
+            gains = matrix @ remaining
+            i = int(np.argmax(gains))
+            if gains[i] <= 0:
+                break
+            picks.append((i, float(gains[i])))
+            remaining[self._row(matrix, i)] = 0
+        return picks
+
+    def _lazy_greedy(self, matrix, remaining, k):
+        remaining = remaining.copy()
+        gains = matrix @ remaining
+        heap = [(-g, i) for i, g in zip(np.flatnonzero(gains > 0).tolist(), gains[gains > 0].tolist())]
+        heapq.heapify(heap)
+        picks = []
+        while heap and len(picks) < k:
+            _, i = heapq.heappop(heap)
+            row = self._row(matrix, i)
+            gain = float(remaining[row].sum())
+            if gain <= 0:
+                continue
+            if heap and (-gain, i) > heap[0]:
+                heapq.heappush(heap, (-gain, i))
+                continue
+            picks.append((i, gain))
+            remaining[row] = 0
+        return picks
@@ -1,49 +1,90 @@
+import logging
 import pandas as pd
-import geopandas as gpd
 from shared.application import HelperTools as ht
 
+COORD_COLUMNS = ['Breitengrad', 'Längengrad']
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------------------------------------------------------
+def parse_coordinates(col):
+    """
+    Vectorized float64 parse of a coordinate column. Numeric columns are only
+    cast; in text columns comma and dot decimals are both accepted, and only
+    the entries that do not parse directly go through a string replace.
+    Returns the float64 series and the number of non-empty values rejected.
+    """
+    if pd.api.types.is_numeric_dtype(col) and not pd.api.types.is_bool_dtype(col):
+        return col.astype('float64'), 0
+
+    values                  = pd.to_numeric(col, errors='coerce').astype('float64')
+    retry                   = values.isna() & col.notna()
+    if retry.any():
+        values[retry]       = pd.to_numeric(col[retry].astype(str).str.replace(',', '.', regex=False), errors='coerce')
+    rejected                = int((values.isna() & col.notna()).sum())
+    return values, rejected
+
+
+def normalize_coordinates(dframe, columns=COORD_COLUMNS):
+    """
+    Replaces the coordinate columns by float64 columns; returns the frame and
+    rejects per column, which are also kept in dframe.attrs["coordinate_rejects"]
+    so they travel with the loaded frame.
+    """
+    rejects                 = {}
+    for c in columns:
+        dframe[c], rejects[c] = parse_coordinates(dframe[c])
+    dframe.attrs["coordinate_rejects"] = rejects
+    if any(rejects.values()):
+        logger.warning("Invalid coordinates set to NaN: %s", rejects)
+    return dframe, rejects
+
 
 def sort_by_plz_add_geometry(dfr, dfg, pdict): 
-    dframe                  = dfr.copy()
-    df_geo                  = dfg.copy()
-    
-    sorted_df               = dframe\
+    """
+    Sorts by PLZ and adds the PLZ polygons of dfg, which may hold WKT or
+    parsed geometry. Neither input is modified, so neither is copied.
+    """
+    import geopandas as gpd
+
+    sorted_df               = dfr\
         .sort_values(by='PLZ')\
-        .reset_index(drop=True)\
-        .sort_index()
+        .reset_index(drop=True)
         
-    sorted_df2              = sorted_df.merge(df_geo, on=pdict["geocode"], how ='left')
+    sorted_df2              = sorted_df.merge(dfg, on=pdict["geocode"], how ='left')
     sorted_df3              = sorted_df2.dropna(subset=['geometry'])
     
-    sorted_df3['geometry']  = gpd.GeoSeries.from_wkt(sorted_df3['geometry'])
-    ret                     = gpd.GeoDataFrame(sorted_df3, geometry='geometry')
+    geometry                = sorted_df3['geometry']
+    if not isinstance(geometry.dtype, gpd.array.GeometryDtype):
+        geometry            = gpd.GeoSeries.from_wkt(geometry)
+    ret                     = gpd.GeoDataFrame(sorted_df3.drop(columns='geometry'), geometry=geometry, crs=getattr(dfg, 'crs', None))
     
     return ret
 
 
 # -----------------------------------------------------------------------------
-@ht.timer
-def preprop_lstat(dfr, dfg, pdict):
-    """Preprocessing dataframe from Ladesaeulenregister.csv"""
-    dframe                  = dfr.copy()
-    df_geo                  = dfg.copy()
-    
-    dframe2               	= dframe.loc[:,['Postleitzahl', 'Bundesland', 'Breitengrad', 'Längengrad', 'Nennleistung Ladeeinrichtung [kW]']]
+def select_lstat(dfr):
+    """Columns of Ladesaeulenregister.csv used downstream, renamed, with numeric coordinates and kW"""
+    dframe2               	= dfr.loc[:,['Postleitzahl', 'Bundesland', 'Breitengrad', 'Längengrad', 'Nennleistung Ladeeinrichtung [kW]']]
     dframe2.rename(columns  = {"Nennleistung Ladeeinrichtung [kW]":"KW", "Postleitzahl": "PLZ"}, inplace = True)
 
-    # Convert to string
-    dframe2['Breitengrad']  = dframe2['Breitengrad'].astype(str)
-    dframe2['Längengrad']   = dframe2['Längengrad'].astype(str)
+    # Comma or dot decimals to float64, invalid values become NaN
+    dframe2, _              = normalize_coordinates(dframe2)
+    dframe2['KW'], _        = parse_coordinates(dframe2['KW'])
+    return dframe2
+
 
-    # Now replace the commas with periods
-    dframe2['Breitengrad']  = dframe2['Breitengrad'].str.replace(',', '.')
-    dframe2['Längengrad']   = dframe2['Längengrad'].str.replace(',', '.')
+@ht.timer
+def preprop_lstat(dfr, dfg, pdict):
+    """Preprocessing dataframe from Ladesaeulenregister.csv"""
+    dframe2                 = select_lstat(dfr)
 
     dframe3                 = dframe2[(dframe2["Bundesland"] == 'Berlin') & 
                                             (dframe2["PLZ"] > 10115) &  
                                             (dframe2["PLZ"] < 14200)]
     
-    ret = sort_by_plz_add_geometry(dframe3, df_geo, pdict)
+    ret = sort_by_plz_add_geometry(dframe3, dfg, pdict)
     
     return ret
 
@@ -52,25 +93,17 @@ def preprop_lstat(dfr, dfg, pdict):
 @ht.timer
 def preprop_resid(dfr, dfg, pdict):
     """Preprocessing dataframe from plz_einwohner.csv"""
-    dframe                  = dfr.copy()
-    df_geo                  = dfg.copy()    
-    
-    dframe2               	= dframe.loc[:,['plz', 'einwohner', 'lat', 'lon']]
+    dframe2               	= dfr.loc[:,['plz', 'einwohner', 'lat', 'lon']]
     dframe2.rename(columns  = {"plz": "PLZ", "einwohner": "Einwohner", "lat": "Breitengrad", "lon": "Längengrad"}, inplace = True)
 
-    # Convert to string
-    dframe2['Breitengrad']  = dframe2['Breitengrad'].astype(str)
-    dframe2['Längengrad']   = dframe2['Längengrad'].astype(str)
-
-    # Now replace the commas with periods
-    dframe2['Breitengrad']  = dframe2['Breitengrad'].str.replace(',', '.')
-    dframe2['Längengrad']   = dframe2['Längengrad'].str.replace(',', '.')
+    # Comma or dot decimals to float64, invalid values become NaN
+    dframe2, _              = normalize_coordinates(dframe2)
 
     dframe3                 = dframe2[ 
                                             (dframe2["PLZ"] > 10000) &  
                                             (dframe2["PLZ"] < 14200)]
     
-    ret = sort_by_plz_add_geometry(dframe3, df_geo, pdict)
+    ret = sort_by_plz_add_geometry(dframe3, dfg, pdict)
     
     return ret
 
@@ -84,6 +117,5 @@ def count_plz_occurrences(df_lstat2):
         Number=('PLZ', 'count'),
         geometry=('geometry', 'first')
     ).reset_index()
-    print("this is the code \n",result_df)
     
     return result_df
\ No newline at end of file
@@ -0,0 +1,104 @@
+import os
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+# Polygon layers: config key of the file per geometry_source, and the key column
+LAYERS = {
+    "plz": {"csv": "file_geodat_plz", "shapefile": "file_shape_plz", "parquet": "file_geoparquet_plz"},
+    "dis": {"csv": "file_geodat_dis", "shapefile": "file_shape_dis", "parquet": "file_geoparquet_dis"},
+}
+
+# Attribute column of the bundled shapefiles holding each key, and its dtype
+SHAPEFILE_COLUMNS = {
+    "PLZ":      ("PLZ99", "int64"),
+    "Bezirk":   ("Gemeinde_n", None),
+}
+
+
+# -----------------------------------------------------------------------------
+class GeometrySource(ABC):
+    """
+    Polygons of one layer as a GeoDataFrame with the key column and geometry
+    in EPSG:4326, in file order. bbox (west, south, east, north) keeps only
+    the polygons intersecting that box; binary sources apply it while
+    reading, so polygons outside are never decoded.
+    """
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+
+    @property
+    def files(self):
+        """Files the polygons are read from, for the dataset version"""
+        return [self.path]
+
+    @abstractmethod
+    def load(self, bbox=None):
+        """GeoDataFrame with the key column and geometry"""
+
+    def to_parquet(self, path):
+        """Derives a GeoParquet file with bounding-box columns, readable by GeoParquetSource"""
+        self.load().to_parquet(path, index=False, write_covering_bbox=True)
+
+    def _finish(self, gdf, bbox):
+        if bbox is not None:
+            west, south, east, north = bbox
+            gdf = gdf.cx[west:east, south:north]
+        return gdf.to_crs("EPSG:4326").reset_index(drop=True) if gdf.crs is not None \
+            else gdf.set_crs("EPSG:4326").reset_index(drop=True)
+
+
+class WktCsvSource(GeometrySource):
+    """geodata_berlin_*.csv: key and WKT text per row; every polygon is parsed before filtering"""
+
+    def load(self, bbox=None):
+        from shared.application.Aggregation import polygons_from_wkt
+        return self._finish(polygons_from_wkt(pd.read_csv(self.path, delimiter=";"), self.key), bbox)
+
+
+class ShapefileSource(GeometrySource):
+    """ESRI shapefile read as binary geometry; only the key attribute is read from the .dbf"""
+
+    @property
+    def files(self):
+        """The .shp plus the attribute table, record index and projection the read depends on"""
+        stem = os.path.splitext(self.path)[0]
+        return [self.path, stem + ".dbf"] + [stem + ext for ext in (".shx", ".prj") if os.path.exists(stem + ext)]
+
+    def load(self, bbox=None):
+        import geopandas as gpd
+        column, dtype = SHAPEFILE_COLUMNS.get(self.key, (self.key, None))
+        gdf = gpd.read_file(self.path, columns=[column], bbox=tuple(bbox) if bbox is not None else None)
+        gdf = gdf.rename(columns={column: self.key})
+        if dtype is not None:
+            gdf[self.key] = gdf[self.key].astype(dtype)
+        return self._finish(gdf[[self.key, "geometry"]], None)
+
+
+class GeoParquetSource(GeometrySource):
+    """
+    GeoParquet (WKB) file, e.g. written by GeometrySource.to_parquet. The
+    bbox columns skip rows by their bounds; the exact test runs on the rest.
+    """
+
+    def load(self, bbox=None):
+        import geopandas as gpd
+        gdf = gpd.read_parquet(self.path, columns=[self.key, "geometry"],
+                               bbox=tuple(bbox) if bbox is not None else None)
+        return self._finish(gdf, bbox)
+
+
+SOURCES = {"csv": WktCsvSource, "shapefile": ShapefileSource, "parquet": GeoParquetSource}
+
+
+def geometry_source(config, layer, key):
+    """Source of the "plz" or "dis" layer as selected by config["geometry_source"] (default: csv)"""
+    kind = config.get("geometry_source", "csv")
+    if kind not in SOURCES:
+        raise ValueError(f"Unknown geometry_source {kind!r}; use one of {sorted(SOURCES)}")
+    path_key = LAYERS[layer][kind]
+    if not config.get(path_key):
+        raise ValueError(f"geometry_source {kind!r} needs the {layer} polygon file in config[{path_key!r}]")
+    return SOURCES[kind](config[path_key], key)
@@ -0,0 +1,139 @@
+import logging
+import pandas as pd
+from shared.application.Preprocessor import normalize_coordinates
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.compute as pc
+except ImportError:                     # the pandas chunked reader is used instead
+    pacsv = None
+
+# Columns of Ladesaeulenregister.csv the application uses; everything else is never read
+LSTAT_COLUMNS = [
+    "Betreiber",
+    "Anzeigename (Karte)",
+    "Postleitzahl",
+    "Bundesland",
+    "Breitengrad",
+    "Längengrad",
+    "Nennleistung Ladeeinrichtung [kW]",
+]
+
+BUNDESLAENDER = pd.CategoricalDtype([
+    "Baden-Württemberg", "Bayern", "Berlin", "Brandenburg", "Bremen", "Hamburg",
+    "Hessen", "Mecklenburg-Vorpommern", "Niedersachsen", "Nordrhein-Westfalen",
+    "Rheinland-Pfalz", "Saarland", "Sachsen", "Sachsen-Anhalt", "Schleswig-Holstein",
+    "Thüringen",
+])
+
+LSTAT_DTYPES = {
+    "Betreiber":                            "category",
+    "Anzeigename (Karte)":                  object,
+    "Postleitzahl":                         object,     # converted to int32 after filtering
+    "Bundesland":                           BUNDESLAENDER,
+    "Nennleistung Ladeeinrichtung [kW]":    "float64",
+}
+
+# Columns of Verkehrsaufkommen.csv (one row per road segment and direction)
+TRAFFIC_DTYPES = {
+    "Bezirk":                               "category",
+    "Ortsteil":                             "category",
+    "Straßentyp":                           "category",
+    "Von-Station":                          "float64",  # metres along the link
+    "Bis-Station":                          "float64",
+    "DTVw-2019-Kfz":                        "float64",  # vehicles per working day
+    "DTVw-2019-Lkw":                        "float64",
+}
+
+
+# -----------------------------------------------------------------------------
+def _finish_lstat(dframe):
+    """Pins the final dtypes: PLZ int32, Bundesland and Betreiber categorical, coordinates float64"""
+    dframe["Postleitzahl"]  = pd.to_numeric(dframe["Postleitzahl"], errors="coerce").fillna(0).astype("int32")
+    dframe["Betreiber"]     = dframe["Betreiber"].astype(object).astype("category")     # sorted categories
+    dframe["Bundesland"]    = pd.Categorical(dframe["Bundesland"].astype(object), dtype=BUNDESLAENDER)
+    dframe, _               = normalize_coordinates(dframe)
+    return dframe[LSTAT_COLUMNS].reset_index(drop=True)
+
+
+def _read_lstat_arrow(path, bundesland, encoding, block_size=1 << 20):
+    """
+    Streams record batches with pyarrow; fails with ArrowInvalid on malformed
+    numbers. The reader buffers a few dozen blocks ahead, so block_size bounds
+    the peak memory.
+    """
+    column_types = {
+        "Betreiber":                            pa.dictionary(pa.int32(), pa.string()),
+        "Anzeigename (Karte)":                  pa.string(),
+        "Postleitzahl":                         pa.string(),
+        "Bundesland":                           pa.dictionary(pa.int32(), pa.string()),
+        "Breitengrad":                          pa.float64(),
+        "Längengrad":                           pa.float64(),
+        "Nennleistung Ladeeinrichtung [kW]":    pa.float64(),
+    }
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(block_size=block_size, encoding=encoding),
+        parse_options=pacsv.ParseOptions(delimiter=";"),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=LSTAT_COLUMNS, column_types=column_types, decimal_point=","
+        ),
+    )
+    batches = []
+    with reader:
+        for batch in reader:
+            batches.append(batch if bundesland is None else
+                           batch.filter(pc.equal(batch.column("Bundesland"), bundesland)))
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    return table.to_pandas()
+
+
+def _read_lstat_pandas(path, bundesland, encoding, chunksize=50_000):
+    """Chunked pandas reader; coordinates it cannot parse become NaN"""
+    chunks = []
+    reader = pd.read_csv(
+        path,
+        delimiter=";",
+        encoding=encoding,
+        usecols=LSTAT_COLUMNS,
+        dtype=LSTAT_DTYPES,
+        decimal=",",
+        chunksize=chunksize,
+    )
+    with reader:
+        for chunk in reader:
+            chunks.append(chunk if bundesland is None else chunk[chunk["Bundesland"] == bundesland])
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_lstat(path, bundesland="Berlin", encoding="utf-8"):
+    """
+    Streams Ladesaeulenregister.csv batch by batch, reading only LSTAT_COLUMNS
+    with pinned dtypes and keeping the rows of one Bundesland (all rows for
+    None). The national table is never held in memory at once.
+    """
+    if pacsv is not None:
+        try:
+            return _finish_lstat(_read_lstat_arrow(path, bundesland, encoding))
+        except pa.ArrowInvalid as e:
+            logging.warning(f"Falling back to the pandas reader: {e}")
+    return _finish_lstat(_read_lstat_pandas(path, bundesland, encoding))
+
+
+def read_traffic(path, encoding="utf-8-sig"):
+    """
+    Reads Verkehrsaufkommen.csv with comma decimals and the TRAFFIC_DTYPES
+    columns only. Segments without a district ("-") get a missing Bezirk.
+    """
+    dframe = pd.read_csv(
+        path,
+        delimiter=";",
+        encoding=encoding,
+        usecols=list(TRAFFIC_DTYPES),
+        dtype=TRAFFIC_DTYPES,
+        decimal=",",
+    )
+    dframe["Bezirk"] = dframe["Bezirk"].cat.remove_categories(["-"]) if "-" in dframe["Bezirk"].cat.categories \
+        else dframe["Bezirk"]
+    return dframe[list(TRAFFIC_DTYPES)]
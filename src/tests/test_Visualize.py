@@ -3,7 +3,7 @@ import folium
 import pandas as pd
 import geopandas as gpd
 from shapely.geometry import Polygon, Point
-from charging.application.services.Visualize import Visualize
+from charging.application.services.Visualize import Visualize, NO_DATA_COLOR
 
 @pytest.fixture
 def sample_residents_data():
@@ -69,3 +69,58 @@ def test_render_charging_stations_layer(visualize_instance, sample_charging_stat
         assert True
     except Exception as e:
         pytest.fail(f"_render_charging_stations_layer failed: {e}")
+
+def test_choropleth_single_layer_and_cache(sample_residents_data):
+    """Test that all polygons go into one GeoJson layer and the collection is reused"""
+    Visualize._layer_cache.clear()
+    vis = Visualize()
+
+    m = vis._choropleth(sample_residents_data, 'Einwohner')
+    layers = [c for c in m._children.values() if isinstance(c, folium.GeoJson)]
+    assert len(layers) == 1
+    assert vis.last_render["features"] == 3
+    assert vis.last_render["payload_bytes"] > 0
+    assert not vis.last_render["cache_hit"]
+
+    vis._choropleth(sample_residents_data, 'Einwohner')
+    assert vis.last_render["cache_hit"]
+
+    changed = sample_residents_data.assign(Einwohner=[1, 2, 3])
+    vis._choropleth(changed, 'Einwohner')
+    assert not vis.last_render["cache_hit"]
+
+
+def test_simplify_tolerance_per_zoom():
+    """Test that the tolerance follows the zoom level"""
+    assert Visualize(zoom_start=10, tolerances={10: 0.001, 14: 0.0})._tolerance() == 0.001
+    assert Visualize(zoom_start=12, tolerances={10: 0.001, 14: 0.0})._tolerance() == 0.0
+
+
+def test_map_pages_are_built_once_in_the_background(sample_residents_data, sample_charging_stations_data):
+    """Test that a layer's page is built by the worker once and reused, and render_map queues the other layer"""
+    Visualize._html_cache.clear()
+    vis = Visualize()
+
+    page = vis.map_html(sample_residents_data, 'Einwohner')
+    assert "<html>" in page.result(timeout=30)
+    assert vis.map_html(sample_residents_data, 'Einwohner') is page
+    assert vis.map_html(sample_residents_data.assign(Einwohner=[1, 2, 3]), 'Einwohner') is not page
+
+    vis.render_map(sample_charging_stations_data, sample_residents_data, "Residents")
+    stations = vis.map_html(sample_charging_stations_data, 'Number')
+    assert len(Visualize._html_cache) == 3
+    assert "Number" in stations.result(timeout=30)
+
+
+def test_missing_values_get_no_data_color(sample_residents_data):
+    """Test that NaN areas are drawn in the no-data colour and left out of the colour scale"""
+    import json
+    dframe = sample_residents_data.assign(Einwohner=[5000.0, float("nan"), 6000.0])
+    visualize = Visualize(zoom_start=11)
+    visualize._choropleth(dframe, "Einwohner")
+
+    geojson, cache_hit = visualize._feature_collection(dframe, "Einwohner", None)
+    assert cache_hit
+    fills = [f["properties"]["fill"] for f in json.loads(geojson)["features"]]
+    assert fills[1] == NO_DATA_COLOR
+    assert NO_DATA_COLOR not in (fills[0], fills[2])
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+from shared.application.Adjacency import PlzGraph
+from charging.application.services.Search import SearchService
+
+
+@pytest.fixture
+def grid():
+    """3 x 3 PLZ squares, codes 1..9 row by row, plus 10 far away without neighbours"""
+    squares = [box(col, row, col + 1, row + 1) for row in range(3) for col in range(3)] + [box(10, 10, 11, 11)]
+    return gpd.GeoDataFrame({'PLZ': np.arange(1, 11)}, geometry=squares, crs="EPSG:4326")
+
+
+def test_queen_and_rook_contiguity(grid):
+    queen = PlzGraph.from_polygons(grid)
+    rook = PlzGraph.from_polygons(grid, contiguity="rook")
+
+    assert queen.neighbours(5).tolist() == [1, 2, 3, 4, 6, 7, 8, 9]
+    assert rook.neighbours(5).tolist() == [2, 4, 6, 8]
+    assert rook.neighbours(1).tolist() == [2, 4]
+    assert queen.neighbours(10).tolist() == [] and queen.neighbours(99).tolist() == []
+    with pytest.raises(ValueError):
+        PlzGraph.from_polygons(grid, contiguity="bishop")
+
+
+def test_rings_and_edge_frame_roundtrip(grid):
+    graph = PlzGraph.from_frame(PlzGraph.from_polygons(grid, contiguity="rook").to_frame())
+
+    codes, ring = graph.ring(1, 2)
+    assert codes.tolist() == [1, 2, 4, 3, 5, 7] and ring.tolist() == [0, 1, 1, 2, 2, 2]
+    assert graph.ring(1, 2) is graph.ring(1, 2)
+    assert graph.ring(10, 3)[0].tolist() == [10]
+    assert graph.ring(42, 1)[0].tolist() == [42]
+    assert 10 in graph and len(graph) == 10
+
+
+def test_smoothing_over_neighbours(grid):
+    graph = PlzGraph.from_polygons(grid, contiguity="rook")
+    values = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0])
+
+    mean = graph.smooth(np.arange(1, 10), values, rings=1)
+    assert mean[0] == pytest.approx((1 + 2 + 4) / 3)
+    assert mean[2] == pytest.approx((2 + 6) / 2)                # no value of its own
+    assert graph.smooth([1, 77], [1.0, 3.0], rings=1, how="sum").tolist() == [1.0, 3.0]
+
+    frame = pd.DataFrame({'PLZ': np.arange(1, 10), 'Einwohner': values})
+    frame.attrs["data_version"] = "v1:resid"
+    smoothed = graph.smooth_frame(frame, 'Einwohner', rings=1)
+    assert smoothed.attrs["data_version"] == "v1:resid:mean1"
+    assert np.isnan(frame['Einwohner'].iloc[2]) and smoothed['Einwohner'].iloc[0] == pytest.approx(7 / 3)
+    assert graph.smooth_frame(frame, 'Einwohner', rings=0) is frame
+
+
+def test_search_includes_neighbouring_postal_codes(grid):
+    stations = pd.DataFrame({
+        "Postleitzahl": [1, 2, 5, 9],
+        "Anzeigename (Karte)": ["A", "B", "C", "D"],
+        "Breitengrad": [0.5, 0.5, 1.5, 2.5],
+        "Längengrad": [0.5, 1.5, 1.5, 2.5],
+    })
+    search = SearchService(stations, PlzGraph.from_polygons(grid, contiguity="rook"))
+
+    positions, ring = search.neighbourhood_positions(1, rings=2)
+    assert search.stations.names_at(positions).tolist() == ["A", "B", "C"] and ring.tolist() == [0, 1, 2]
+    assert [s["name"] for s in search.search_neighbourhood(5, rings=1)] == ["C", "B"]
+    assert [s["name"] for s in SearchService(stations).search_neighbourhood(5, rings=1)] == ["C"]
@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon
+from shared.application.Aggregation import assign_polygons, aggregate_by_polygon, aggregate_lstat, join_lstat, \
+    aggregate_traffic
+
+
+@pytest.fixture
+def plz_polygons():
+    """Two adjacent squares sharing the border at lon 13.5"""
+    return gpd.GeoDataFrame({
+        'PLZ': [10115, 10117],
+        'geometry': [
+            Polygon([(13.4, 52.5), (13.5, 52.5), (13.5, 52.6), (13.4, 52.6)]),
+            Polygon([(13.5, 52.5), (13.6, 52.5), (13.6, 52.6), (13.5, 52.6)]),
+        ]
+    }, crs="EPSG:4326")
+
+
+@pytest.fixture
+def stations():
+    """Stations in register layout; the second reports the wrong postal code"""
+    return pd.DataFrame({
+        "Postleitzahl": [10115, 10115, 10117, 10117],
+        "Bundesland": ["Berlin"] * 4,
+        "Breitengrad": ["52,55", "52,55", "52,55", "53,00"],
+        "Längengrad": ["13,45", "13,55", "13,50", "13,45"],
+        "Nennleistung Ladeeinrichtung [kW]": ["22,00", "50,00", "11,00", "150,00"],
+    })
+
+
+def test_assign_polygons(plz_polygons):
+    """Test point-in-polygon assignment, border points and points outside all polygons"""
+    lat = np.array([52.55, 52.55, 52.55, 53.0, np.nan])
+    lon = np.array([13.45, 13.55, 13.50, 13.45, np.nan])
+
+    assert assign_polygons(lat, lon, plz_polygons).tolist() == [0, 1, 0, -1, -1]
+
+
+def test_aggregate_by_polygon_keeps_one_geometry_per_polygon(plz_polygons):
+    """Test counts and sums per polygon, including polygons without points"""
+    result = aggregate_by_polygon(np.array([1, 1, -1]), plz_polygons, 'PLZ', sums={'KW': [11.0, np.nan, 22.0]})
+
+    assert isinstance(result, gpd.GeoDataFrame)
+    assert result['PLZ'].tolist() == [10115, 10117]
+    assert result['Number'].tolist() == [0, 2]
+    assert result['KW'].tolist() == [0.0, 11.0]
+    assert result.geometry.equals(plz_polygons.geometry)
+
+
+def test_aggregate_lstat_uses_location_not_reported_plz(plz_polygons, stations):
+    """Test that stations are counted in the polygon they lie in"""
+    result = aggregate_lstat(stations, plz_polygons, 'PLZ')
+
+    assert result['Number'].tolist() == [2, 1]
+    assert result['KW'].tolist() == [33.0, 50.0]
+
+
+def test_join_lstat_multiple_layers(plz_polygons, stations):
+    """Test that each layer adds its key column and the reported PLZ is kept"""
+    districts = gpd.GeoDataFrame({'Bezirk': ['Mitte'], 'geometry': [Polygon([(13.4, 52.5), (13.6, 52.5), (13.6, 52.6), (13.4, 52.6)])]}, crs="EPSG:4326")
+
+    joined = join_lstat(stations, {'PLZ': plz_polygons, 'Bezirk': districts})
+
+    assert joined['PLZ_gemeldet'].tolist() == [10115, 10115, 10117, 10117]
+    assert joined['PLZ'].tolist()[:3] == [10115, 10117, 10115]
+    assert joined['Bezirk'].isna().tolist() == [False, False, False, True]
+
+
+def test_aggregate_traffic_per_district_and_plz(plz_polygons):
+    """Test segment sums per district and their area-weighted split onto PLZ"""
+    districts = gpd.GeoDataFrame({
+        'Bezirk': ['Mitte'],
+        'geometry': [Polygon([(13.4, 52.5), (13.6, 52.5), (13.6, 52.6), (13.4, 52.6)])],
+    }, crs="EPSG:4326")
+    segments = pd.DataFrame({
+        'Bezirk': ['Mitte', 'Mitte', None],
+        'Von-Station': [0.0, 100.0, 0.0],
+        'Bis-Station': [500.0, 300.0, 50.0],
+        'DTVw-2019-Kfz': [10000.0, 2000.0, 500.0],
+        'DTVw-2019-Lkw': [300.0, 100.0, 10.0],
+    })
+
+    dis, plz = aggregate_traffic(segments, districts, plz_polygons, 'PLZ')
+
+    assert dis['Number'].tolist() == [2]
+    assert dis['Kfz'].tolist() == [12000.0]
+    assert dis['Kfz_km'].tolist() == pytest.approx([10000 * 0.5 + 2000 * 0.2])
+    # Both squares cover half of the district; the split keeps the total
+    assert plz['Kfz_km'].to_numpy() == pytest.approx([2700.0, 2700.0], rel=1e-3)
+    assert plz['Kfz_km'].sum() == pytest.approx(dis['Kfz_km'].sum(), rel=1e-3)
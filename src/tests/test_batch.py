@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from charging.application.services.Batch import BatchQuery
+from charging.application.services.Search import SearchService
+from shared.infrastructure.Writer import open_writer, output_format
+
+
+@pytest.fixture
+def batch():
+    dframe = pd.DataFrame({
+        "Postleitzahl": [10115, 10117, 10117, 10119],
+        "Anzeigename (Karte)": ["Station A", "Station B", "Station C", "Station D"],
+        "Breitengrad": [52.5200, 52.5250, 52.5260, 52.5300],
+        "Längengrad": [13.4050, 13.4100, 13.4110, 13.4150],
+    })
+    return BatchQuery(SearchService(dframe))
+
+
+def test_postal_codes_batch(batch):
+    """One row per station, in input order; unknown and invalid codes keep an empty row"""
+    result = batch.postal_codes(["10117", "abc", "99999", "10115"], offset=100)
+    assert result["Query"].tolist() == [100, 100, 101, 102, 103]
+    assert result["PLZ"].tolist() == [10117, 10117, pd.NA, 99999, 10115]
+    assert result["Name"].tolist() == ["Station B", "Station C", pd.NA, pd.NA, "Station A"]
+    assert np.isnan(result["Latitude"].iloc[2])
+
+
+def test_nearest_batch_matches_single_queries(batch):
+    lat, lon = np.array([52.521, np.nan, 52.529]), np.array([13.406, 13.4, 13.414])
+    result = batch.nearest(lat, lon, k=2)
+    assert result["Query"].tolist() == [0, 0, 1, 2, 2]
+    assert result["Rank"].tolist() == [1, 2, pd.NA, 1, 2]
+    single = batch.search.nearest(52.529, 13.414, k=2)
+    assert result["Name"].iloc[3:].tolist() == [s["name"] for s in single]
+    assert result["Distance_m"].iloc[3:].to_numpy() == pytest.approx([s["distance_m"] for s in single])
+
+
+def test_within_radius_batch_matches_single_queries(batch):
+    result = batch.within_radius([52.5255, 40.0], [13.4105, 13.4], 200)
+    single = batch.search.within_radius(52.5255, 13.4105, 200)
+    assert result["Name"].iloc[:-1].tolist() == [s["name"] for s in single]
+    assert result["Query"].tolist() == [0] * len(single) + [1]
+    assert result["Name"].isna().iloc[-1]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "geojson"])
+def test_writers_stream_chunks(batch, tmp_path, fmt):
+    """Chunks written one by one read back as one table"""
+    path = str(tmp_path / f"result.{fmt}")
+    chunks = [batch.postal_codes(["10117", "99999"]), batch.postal_codes(["10115"], offset=2)]
+    with open_writer(path) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    assert writer.rows == 4
+
+    if fmt == "csv":
+        result = pd.read_csv(path)
+    elif fmt == "parquet":
+        result = pd.read_parquet(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            features = json.load(f)["features"]
+        assert features[0]["geometry"] == {"type": "Point", "coordinates": [13.41, 52.525]}
+        assert features[2]["geometry"] is None
+        result = pd.DataFrame([f["properties"] for f in features])
+    assert result["Query"].tolist() == [0, 0, 1, 2]
+    assert result["Name"].isna().tolist() == [False, False, True, False]
+
+
+def test_output_format():
+    assert output_format("-") == "csv"
+    assert output_format("out.GeoJSON") == "geojson"
+    assert output_format("out.txt", "parquet") == "parquet"
+    with pytest.raises(ValueError):
+        output_format("out.txt")
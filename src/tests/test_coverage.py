@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon
+from shared.application.Coverage import plz_areas, coverage_metrics, underserved_rank, CoverageModel
+
+
+def square(x, y, size=0.1):
+    return Polygon([(x, y), (x + size, y), (x + size, y + size), (x, y + size)])
+
+
+@pytest.fixture
+def model():
+    """Three PLZ squares, the first two in district West, the third in East"""
+    plz_polygons = gpd.GeoDataFrame({'PLZ': [10115, 10117, 10119]},
+                                    geometry=[square(13.4, 52.5), square(13.5, 52.5), square(13.6, 52.5)],
+                                    crs="EPSG:4326")
+    districts = gpd.GeoDataFrame({'Bezirk': ['West', 'East']},
+                                 geometry=[square(13.4, 52.5, 0.2), square(13.6, 52.5)], crs="EPSG:4326")
+    resid = pd.DataFrame({'PLZ': [10115, 10117, 10119], 'Einwohner': [1000, 3000, 500]})
+    areas = plz_areas(plz_polygons, districts, resid)
+
+    # Two 11 kW chargers in 10115, one 150 kW charger in 10119, one outside every polygon
+    joined = pd.DataFrame({'PLZ_idx': [0, 0, 2, -1], 'Bezirk_idx': [0, 0, 1, -1], 'KW': [11.0, 11.0, 150.0, 22.0]})
+    return CoverageModel.from_frames(joined, areas, districts, version="v1")
+
+
+def test_metrics_and_ranking(model):
+    """Test residents per charger, kW per 1000 residents and the under-served order"""
+    result = model.compute()
+    plz = result.plz.set_index('PLZ')
+
+    assert plz['Number'].tolist() == [2, 0, 1]
+    assert plz.loc[10115, 'Residents_per_charger'] == 500
+    assert np.isinf(plz.loc[10117, 'Residents_per_charger'])
+    assert plz.loc[10119, 'KW_per_1000'] == pytest.approx(300.0)
+    assert plz['Bezirk'].tolist() == ['West', 'West', 'East']
+    assert result.underserved(3)['PLZ'].tolist() == [10117, 10115, 10119]     # tie on 500 goes to more residents
+
+    districts = result.districts.set_index('Bezirk')
+    assert districts['Einwohner'].tolist() == [4000, 500]
+    assert districts.loc['West', 'Residents_per_charger'] == 2000
+
+
+def test_minimum_power_filter(model):
+    """Test that chargers below min_kw are not counted"""
+    result = model.compute(min_kw=50)
+    assert result.plz['Number'].tolist() == [0, 0, 1]
+    assert result.underserved(1)['PLZ'].tolist() == [10117]
+    assert result.plz.attrs["data_version"] == "v1:coverage:50"
+
+
+def test_layer_marks_plz_without_charger(model):
+    """Test that PLZ without a charger at or above min_kw are NaN on the map, not the worst finite value"""
+    layer = model.compute().layer().set_index('PLZ')
+    assert np.isnan(layer.loc[10117, 'Residents_per_charger'])
+    assert layer.loc[10115, 'Residents_per_charger'] == 500
+
+    layer = model.compute(min_kw=50).layer().set_index('PLZ')
+    assert layer['Residents_per_charger'].isna().tolist() == [True, True, False]
+
+
+def test_rank_puts_missing_values_last():
+    """Test that areas without residents rank after all others"""
+    per_charger, _ = coverage_metrics([0, 100, 100], [0, 1, 0], [0, 11, 0])
+    assert np.isnan(per_charger[0])
+    assert underserved_rank(per_charger, [0, 100, 100]).tolist() == [3, 2, 1]
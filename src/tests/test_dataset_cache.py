@@ -0,0 +1,95 @@
+import os
+import pytest
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon
+from shared.application.DatasetCache import DatasetCache
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    """Create a small source CSV the snapshots are derived from"""
+    path = tmp_path / "source.csv"
+    path.write_text("PLZ;einwohner\n10115;5000\n")
+    return str(path)
+
+
+@pytest.fixture
+def sample_gdf():
+    """Create a GeoDataFrame like the preprocessed outputs"""
+    return gpd.GeoDataFrame({
+        'PLZ': [10115, 10117],
+        'Number': [5, 10],
+        'geometry': [
+            Polygon([(13.4, 52.5), (13.5, 52.5), (13.5, 52.6), (13.4, 52.6)]),
+            Polygon([(13.5, 52.5), (13.6, 52.5), (13.6, 52.6), (13.5, 52.6)]),
+        ]
+    }, crs="EPSG:4326")
+
+
+def test_roundtrip_geodataframe(tmp_path, source_file, sample_gdf):
+    """Test that a GeoDataFrame snapshot is reloaded with its geometry"""
+    cache = DatasetCache(str(tmp_path / "cache"), [source_file], {"geocode": "PLZ"})
+    cache.store("lstat", sample_gdf)
+
+    loaded = cache.load("lstat")
+
+    assert isinstance(loaded, gpd.GeoDataFrame)
+    assert loaded["PLZ"].tolist() == [10115, 10117]
+    assert loaded.geometry.equals(sample_gdf.geometry)
+
+
+def test_get_or_build_builds_once(tmp_path, source_file):
+    """Test that the builder only runs on a cache miss"""
+    calls = []
+
+    def builder():
+        calls.append(1)
+        return pd.DataFrame({"PLZ": [10115], "Einwohner": [5000]})
+
+    for _ in range(2):
+        cache = DatasetCache(str(tmp_path / "cache"), [source_file], {"geocode": "PLZ"})
+        result = cache.get_or_build("resid", builder)
+
+    assert len(calls) == 1
+    assert result["Einwohner"].tolist() == [5000]
+
+
+def test_version_changes_with_source_and_config(tmp_path, source_file):
+    """Test that editing a source file or the config invalidates the snapshot"""
+    folder = str(tmp_path / "cache")
+    cache = DatasetCache(folder, [source_file], {"geocode": "PLZ"})
+    cache.store("resid", pd.DataFrame({"PLZ": [10115]}))
+
+    assert DatasetCache(folder, [source_file], {"geocode": "plz"}).load("resid") is None
+
+    with open(source_file, "a") as f:
+        f.write("10117;7000\n")
+    assert DatasetCache(folder, [source_file], {"geocode": "PLZ"}).load("resid") is None
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path, source_file):
+    """Test that a truncated snapshot counts as a miss and is replaced by the rebuilt one"""
+    folder = str(tmp_path / "cache")
+    cache = DatasetCache(folder, [source_file], {"geocode": "PLZ"})
+    cache.store("resid", pd.DataFrame({"PLZ": [10115], "Einwohner": [5000]}))
+    path = cache._path("resid")
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+
+    assert cache.load("resid") is None
+    result = cache.get_or_build("resid", lambda: pd.DataFrame({"PLZ": [10115], "Einwohner": [5000]}))
+
+    assert result["Einwohner"].tolist() == [5000]
+    assert cache.load("resid")["Einwohner"].tolist() == [5000]
+    assert os.listdir(folder) == [os.path.basename(path)]
+
+
+def test_store_replaces_outdated_snapshots(tmp_path, source_file):
+    """Test that only the current version is left after a store, without temporary files"""
+    folder = str(tmp_path / "cache")
+    DatasetCache(folder, [source_file], {"geocode": "PLZ"}).store("resid", pd.DataFrame({"PLZ": [10115]}))
+    cache = DatasetCache(folder, [source_file], {"geocode": "plz"})
+    cache.store("resid", pd.DataFrame({"PLZ": [10117]}))
+
+    assert os.listdir(folder) == [os.path.basename(cache._path("resid"))]
@@ -0,0 +1,61 @@
+import pytest
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import box
+from shared.infrastructure.GeometrySource import geometry_source, ShapefileSource, WktCsvSource, GeoParquetSource
+
+
+@pytest.fixture
+def polygons():
+    """Three PLZ squares in a row, west to east"""
+    return gpd.GeoDataFrame({'PLZ': [10115, 10117, 10119]},
+                            geometry=[box(13.30, 52.50, 13.35, 52.55), box(13.35, 52.50, 13.40, 52.55),
+                                      box(13.40, 52.50, 13.45, 52.55)], crs="EPSG:4326")
+
+
+@pytest.fixture
+def config(tmp_path, polygons):
+    """The same polygons as WKT CSV and as a shapefile with the PLZ99 text column of the bundled one"""
+    csv = tmp_path / "geodata_plz.csv"
+    pd.DataFrame({'PLZ': polygons['PLZ'], 'geometry': polygons.geometry.to_wkt()}).to_csv(csv, sep=";", index=False)
+    shp = tmp_path / "plz.shp"
+    gpd.GeoDataFrame({'PLZ99': polygons['PLZ'].astype(str)}, geometry=polygons.geometry).to_file(shp)
+    return {"geocode": "PLZ", "file_geodat_plz": str(csv), "file_shape_plz": str(shp),
+            "file_geoparquet_plz": str(tmp_path / "plz.parquet")}
+
+
+def test_shapefile_matches_wkt_csv(config):
+    csv = geometry_source(dict(config, geometry_source="csv"), "plz", "PLZ")
+    shp = geometry_source(dict(config, geometry_source="shapefile"), "plz", "PLZ")
+    assert isinstance(csv, WktCsvSource) and isinstance(shp, ShapefileSource)
+    assert [f[-7:] for f in shp.files] == ["plz.shp", "plz.dbf", "plz.shx", "plz.prj"]
+
+    expected, result = csv.load(), shp.load()
+    assert list(result.columns) == ['PLZ', 'geometry']
+    assert result['PLZ'].dtype == 'int64'
+    assert result['PLZ'].tolist() == expected['PLZ'].tolist()
+    assert result.geometry.geom_equals(expected.geometry).all()          # shapefiles store rings clockwise
+    assert result.crs == "EPSG:4326"
+
+
+@pytest.mark.parametrize("kind", ["csv", "shapefile", "parquet"])
+def test_bbox_keeps_intersecting_polygons(config, kind):
+    """Only polygons intersecting the box are loaded, with the same result for every source"""
+    geometry_source(dict(config, geometry_source="csv"), "plz", "PLZ").to_parquet(config["file_geoparquet_plz"])
+    source = geometry_source(dict(config, geometry_source=kind), "plz", "PLZ")
+    result = source.load(bbox=(13.36, 52.51, 13.39, 52.52))
+    assert result['PLZ'].tolist() == [10117]
+    assert result.index.tolist() == [0]
+    if kind == "parquet":
+        assert isinstance(source, GeoParquetSource)
+
+
+def test_unknown_geometry_source(config):
+    with pytest.raises(ValueError):
+        geometry_source(dict(config, geometry_source="kml"), "plz", "PLZ")
+
+
+def test_missing_source_path_is_reported(config):
+    """A selected source without its file in the config fails with the config key, not a KeyError"""
+    with pytest.raises(ValueError, match="file_geoparquet_dis"):
+        geometry_source(dict(config, geometry_source="parquet"), "dis", "Bezirk")
@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+import pandas as pd
+from shared.application import HelperTools as ht
+
+sortDF = ht.sortDF.__wrapped__         # without the timer output
+
+
+def sortDF_loop(dframe, col, asc):
+    """The former pop-min/max implementation, kept as reference for the tie-breaking"""
+    dfColList = dframe.columns.values
+    retDF = pd.DataFrame(columns=dfColList)
+    while not dframe.empty:
+        val = min(dframe[col]) if asc == True else max(dframe[col])
+        idx = dframe.index[dframe[col] == val].tolist()[0]
+        row = dict(zip(dfColList, dframe.loc[idx, :].tolist()))
+        dframe = dframe.drop(idx)
+        retDF = pd.concat([retDF, pd.DataFrame([row])], ignore_index=True)
+    return retDF
+
+
+@pytest.fixture
+def ties_df():
+    """DataFrame with repeated values, identified by the ID column"""
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "ID": np.arange(60),
+        "Votes": rng.integers(0, 6, 60),
+        "PLZ": rng.choice([10115, 10117, 10119], 60),
+    }, index=rng.permutation(60))
+
+
+@pytest.mark.parametrize("asc", [True, False])
+def test_sortDF_matches_reference(ties_df, asc):
+    """Test that order and tie-breaking equal the former implementation"""
+    expected = sortDF_loop(ties_df, "Votes", asc)
+
+    result = sortDF(ties_df, "Votes", asc)
+
+    assert result["ID"].tolist() == expected["ID"].tolist()
+    assert result.index.tolist() == list(range(len(ties_df)))
+
+
+@pytest.mark.parametrize("asc", [True, False])
+def test_sortDF_top_k(ties_df, asc):
+    """Test that the top-k mode returns the first k rows of the full sort"""
+    expected = sortDF(ties_df, "Votes", asc)
+
+    result = sortDF(ties_df, "Votes", asc, k=7)
+
+    assert result["ID"].tolist() == expected["ID"].tolist()[:7]
+
+
+def test_sortDF_multi_key(ties_df):
+    """Test sorting by several columns with mixed directions"""
+    result = sortDF(ties_df, ["PLZ", "Votes"], [True, False], k=10)
+
+    expected = ties_df.sort_values(["PLZ", "Votes"], ascending=[True, False], kind="stable").head(10)
+    assert result["ID"].tolist() == expected["ID"].tolist()
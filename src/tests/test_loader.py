@@ -0,0 +1,75 @@
+import pytest
+import pandas as pd
+from shared.infrastructure import Loader
+from shared.infrastructure.Loader import read_lstat, LSTAT_COLUMNS
+
+HEADER = "Betreiber;Anzeigename (Karte);Postleitzahl;Ort;Bundesland;Breitengrad;Längengrad;Nennleistung Ladeeinrichtung [kW];Anzahl Ladepunkte\n"
+
+
+@pytest.fixture
+def register_csv(tmp_path):
+    """Create a small register CSV with Berlin and non-Berlin rows"""
+    path = tmp_path / "Ladesaeulenregister.csv"
+    path.write_text(
+        HEADER
+        + "EnBW;Station A;10115;Berlin;Berlin;52,5200;13,4050;22,00;2\n"
+        + "EnBW;Station M;80331;München;Bayern;48,1371;11,5754;50,00;1\n"
+        + "Allego;Station B;12043;Berlin;Berlin;52,4800;13,4300;150,00;4\n",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def test_read_lstat_filters_and_pins_dtypes(register_csv):
+    """Test that only Berlin rows and the needed columns are returned with pinned dtypes"""
+    result = read_lstat(register_csv)
+
+    assert list(result.columns) == LSTAT_COLUMNS
+    assert result["Anzeigename (Karte)"].tolist() == ["Station A", "Station B"]
+    assert result["Postleitzahl"].dtype == "int32"
+    assert result["Postleitzahl"].tolist() == [10115, 12043]
+    assert isinstance(result["Bundesland"].dtype, pd.CategoricalDtype)
+    assert result["Breitengrad"].tolist() == [52.52, 52.48]
+    assert result["Nennleistung Ladeeinrichtung [kW]"].tolist() == [22.0, 150.0]
+
+
+def test_read_lstat_pandas_fallback_matches(register_csv, monkeypatch):
+    """Test that the chunked pandas reader returns the same frame as the Arrow reader"""
+    expected = read_lstat(register_csv)
+    monkeypatch.setattr(Loader, "pacsv", None)
+
+    pd.testing.assert_frame_equal(read_lstat(register_csv), expected)
+
+
+def test_read_lstat_malformed_coordinates(tmp_path):
+    """Test that unparsable coordinates become NaN instead of failing the load"""
+    path = tmp_path / "Ladesaeulenregister.csv"
+    path.write_text(
+        HEADER
+        + "EnBW;Station A;10115;Berlin;Berlin;52,5200;13,4050;22,00;2\n"
+        + "EnBW;Station B;10117;Berlin;Berlin;52.52.1;13,4100;11,00;1\n",
+        encoding="utf-8",
+    )
+    result = read_lstat(str(path))
+
+    assert len(result) == 2
+    assert result["Breitengrad"].isna().tolist() == [False, True]
+    assert result.attrs["coordinate_rejects"] == {"Breitengrad": 1, "Längengrad": 0}
+
+
+def test_read_traffic_parses_comma_decimals(tmp_path):
+    """Test pinned dtypes, comma decimals and segments without a district"""
+    path = tmp_path / "Verkehrsaufkommen.csv"
+    path.write_text(
+        "Technischer Schlüssel;Straßentyp;Straßenname;Bezirk;Ortsteil;Von-Station;Bis-Station;DTVw-2019-Kfz;DTVw-2019-Lkw\n"
+        "506;S;Kurfürstendamm;Charlottenburg-Wilmersdorf;Charlottenburg;0,00;17,00;24400,00;270,00\n"
+        "507;A;A100;-;-;0,00;250,50;90000,00;6000,00\n",
+        encoding="utf-8-sig",
+    )
+    result = Loader.read_traffic(str(path))
+
+    assert list(result.columns) == list(Loader.TRAFFIC_DTYPES)
+    assert result["Bis-Station"].tolist() == [17.0, 250.5]
+    assert result["DTVw-2019-Kfz"].dtype == "float64"
+    assert result["Bezirk"].tolist()[0] == "Charlottenburg-Wilmersdorf"
+    assert pd.isna(result["Bezirk"].iloc[1])
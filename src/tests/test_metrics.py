@@ -0,0 +1,61 @@
+import json
+import pytest
+import numpy as np
+from shared.application.Metrics import MetricsRegistry, timed, LATENCY_BUCKETS
+from shared.application import HelperTools as ht
+
+
+@pytest.fixture
+def metrics():
+    """A private registry, disabled again after the test"""
+    reg = MetricsRegistry()
+    yield reg
+    reg.disable()
+
+
+def test_disabled_registry_records_nothing(metrics):
+    """Test that calls pass straight through while the registry is disabled"""
+    square = timed("square", metrics)(lambda x: x * x)
+    assert square(3) == 9
+    assert metrics.snapshot() == {}
+
+
+def test_counts_and_histogram(metrics):
+    """Test call counts, latency buckets and both export formats"""
+    metrics.enable()
+    square = timed("square", metrics)(lambda x: x * x)
+    for i in range(5):
+        square(i)
+
+    stage = metrics.snapshot()["square"]
+    assert stage["count"] == 5
+    assert sum(stage["buckets"].values()) == 5
+    assert len(stage["buckets"]) == len(LATENCY_BUCKETS) + 1
+    assert json.loads(metrics.to_json())["square"]["count"] == 5
+
+    prom = metrics.to_prometheus()
+    assert 'charging_stage_duration_seconds_bucket{stage="square",le="+Inf"} 5' in prom
+    assert 'charging_stage_duration_seconds_count{stage="square"} 5' in prom
+
+
+def test_peak_memory_of_nested_stages(metrics):
+    """Test that an outer stage's peak includes the allocations of the stages it calls"""
+    metrics.enable(memory=True)
+
+    @timed("inner", metrics)
+    def inner():
+        return np.ones(1_000_000).sum()          # 8 MB, freed on return
+
+    @timed("outer", metrics)
+    def outer():
+        inner()
+        return np.ones(100_000).sum()
+
+    outer()
+    assert metrics.get("inner").peak_bytes >= 8_000_000
+    assert metrics.get("outer").peak_bytes >= metrics.get("inner").peak_bytes
+
+
+def test_helpertools_timer_keeps_wrapped():
+    """Test that the former print timer still exposes the undecorated function"""
+    assert ht.sortDF.__wrapped__.__name__ == "sortDF"
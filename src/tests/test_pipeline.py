@@ -0,0 +1,107 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+from shared.application.Pipeline import Pipeline
+from shared.application.Preprocessor import preprop_resid
+
+
+def test_dependencies_are_passed_in_order():
+    """Test that each stage receives the results of its dependencies"""
+    pipe = Pipeline()
+    pipe.add("a", lambda: 2)
+    pipe.add("b", lambda: 3)
+    pipe.add("c", lambda a, b: a * 10 + b, ["a", "b"])
+
+    assert pipe.run(["c"])["c"] == 23
+    assert set(pipe.timings) == {"a", "b", "c"}
+
+
+def test_independent_stages_run_concurrently():
+    """Test that independent branches overlap instead of running one after the other"""
+    pipe = Pipeline(max_workers=3)
+    for name in ("x", "y", "z"):
+        pipe.add(name, lambda: time.sleep(0.2) or 1)
+    pipe.add("sum", lambda x, y, z: x + y + z, ["x", "y", "z"])
+
+    start = time.perf_counter()
+    assert pipe.run(["sum"])["sum"] == 3
+    assert time.perf_counter() - start < 0.5
+
+
+def test_snapshot_skips_dependencies():
+    """Test that a loaded snapshot is used and its dependencies never run"""
+    calls, stored = [], {}
+    pipe = Pipeline()
+    pipe.add("raw", lambda: calls.append("raw") or 1)
+    pipe.add("cached", lambda raw: raw + 1, ["raw"], load=lambda: stored.get("cached"),
+             store=lambda value: stored.update(cached=value))
+
+    assert pipe.run(["cached"])["cached"] == 2
+    assert stored == {"cached": 2}
+    assert pipe.run(["cached"])["cached"] == 2
+    assert calls == ["raw"]
+
+
+def test_errors_propagate_and_unknown_dependencies_are_rejected():
+    """Test that a failing stage fails the run and a typo in deps is caught early"""
+    pipe = Pipeline()
+    pipe.add("bad", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        pipe.run(["bad"])
+    with pytest.raises(ValueError):
+        pipe.add("c", lambda x: x, ["missing"])
+
+
+def test_stages_share_inputs_without_modifying_them():
+    """Test that a stage writing to its input changes neither the result nor what other stages see"""
+    source = pd.DataFrame({"a": np.arange(5.0)})
+    pipe = Pipeline(max_workers=1)
+    pipe.add("raw", lambda: source)
+
+    def writer(df):
+        df.loc[0, "a"] = 99.0
+        df["b"] = 1
+        return df
+
+    pipe.add("written", writer, ["raw"])
+    pipe.add("reader", lambda df: df, ["raw"])
+    with pd.option_context("mode.copy_on_write", True):
+        r = pipe.run(["written", "reader"])
+
+    assert r["written"]["a"].iloc[0] == 99.0
+    assert list(source.columns) == ["a"] and source["a"].iloc[0] == 0.0
+    assert r["reader"] is not source and np.shares_memory(r["reader"]["a"].to_numpy(), source["a"].to_numpy())
+
+
+def test_preprocessing_peak_memory_is_bounded():
+    """Test that the residents stages peak at a small multiple of the raw data, not a copy per step"""
+    n, codes = 200_000, np.arange(10115, 10215)
+    rng = np.random.default_rng(0)
+    residents = pd.DataFrame({"plz": rng.choice(codes, n), "einwohner": rng.integers(0, 30000, n),
+                              "lat": rng.uniform(52.4, 52.6, n), "lon": rng.uniform(13.2, 13.6, n)})
+    polygons = gpd.GeoDataFrame({"PLZ": codes}, crs="EPSG:4326",
+                                geometry=[box(13.2 + i * 0.004, 52.4, 13.204 + i * 0.004, 52.6) for i in range(100)])
+    raw = residents.memory_usage(deep=True).sum() + polygons.memory_usage(deep=True).sum()
+
+    pipe = Pipeline(max_workers=1)
+    pipe.add("residents_raw", lambda: residents)
+    pipe.add("plz_polygons", lambda: polygons)
+    pipe.add("resid", lambda r, g: preprop_resid(r, g, {"geocode": "PLZ"}), ["residents_raw", "plz_polygons"])
+    pipe.add("total", lambda r: r["Einwohner"].sum(), ["resid"])
+    pipe.add("by_plz", lambda r: r.groupby("PLZ")["Einwohner"].sum(), ["resid"])
+
+    with pd.option_context("mode.copy_on_write", True):
+        tracemalloc.start()
+        try:
+            base, _ = tracemalloc.get_traced_memory()
+            r = pipe.run(["resid", "total", "by_plz"])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    assert len(r["resid"]) == n
+    assert peak - base < 4 * raw
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon
+from shared.application.Placement import PlacementOptimizer, demand_grid, METRES_PER_DEGREE
+
+
+@pytest.fixture
+def areas():
+    """Two PLZ of about 2.2 x 1.1 km side by side, the eastern one with twice the residents"""
+    dlat = 1000 / METRES_PER_DEGREE
+    dlon = 1000 / (METRES_PER_DEGREE * np.cos(np.radians(52.5)))
+
+    def box(x0):
+        return Polygon([(13.4 + x0 * dlon, 52.5), (13.4 + (x0 + 2) * dlon, 52.5),
+                        (13.4 + (x0 + 2) * dlon, 52.5 + dlat), (13.4 + x0 * dlon, 52.5 + dlat)])
+
+    return gpd.GeoDataFrame({'PLZ': [10115, 10117], 'Einwohner': [1000.0, 2000.0]},
+                            geometry=[box(0), box(2)], crs="EPSG:4326")
+
+
+def test_demand_grid_keeps_residents(areas):
+    """Test that the grid spreads each PLZ's residents over its cells"""
+    lat, lon, weight, idx = demand_grid(areas, 250)
+    assert weight.sum() == pytest.approx(3000.0)
+    assert weight[idx == 1].sum() == pytest.approx(2000.0)
+
+
+def test_score_counts_only_uncovered_residents(areas):
+    """Test that residents near an existing station do not add to the score"""
+    west = areas.geometry.iloc[0].centroid
+    east = areas.geometry.iloc[1].centroid
+    optimizer = PlacementOptimizer(areas, [west.y], [west.x], radius_m=500, spacing_m=100)
+
+    scores = optimizer.score([west.y, east.y, np.nan], [west.x, east.x, np.nan])
+    assert scores.loc[0, 'Population'] > 0
+    assert scores.loc[0, 'Uncovered'] == 0
+    assert scores.loc[1, 'Score'] > scores.loc[0, 'Score']
+    assert scores.loc[0, 'Nearest_station_m'] == pytest.approx(0, abs=1)
+    assert scores.loc[1, 'Nearest_station_m'] == pytest.approx(2000, rel=0.01)
+    assert scores.loc[2].isna().all()
+
+
+def test_lazy_greedy_matches_greedy(areas):
+    """Test that lazy greedy picks the same sites as plain greedy and gains shrink"""
+    optimizer = PlacementOptimizer(areas, [], [], radius_m=400, spacing_m=100)
+    lazy = optimizer.place(6)
+    plain = optimizer.place(6, lazy=False)
+
+    assert lazy['Candidate'].tolist() == plain['Candidate'].tolist()
+    assert lazy['Gain'].to_numpy() == pytest.approx(plain['Gain'].to_numpy())
+    assert (np.diff(lazy['Gain']) <= 1e-9).all()
+    assert lazy['Covered'].iloc[-1] <= 3000.0 + 1e-6
+    # The first site goes to the PLZ with more residents
+    assert lazy.loc[0, 'Longitude'] > areas.geometry.iloc[1].bounds[0]
+
+
+def test_score_suggestions_orders_by_score(areas):
+    """Test that suggestions come back best first with their score columns"""
+    optimizer = PlacementOptimizer(areas, [], [], radius_m=500, spacing_m=100)
+    west, east = areas.geometry.iloc[0].centroid, areas.geometry.iloc[1].centroid
+    suggestions = pd.DataFrame({'ID': [1, 2], 'Location Name': ['West', 'East'],
+                                'Latitude': [west.y, east.y], 'Longitude': [west.x, east.x]})
+
+    ranked = optimizer.score_suggestions(suggestions)
+    assert ranked['Location Name'].tolist() == ['East', 'West']
+
+
+@pytest.mark.parametrize("traffic", [[0.0, 0.0], [np.nan, 5000.0], [np.nan, np.nan]])
+def test_missing_or_zero_traffic_keeps_weights_finite(areas, traffic):
+    """Test that NaN or all-zero traffic neither poisons the demand weights nor the placement"""
+    plain = PlacementOptimizer(areas, [], [], radius_m=400, spacing_m=100)
+    optimizer = PlacementOptimizer(areas, [], [], radius_m=400, spacing_m=100, traffic=traffic)
+
+    assert np.isfinite(optimizer.weight).all()
+    if np.nansum(traffic) == 0:
+        assert optimizer.weight == pytest.approx(plain.weight)
+    else:
+        # Only the PLZ with traffic is weighted up
+        assert optimizer.weight.sum() > plain.weight.sum()
+    assert np.isfinite(optimizer.place(3)['Gain']).all()
@@ -0,0 +1,45 @@
+import pytest
+import numpy as np
+import pandas as pd
+from shared.application.Preprocessor import parse_coordinates, normalize_coordinates
+
+
+def test_parse_coordinates_mixed_decimals():
+    """Test that comma and dot decimals parse to float64 and invalid values are counted"""
+    col = pd.Series(["52,5200", "52.5250", "invalid", None, 52.53], dtype=object)
+
+    values, rejected = parse_coordinates(col)
+
+    assert values.dtype == np.float64
+    assert values.tolist()[:2] == [52.52, 52.525]
+    assert values.isna().tolist() == [False, False, True, True, False]
+    assert rejected == 1
+
+
+def test_parse_coordinates_numeric_passthrough():
+    """Test that numeric columns are only cast"""
+    values, rejected = parse_coordinates(pd.Series([52, 53], dtype="int64"))
+
+    assert values.dtype == np.float64
+    assert rejected == 0
+
+
+def test_normalize_coordinates_report():
+    """Test that both coordinate columns are replaced and rejects are reported per column"""
+    dframe = pd.DataFrame({"Breitengrad": ["52,52", "x"], "Längengrad": ["13,40", "13,41"]})
+
+    dframe, rejects = normalize_coordinates(dframe)
+
+    assert rejects == {"Breitengrad": 1, "Längengrad": 0}
+    assert dframe["Längengrad"].tolist() == [13.40, 13.41]
+    assert dframe.attrs["coordinate_rejects"] == rejects
+
+
+def test_normalize_coordinates_logs_rejects(caplog):
+    """Test that rejected coordinates are logged as a warning instead of printed"""
+    dframe = pd.DataFrame({"Breitengrad": ["52,52", "x"], "Längengrad": ["13,40", "13,41"]})
+
+    with caplog.at_level("WARNING", logger="shared.application.Preprocessor"):
+        normalize_coordinates(dframe)
+
+    assert "Invalid coordinates set to NaN" in caplog.text
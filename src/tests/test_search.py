@@ -1,5 +1,6 @@
 import pytest
 from unittest.mock import MagicMock
+import numpy as np
 import pandas as pd
 from charging.application.services.Search import SearchService
 
@@ -66,11 +67,13 @@ def test_search_empty_dataframe(search_service):
     assert result == expected_result, f"Expected {expected_result}, but got {result}"
 
 
-def test_search_with_invalid_coordinates(search_service, mock_df_lstat):
+def test_search_with_invalid_coordinates(mock_df_lstat):
     """Test handling of invalid coordinates in the DataFrame"""
     # Modify the DataFrame to include invalid coordinates
     mock_df_lstat.at[0, "Breitengrad"] = "invalid_lat"
     mock_df_lstat.at[0, "Längengrad"] = "invalid_lon"
+    # The index is built at construction, so build the service after the change
+    search_service = SearchService(mock_df_lstat)
     
     postal_code = "10115"
     expected_result = []  # Invalid coordinates should result in no valid stations
@@ -78,3 +81,137 @@ def test_search_with_invalid_coordinates(search_service, mock_df_lstat):
     result = search_service.search_by_postal_code(postal_code)
     
     assert result == expected_result, f"Expected {expected_result}, but got {result}"
+
+
+def test_search_comma_decimals_and_unsorted_input():
+    """Test that comma-decimal coordinates are parsed and all stations of a PLZ are returned in input order"""
+    df = pd.DataFrame({
+        "Postleitzahl": [10119.0, 10115.0, None, 10115.0],
+        "Anzeigename (Karte)": ["Station C", "Station A", "Station X", "Station B"],
+        "Breitengrad": ["52,5300", "52,5200", "52,5000", "52,5210"],
+        "Längengrad": ["13,4150", "13,4050", "13,4000", "13,4060"],
+    })
+    service = SearchService(df)
+
+    result = service.search_by_postal_code("10115")
+
+    assert result == [
+        {"name": "Station A", "status": "Available", "location": (52.52, 13.405)},
+        {"name": "Station B", "status": "Available", "location": (52.521, 13.406)},
+    ]
+
+
+def test_search_does_not_modify_dataframe(mock_df_lstat):
+    """Test that building the index and searching leave the caller's DataFrame untouched"""
+    before = mock_df_lstat.copy()
+    service = SearchService(mock_df_lstat)
+    service.search_by_postal_code("10117")
+
+    pd.testing.assert_frame_equal(mock_df_lstat, before)
+
+
+def test_df_lstat_round_trips(search_service, mock_df_lstat):
+    """Test that df_lstat returns the frame it was set to, so reassigning it rebuilds the same index"""
+    assert search_service.df_lstat is mock_df_lstat
+    before = search_service.search_by_postal_code("10115")
+    search_service.df_lstat = search_service.df_lstat
+
+    assert search_service.search_by_postal_code("10115") == before
+    assert search_service.stations_frame().columns.tolist() == ["Name", "Operator", "PLZ", "Latitude", "Longitude"]
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Reference great-circle distance in metres"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6_371_008.8 * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def random_stations():
+    """Random stations around Berlin"""
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        "Postleitzahl": rng.integers(10115, 14200, n),
+        "Anzeigename (Karte)": [f"Station {i}" for i in range(n)],
+        "Breitengrad": rng.uniform(52.35, 52.65, n),
+        "Längengrad": rng.uniform(13.1, 13.75, n),
+    })
+
+
+def test_nearest_matches_brute_force(random_stations):
+    """Test k-nearest results and distances against a full haversine scan"""
+    service = SearchService(random_stations)
+    dist = haversine_m(52.52, 13.405, random_stations["Breitengrad"], random_stations["Längengrad"])
+    expected = random_stations.assign(d=dist).sort_values("d").head(5)
+
+    result = service.nearest(52.52, 13.405, k=5)
+
+    assert [s["name"] for s in result] == expected["Anzeigename (Karte)"].tolist()
+    assert np.allclose([s["distance_m"] for s in result], expected["d"], atol=0.01)
+
+
+def test_within_radius_matches_brute_force(random_stations):
+    """Test that the radius query returns exactly the stations within the radius, nearest first"""
+    service = SearchService(random_stations)
+    dist = haversine_m(52.5, 13.4, random_stations["Breitengrad"], random_stations["Längengrad"])
+
+    result = service.within_radius(52.5, 13.4, 2500)
+
+    assert sorted(s["name"] for s in result) == sorted(random_stations["Anzeigename (Karte)"][dist <= 2500])
+    distances = [s["distance_m"] for s in result]
+    assert distances == sorted(distances)
+
+
+def test_nearest_batch_shapes(random_stations):
+    """Test batched queries for many points at once"""
+    service = SearchService(random_stations)
+
+    dist, idx = service.nearest_batch([52.5, 52.6, 52.4], [13.4, 13.3, 13.5], k=3)
+    hits = service.within_radius_batch([52.5, 52.6], [13.4, 13.3], 1000)
+
+    assert dist.shape == idx.shape == (3, 3)
+    assert (np.diff(dist, axis=1) >= 0).all()
+    assert len(hits) == 2
+
+
+def test_nearest_empty_index():
+    """Test that spatial queries on an empty index return no stations"""
+    service = SearchService(pd.DataFrame(columns=["Postleitzahl", "Anzeigename (Karte)", "Breitengrad", "Längengrad"]))
+
+    assert service.nearest(52.52, 13.405) == []
+    assert service.within_radius(52.52, 13.405, 1000) == []
+
+
+def test_postal_code_arrays_are_views_of_one_plz(search_service):
+    """The map gets the station arrays of one PLZ, not per-station dicts"""
+    names, lat, lon = search_service.postal_code_arrays(10117)
+    assert names.tolist() == ["Station B"]
+    assert lat.tolist() == [52.5250] and lon.tolist() == [13.4100]
+    assert search_service.postal_code_arrays(99999)[0].size == 0
+
+
+def test_viewport_window_filtering():
+    """Only stations inside the viewport window are sent to the map"""
+    from charging.application.services.Postal_search import bounds_to_box, expand_box, box_contains, in_box
+    bounds = {"_southWest": {"lat": 52.50, "lng": 13.40}, "_northEast": {"lat": 52.52, "lng": 13.42}}
+    viewport = bounds_to_box(bounds)
+    window = expand_box(viewport, 2.0)
+    assert window == pytest.approx((52.49, 13.39, 52.53, 13.43))
+    assert box_contains(window, viewport) and not box_contains(viewport, window)
+    assert bounds_to_box(None) is None
+
+    lat = np.array([52.495, 52.51, 52.60])
+    lon = np.array([13.395, 13.41, 13.41])
+    assert in_box(lat, lon, window).tolist() == [True, True, False]
+
+
+def test_search_service_import_skips_ui_libraries():
+    """SearchService can be used as a library without loading Streamlit or the map stack"""
+    import subprocess
+    import sys
+    code = ("import sys, charging.application.services.Search; "
+            "print(sorted(m for m in ('folium', 'branca', 'streamlit', 'geopandas') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
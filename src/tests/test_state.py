@@ -0,0 +1,54 @@
+import pytest
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon
+from charging.application.services.State import SharedState, get_shared_state, invalidate_shared_state
+
+
+@pytest.fixture
+def datasets():
+    """Raw stations plus the two preprocessed per-PLZ frames"""
+    square = Polygon([(13.4, 52.5), (13.5, 52.5), (13.5, 52.6), (13.4, 52.6)])
+    l_stat = pd.DataFrame({
+        "Postleitzahl": [10115, 10117],
+        "Anzeigename (Karte)": ["Station A", "Station B"],
+        "Breitengrad": [52.52, 52.525],
+        "Längengrad": [13.405, 13.41],
+    })
+    dframe1 = gpd.GeoDataFrame({'PLZ': [10115], 'Number': [1], 'geometry': [square]}, crs="EPSG:4326")
+    dframe2 = gpd.GeoDataFrame({'PLZ': [10115], 'Einwohner': [5000], 'geometry': [square]}, crs="EPSG:4326")
+    return l_stat, dframe1, dframe2
+
+
+def test_loader_runs_once_per_version(datasets):
+    """Test that the state is built once and shared until the version changes"""
+    invalidate_shared_state()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return datasets
+
+    first = get_shared_state("v1", loader)
+    assert get_shared_state("v1", loader) is first
+    assert len(calls) == 1
+
+    assert get_shared_state("v2", loader) is not first
+    assert len(calls) == 2
+
+    invalidate_shared_state()
+    get_shared_state("v2", loader)
+    assert len(calls) == 3
+
+
+def test_shared_state_is_read_only_and_accounted(datasets):
+    """Test that the index arrays cannot be written and memory is reported per component"""
+    state = SharedState("v1", *datasets)
+
+    assert state.search_index.search_by_postal_code("10117")[0]["name"] == "Station B"
+    with pytest.raises(ValueError):
+        state.search_index.stations.lat[0] = 0.0
+
+    usage = state.memory_usage()
+    assert set(usage) == {"dframe1", "dframe2", "search_index", "map_layers", "total"}
+    assert usage["total"] == sum(v for k, v in usage.items() if k != "total")
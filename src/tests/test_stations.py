@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from charging.application.services.Stations import StationStore
+
+
+@pytest.fixture
+def lstat():
+    return pd.DataFrame({
+        "Betreiber": ["EnBW", "Allego", "EnBW", "EnBW"],
+        "Anzeigename (Karte)": ["Station C", "Station A", None, "Station A"],
+        "Postleitzahl": [10119, 10115, 10117, 10115],
+        "Breitengrad": [52.53, 52.52, 52.525, "x"],
+        "Längengrad": [13.415, 13.405, 13.41, 13.406],
+    })
+
+
+def test_store_is_compact_sorted_and_read_only(lstat):
+    store, rejected = StationStore.from_frame(lstat)
+
+    assert rejected == 1
+    assert store.plz.dtype == np.int32 and store.plz.tolist() == [10115, 10117, 10119]
+    assert store.name_codes.dtype == np.int8
+    assert store.names_at(slice(None)).tolist() == ["Station A", None, "Station C"]
+    assert store.operators_at(np.array([2, 0])).tolist() == ["EnBW", "Allego"]
+    assert store.slice(10117) == (1, 2) and store.slice(10118) == (2, 2)
+    with pytest.raises(ValueError):
+        store.lat[0] = 0.0
+
+
+def test_station_record_reads_the_store(lstat):
+    store, _ = StationStore.from_frame(lstat)
+    station = store.station(0, distance_m=12.5)
+
+    assert not hasattr(station, "__dict__")
+    assert (station.name, station.operator, station.plz) == ("Station A", "Allego", 10115)
+    assert station["location"] == (52.52, 13.405)
+    assert station == {"name": "Station A", "status": "Available", "location": (52.52, 13.405), "distance_m": 12.5}
+    with pytest.raises(KeyError):
+        station["operator_id"]
+
+
+def test_store_without_operator_column(lstat):
+    store, _ = StationStore.from_frame(lstat.drop(columns="Betreiber"))
+    assert store.station(0).operator is None
+    assert store.frame(slice(0, 2))["Operator"].isna().all()
+
+
+def test_store_is_smaller_than_the_frame():
+    n = 10_000
+    lstat = pd.DataFrame({
+        "Betreiber": np.random.default_rng(0).choice(["EnBW", "Allego", "Tesla"], n),
+        "Anzeigename (Karte)": [f"Ladestation {i}" for i in range(n)],
+        "Postleitzahl": np.arange(n) % 200 + 10115,
+        "Breitengrad": np.linspace(52.4, 52.6, n),
+        "Längengrad": np.linspace(13.2, 13.6, n),
+    })
+    store, _ = StationStore.from_frame(lstat)
+    assert store.nbytes < lstat.memory_usage(deep=True).sum() / 2
@@ -1,15 +1,21 @@
+import threading
 import pytest
 import pandas as pd
 import streamlit as st
 from unittest.mock import patch
 from charging.application.services.Suggestion import SuggestionManager, SuggestionUI,Suggestion
+from charging.application.services.SuggestionStore import SQLiteSuggestionStore
 
 
 @pytest.fixture
-def setup_suggestion_manager():
-    """Fixture to initialize SuggestionManager and clear session state."""
-    st.session_state.clear()
-    manager = SuggestionManager()
+def store(tmp_path):
+    """Fixture for a SQLite store in a fresh database file."""
+    return SQLiteSuggestionStore(str(tmp_path / "suggestions.sqlite"))
+
+@pytest.fixture
+def setup_suggestion_manager(store):
+    """Fixture to initialize SuggestionManager on an empty store."""
+    manager = SuggestionManager(store)
     manager.initialize()
     return manager
 
@@ -24,14 +30,15 @@ def setup_suggestion(setup_suggestion_manager, setup_suggestion_ui):
     return Suggestion(setup_suggestion_manager, setup_suggestion_ui)
 
 def test_initialize_suggestions(setup_suggestion_manager):
-    """Test if session state initializes correctly."""
-    assert "suggestions" in st.session_state
-    assert isinstance(st.session_state["suggestions"], pd.DataFrame)
-    assert st.session_state["suggestions"].empty
+    """Test if the store starts out empty with all columns."""
+    suggestions = setup_suggestion_manager.get_suggestions()
+    assert isinstance(suggestions, pd.DataFrame)
+    assert suggestions.empty
+    assert "Votes" in suggestions.columns
 
 def test_add_valid_suggestion(setup_suggestion_manager):
     """Test adding a valid suggestion."""
-    setup_suggestion_manager.add_suggestion("10115", "Test Location", 52.52, 13.40, "A great place!")
+    assert setup_suggestion_manager.add_suggestion("10115", "Test Location", 52.52, 13.40, "A great place!")
     
     suggestions = setup_suggestion_manager.get_suggestions()
     
@@ -41,15 +48,22 @@ def test_add_valid_suggestion(setup_suggestion_manager):
     assert suggestions.iloc[0]["Latitude"] == 52.52
     assert suggestions.iloc[0]["Longitude"] == 13.40
     assert suggestions.iloc[0]["Description"] == "A great place!"
+    assert suggestions.iloc[0]["Votes"] == 0
 
 def test_add_duplicate_suggestion(setup_suggestion_manager):
     """Test preventing duplicate suggestions."""
     setup_suggestion_manager.add_suggestion("10115", "Test Location", 52.52, 13.40, "First entry")
-    setup_suggestion_manager.add_suggestion("10115", "Test Location", 52.52, 13.40, "Duplicate entry")
+    assert not setup_suggestion_manager.add_suggestion("10115", "Test Location", 52.52, 13.40, "Duplicate entry")
 
     suggestions = setup_suggestion_manager.get_suggestions()
 
     assert len(suggestions) == 1  # Should still be only one entry
+    assert suggestions.iloc[0]["Description"] == "First entry"
+
+def test_add_invalid_suggestion(setup_suggestion_manager):
+    """Test that invalid input is not stored."""
+    assert not setup_suggestion_manager.add_suggestion("abc", "Test Location", 52.52, 13.40, "A great place!")
+    assert setup_suggestion_manager.get_suggestions().empty
 
 def test_get_suggestions_empty(setup_suggestion_manager):
     """Test retrieving suggestions when none exist."""
@@ -65,33 +79,92 @@ def test_get_suggestions_non_empty(setup_suggestion_manager):
     assert not suggestions.empty
     assert len(suggestions) == 1
 
+def test_suggestions_shared_between_managers(store, tmp_path):
+    """Test that suggestions persist for other users of the same database."""
+    SuggestionManager(store).add_suggestion("10117", "Another Place", 52.53, 13.41, "Nice location")
+
+    other = SuggestionManager(SQLiteSuggestionStore(str(tmp_path / "suggestions.sqlite")))
+
+    assert len(other.get_suggestions()) == 1
+
 def test_voting_functionality(setup_suggestion):
     """Test the upvote and downvote functionality."""
     setup_suggestion.suggestion_manager.add_suggestion("10118", "Vote Test", 52.54, 13.42, "Good spot")
-    
-    # Ensure Votes column exists
-    st.session_state["suggestions"]["Votes"] = 0
 
     suggestions = setup_suggestion.suggestion_manager.get_suggestions()
-    assert "Votes" in suggestions.columns
+    suggestion_id = suggestions.iloc[0]["ID"]
     assert suggestions.iloc[0]["Votes"] == 0
 
     # Simulate upvote
-    setup_suggestion._cast_vote(0, "up")
-    assert suggestions.iloc[0]["Votes"] == 1
+    setup_suggestion._cast_vote(suggestion_id, "up")
+    assert setup_suggestion.suggestion_manager.get_suggestions().iloc[0]["Votes"] == 1
 
-    # Simulate downvote
-    setup_suggestion._cast_vote(0, "down")
-    assert suggestions.iloc[0]["Votes"] == 0  # Should not go below 0
+    # Simulate downvote twice
+    setup_suggestion._cast_vote(suggestion_id, "down")
+    setup_suggestion._cast_vote(suggestion_id, "down")
+    assert setup_suggestion.suggestion_manager.get_suggestions().iloc[0]["Votes"] == 0  # Should not go below 0
 
 def test_get_top_suggestions(setup_suggestion):
     """Test retrieving the top suggestions based on votes."""
-    setup_suggestion.suggestion_manager.add_suggestion("10119", "Best Spot", 52.55, 13.43, "Amazing")
-    setup_suggestion.suggestion_manager.add_suggestion("10120", "Cool Place", 52.56, 13.44, "Nice one")
-    
-    st.session_state["suggestions"]["Votes"] = [5, 3]  # Assign votes
-
-    top_suggestions = setup_suggestion.get_top_suggestions(st.session_state["suggestions"], n=2)
+    manager = setup_suggestion.suggestion_manager
+    manager.add_suggestion("10119", "Best Spot", 52.55, 13.43, "Amazing")
+    manager.add_suggestion("10120", "Cool Place", 52.56, 13.44, "Nice one")
+    manager.add_suggestion("10120", "Third Place", 52.57, 13.45, "Ok")
+    ids = manager.get_suggestions()["ID"].tolist()
+    for suggestion_id, votes in zip(ids, [3, 5, 1]):
+        manager.vote(suggestion_id, votes)
+
+    top_suggestions = setup_suggestion.get_top_suggestions(n=2)
     
     assert len(top_suggestions) == 2
-    assert top_suggestions.iloc[0]["Votes"] >= top_suggestions.iloc[1]["Votes"]
+    assert top_suggestions["Location Name"].tolist() == ["Cool Place", "Best Spot"]
+    assert manager.get_top_suggestions(5, postal_code="10120")["Votes"].tolist() == [5, 1]
+
+def test_add_many_batches(store):
+    """Test batched inserts skip duplicates."""
+    rows = [("10115", f"Place {i % 50}", 52.5, 13.4, "batch") for i in range(100)]
+
+    assert store.add_many(rows) == 50
+    assert len(store.get_all()) == 50
+
+def test_concurrent_votes_are_not_lost(store):
+    """Test that votes from many threads on one suggestion all count."""
+    store.add("10115", "Busy Place", 52.52, 13.40, "Everyone votes here")
+    suggestion_id = int(store.get_all().iloc[0]["ID"])
+    n_threads, n_votes = 8, 50
+
+    def voter():
+        for _ in range(n_votes):
+            store.vote(suggestion_id, 1)
+
+    threads = [threading.Thread(target=voter) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert store.get(suggestion_id)["Votes"] == n_threads * n_votes
+
+def test_top_ties_go_to_older_suggestion(store):
+    """Test ordering by votes, then by ID, globally and per postal code."""
+    store.add_many([("10115", "A", 52.5, 13.4, ""), ("10117", "B", 52.5, 13.4, ""), ("10115", "C", 52.5, 13.4, "")])
+    for suggestion_id, votes in ((1, 3), (2, 5), (3, 3)):
+        store.vote(suggestion_id, votes)
+
+    assert store.top(3)["ID"].tolist() == [2, 1, 3]
+    assert store.top(5, "10115")["ID"].tolist() == [1, 3]
+    assert store.top(3, "99999").empty
+    assert store.postal_codes() == ["10115", "10117"]
+
+def test_top_sees_writes_of_other_store_instances(store):
+    """Test that votes and suggestions written through another connection show up in the ranking."""
+    other = SQLiteSuggestionStore(store.path)
+    store.add_many([("10115", "First", 52.5, 13.4, ""), ("10115", "Second", 52.5, 13.4, "")])
+    assert other.top(2)["ID"].tolist() == [1, 2]
+
+    store.vote(2, 5)
+    assert other.top(2)["ID"].tolist() == [2, 1]
+
+    SQLiteSuggestionStore(store.path).add("10117", "Third", 52.5, 13.4, "")
+    assert len(store.top(10)) == store.count() == 3
+    assert store.postal_codes() == ["10115", "10117"]